@@ -0,0 +1,255 @@
+# Librerias
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+##########################################################
+# CACHE DE DOCUMENTOS GENERADOS (WORD Y EXCEL) EN DISCO
+##########################################################
+
+# Directorio donde se guardan los documentos generados (compartido con el pre-renderizador prerender.py)
+ARTEFACTOS_DIR = os.environ.get('TRES_EJES_ARTEFACTOS_DIR', os.path.join(tempfile.gettempdir(), 'tres_ejes_artefactos'))
+# Tamaño máximo del cache en disco (bytes)
+ARTEFACTOS_MAX_BYTES = 1024 * 1024 * 1024
+# Número de archivos que se mantienen en memoria para servir las descargas sin leer el disco en cada interacción
+ARTEFACTOS_EN_MEMORIA = 8
+
+# Archivos de cada entrada
+ARCHIVO_DOCX = 'documento.docx'
+ARCHIVO_XLSX = 'documento.xlsx'
+ARCHIVO_META = 'meta.json'
+
+
+class CacheArtefactos:
+    """
+    Cache en disco, compartido por todos los usuarios del proceso, de los documentos Word y Excel generados.
+    Cada entrada se identifica por (agrupación, unidad, versión de datos); el tamaño total se acota
+    desalojando las entradas usadas hace más tiempo (LRU). Las entradas de la publicación de datos vigente no
+    expiran por tiempo sin uso (incluye las del pre-renderizador); las de publicaciones anteriores se eliminan al guardar.
+    La sesión de cada usuario guarda solo la referencia (agrupación, unidad, versión), no los archivos.
+
+    Parámetros:
+    - directorio (str): Carpeta donde se guardan las entradas.
+    - max_bytes (int): Tamaño máximo del cache en bytes.
+    - en_memoria (int): Número de archivos que se conservan en memoria para las descargas.
+    """
+
+    def __init__(self, directorio=ARTEFACTOS_DIR, max_bytes=ARTEFACTOS_MAX_BYTES, en_memoria=ARTEFACTOS_EN_MEMORIA):
+        self.directorio = directorio
+        self.max_bytes = max_bytes
+        self.en_memoria = en_memoria
+        self._lock = threading.Lock()
+        # Índice LRU: nombre de carpeta -> metadatos (la última entrada es la usada más recientemente)
+        self._indice = OrderedDict()
+        # Archivos recientes en memoria: (carpeta, tipo) -> bytes (inmutables, compartidos sin copia)
+        self._memoria = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        os.makedirs(self.directorio, exist_ok=True)
+        self._cargar_indice()
+
+    @staticmethod
+    def _carpeta(agrupacion, unidad, version):
+        """
+        Nombre de la carpeta de una entrada (hash de la clave, sin caracteres problemáticos para el sistema de archivos).
+        """
+        clave = json.dumps([agrupacion, unidad, version], ensure_ascii=False)
+        return hashlib.sha1(clave.encode('utf-8')).hexdigest()
+
+    def _cargar_indice(self):
+        """
+        Reconstruye el índice a partir de las entradas existentes en disco, ordenadas por último uso.
+        """
+        entradas = []
+        for carpeta in os.listdir(self.directorio):
+            if carpeta.startswith('.tmp_'):
+                continue
+            ruta_meta = os.path.join(self.directorio, carpeta, ARCHIVO_META)
+            try:
+                with open(ruta_meta, encoding='utf-8') as f:
+                    meta = json.load(f)
+                meta['usado'] = os.path.getmtime(ruta_meta)
+                entradas.append((meta['usado'], carpeta, meta))
+            except (OSError, ValueError):
+                # Entrada incompleta (p. ej. escritura interrumpida): se elimina
+                shutil.rmtree(os.path.join(self.directorio, carpeta), ignore_errors=True)
+        for _, carpeta, meta in sorted(entradas, key=lambda entrada: entrada[0]):
+            self._indice[carpeta] = meta
+
+    def _leer_meta(self, carpeta):
+        """
+        Lee los metadatos de una entrada en disco o retorna None si no existe.
+        """
+        ruta_meta = os.path.join(self.directorio, carpeta, ARCHIVO_META)
+        try:
+            with open(ruta_meta, encoding='utf-8') as f:
+                meta = json.load(f)
+            meta['usado'] = os.path.getmtime(ruta_meta)
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def contiene(self, agrupacion, unidad, version):
+        """
+        Indica si existen documentos guardados para (agrupacion, unidad, version), sin contarlo como acierto o fallo.
+        """
+        carpeta = self._carpeta(agrupacion, unidad, version)
+        with self._lock:
+            meta = self._indice.get(carpeta) or self._leer_meta(carpeta)
+            return meta is not None
+
+    def _tamano_total(self):
+        return sum(meta['bytes'] for meta in self._indice.values())
+
+    def _eliminar(self, carpeta):
+        # Se llama con el bloqueo tomado
+        self._indice.pop(carpeta, None)
+        for tipo in ('docx', 'xlsx'):
+            self._memoria.pop((carpeta, tipo), None)
+        shutil.rmtree(os.path.join(self.directorio, carpeta), ignore_errors=True)
+
+    def consultar(self, agrupacion, unidad, version):
+        """
+        Busca la entrada de (agrupacion, unidad, version), la marca como usada y cuenta el acierto o fallo.
+
+        Retorna:
+        - dict con los metadatos de la entrada ('file_name_docx', 'file_name_xlsx', ...) o None si no existe.
+        """
+        carpeta = self._carpeta(agrupacion, unidad, version)
+        with self._lock:
+            meta = self._indice.get(carpeta)
+            if meta is None:
+                # La entrada pudo ser escrita por otro proceso (p. ej. el pre-renderizador)
+                meta = self._leer_meta(carpeta)
+            if meta is None or not os.path.isdir(os.path.join(self.directorio, carpeta)):
+                self._eliminar(carpeta)
+                self.fallos += 1
+                return None
+            # Registrar el uso para el orden LRU (también en disco para sobrevivir reinicios)
+            try:
+                os.utime(os.path.join(self.directorio, carpeta, ARCHIVO_META))
+            except OSError:
+                pass
+            meta['usado'] = time.time()
+            self._indice[carpeta] = meta
+            self._indice.move_to_end(carpeta)
+            self.aciertos += 1
+            return dict(meta)
+
+    def leer(self, agrupacion, unidad, version, tipo):
+        """
+        Retorna los bytes de un documento guardado. Los archivos usados recientemente se mantienen en memoria,
+        por lo que servir una descarga en cada interacción no lee el disco ni copia los datos.
+
+        Parámetros:
+        - agrupacion, unidad, version: Clave de la entrada.
+        - tipo (str): 'docx' o 'xlsx'.
+
+        Retorna:
+        - bytes del documento o None si la entrada ya no existe.
+        """
+        carpeta = self._carpeta(agrupacion, unidad, version)
+        llave = (carpeta, tipo)
+        with self._lock:
+            if llave in self._memoria:
+                self._memoria.move_to_end(llave)
+                return self._memoria[llave]
+            try:
+                with open(os.path.join(self.directorio, carpeta, ARCHIVO_DOCX if tipo == 'docx' else ARCHIVO_XLSX), 'rb') as f:
+                    datos = f.read()
+            except OSError:
+                return None
+            self._memoria[llave] = datos
+            while len(self._memoria) > self.en_memoria:
+                self._memoria.popitem(last=False)
+            return datos
+
+    def guardar(self, agrupacion, unidad, version, docx, xlsx, file_name_docx, file_name_xlsx):
+        """
+        Guarda los documentos de (agrupacion, unidad, version). Las entradas de otras versiones de datos se eliminan
+        y, si se supera el tamaño máximo, se desalojan las entradas usadas hace más tiempo.
+        """
+        carpeta = self._carpeta(agrupacion, unidad, version)
+        meta = {
+            'agrupacion': agrupacion,
+            'unidad': unidad,
+            'version': version,
+            'file_name_docx': file_name_docx,
+            'file_name_xlsx': file_name_xlsx,
+            'bytes': len(docx) + len(xlsx),
+            'creado': time.time(),
+        }
+
+        # Escribir en una carpeta temporal y renombrarla para que nunca se lea una entrada a medio escribir
+        temporal = tempfile.mkdtemp(prefix='.tmp_', dir=self.directorio)
+        try:
+            with open(os.path.join(temporal, ARCHIVO_DOCX), 'wb') as f:
+                f.write(docx)
+            with open(os.path.join(temporal, ARCHIVO_XLSX), 'wb') as f:
+                f.write(xlsx)
+            with open(os.path.join(temporal, ARCHIVO_META), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, ensure_ascii=False)
+
+            with self._lock:
+                self._eliminar(carpeta)
+                os.replace(temporal, os.path.join(self.directorio, carpeta))
+                self._indice[carpeta] = dict(meta, usado=time.time())
+
+                # Los documentos de publicaciones de datos anteriores ya no se sirven
+                for otra, otra_meta in list(self._indice.items()):
+                    if otra_meta['version'] != version:
+                        self._eliminar(otra)
+
+                # Desalojo LRU hasta respetar el tamaño máximo (se conserva siempre la entrada recién guardada)
+                while self._tamano_total() > self.max_bytes and len(self._indice) > 1:
+                    antigua = next(iter(self._indice))
+                    self._eliminar(antigua)
+                    self.desalojos += 1
+        finally:
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    def invalidar(self, agrupacion=None, unidad=None, version=None):
+        """
+        Elimina las entradas que coinciden con los filtros indicados; sin filtros elimina todo el cache.
+
+        Parámetros:
+        - agrupacion (str, opcional): Agrupación a invalidar (p. ej. 'PAISES').
+        - unidad (str, opcional): Unidad a invalidar (p. ej. 'Brasil').
+        - version (str, opcional): Versión de datos a invalidar.
+
+        Retorna:
+        - int: Número de entradas eliminadas.
+        """
+        filtros = {'agrupacion': agrupacion, 'unidad': unidad, 'version': version}
+        with self._lock:
+            eliminar = [
+                carpeta for carpeta, meta in self._indice.items()
+                if all(valor is None or meta[campo] == valor for campo, valor in filtros.items())
+            ]
+            for carpeta in eliminar:
+                self._eliminar(carpeta)
+        return len(eliminar)
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con el número de entradas, el tamaño en disco y los contadores del cache.
+        """
+        with self._lock:
+            return {
+                'entradas': len(self._indice),
+                'bytes': self._tamano_total(),
+                'max_bytes': self.max_bytes,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'desalojos': self.desalojos,
+            }
+
+
+# Cache compartido por todas las sesiones del proceso
+cache_artefactos = CacheArtefactos()
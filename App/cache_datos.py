@@ -0,0 +1,129 @@
+# Librerias
+import threading
+import time
+import consultas
+
+##########################################################
+# CACHES COMPARTIDOS POR VERSIÓN DE DATOS (PUBLICACIÓN)
+##########################################################
+
+# Cada cargue del ETL actualiza el parámetro 'Fecha de actualización' en PARAMETROS.PARAMETROS.
+# Ese valor se usa como identificador de la publicación de datos: mientras no cambie, los resultados
+# derivados de Snowflake (verificaciones, dimensiones, parámetros) se pueden reutilizar entre usuarios.
+
+# Segundos entre consultas de la versión de datos a Snowflake
+VERSION_TTL = 300
+
+_version_lock = threading.Lock()
+_version_actual = {'valor': None, 'consultada': 0.0}
+
+
+def obtener_version_datos(session, ttl=VERSION_TTL):
+    """
+    Obtiene el identificador de la publicación de datos vigente ('Fecha de actualización' en PARAMETROS).
+    El valor se consulta a Snowflake como máximo una vez cada `ttl` segundos por proceso.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+    - ttl (int): Segundos durante los cuales se reutiliza la versión consultada.
+
+    Retorna:
+    - str: Identificador de la publicación de datos. Si la consulta falla se devuelve la última versión conocida.
+    """
+    with _version_lock:
+        if _version_actual['valor'] is not None and (time.monotonic() - _version_actual['consultada']) < ttl:
+            return _version_actual['valor']
+
+        query = """
+        SELECT MAX(A.VALOR) AS VALOR
+        FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS AS A
+        WHERE A.PARAMETRO = 'Fecha de actualización'
+        """
+        try:
+            data = consultas.ejecutar(session, query, plantilla='version_datos')
+            valor = str(data[0]['VALOR']) if data and data[0]['VALOR'] is not None else 'SIN VERSION'
+        except Exception as e:
+            print(f"Error consultando la versión de datos: {e}")
+            valor = _version_actual['valor'] or 'SIN VERSION'
+
+        _version_actual['valor'] = valor
+        _version_actual['consultada'] = time.monotonic()
+        return valor
+
+
+def invalidar_version_datos():
+    """
+    Fuerza a que la próxima llamada a obtener_version_datos consulte de nuevo a Snowflake.
+    """
+    with _version_lock:
+        _version_actual['consultada'] = 0.0
+
+
+class CacheVersionada:
+    """
+    Cache en memoria, compartido por todo el proceso, cuyas entradas quedan asociadas a una versión de datos.
+    Cuando la versión cambia, las entradas de versiones anteriores se descartan.
+
+    Parámetros:
+    - nombre (str): Nombre del cache, usado en los mensajes y estadísticas.
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self._lock = threading.Lock()
+        self._entradas = {}
+        self._version = None
+        self.aciertos = 0
+        self.fallos = 0
+
+    def obtener(self, clave, version, calcular):
+        """
+        Devuelve el valor guardado para (clave, version) o lo calcula con `calcular()` y lo guarda.
+
+        Parámetros:
+        - clave: Clave hashable de la entrada (p. ej. (AGRUPACION, UNIDAD)).
+        - version (str): Versión de datos vigente.
+        - calcular (callable): Función sin argumentos que produce el valor si no está en cache.
+
+        Retorna:
+        - El valor en cache o el recién calculado.
+        """
+        with self._lock:
+            if version != self._version:
+                self._entradas.clear()
+                self._version = version
+            if clave in self._entradas:
+                self.aciertos += 1
+                return self._entradas[clave]
+            self.fallos += 1
+
+        # El cálculo se hace fuera del bloqueo para no detener otras consultas al cache
+        valor = calcular()
+
+        with self._lock:
+            if version == self._version:
+                self._entradas[clave] = valor
+        return valor
+
+    def invalidar(self, clave=None):
+        """
+        Elimina una entrada del cache o, si no se indica clave, todas las entradas.
+        """
+        with self._lock:
+            if clave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(clave, None)
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con el número de entradas, aciertos y fallos del cache.
+        """
+        with self._lock:
+            return {
+                'cache': self.nombre,
+                'version': self._version,
+                'entradas': len(self._entradas),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+            }
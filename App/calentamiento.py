@@ -0,0 +1,127 @@
+# Librerias
+import threading
+import time
+import cache_datos as cache
+import consultas
+import geografia
+import parametros
+
+###########################################################
+# PRE-CALENTAMIENTO DE LA BODEGA Y DE LOS CACHES
+###########################################################
+
+# Cuando un usuario abre la página de Documentos se reanuda la bodega de Snowflake (si está suspendida) y se
+# cargan los caches de geografía y parámetros en un hilo de fondo, para que el primer informe no pague esa espera.
+
+# Segundos mínimos entre dos calentamientos (la bodega se suspende tras varios minutos sin uso)
+CALENTAMIENTO_INTERVALO = 120
+# Segundos que se espera una sesión libre del pool para calentar
+CALENTAMIENTO_ESPERA_SESION = 5
+# Latencia (segundos) por encima de la cual se considera que la consulta tuvo que reanudar la bodega
+CALENTAMIENTO_UMBRAL_REANUDACION = 1.0
+
+# Consulta trivial que necesita la bodega: RANDOM() impide que Snowflake la responda desde el cache de resultados
+QUERY_CALENTAMIENTO = """
+SELECT COUNT(*) AS N
+FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS AS A
+WHERE A.VALOR IS NOT NULL AND RANDOM() IS NOT NULL
+"""
+
+
+class CalentadorBodega:
+    """
+    Lanza, sin bloquear la página, una consulta trivial para reanudar la bodega y la carga de los caches
+    compartidos. Estima el tiempo de reanudación que se ocultó al usuario comparando la latencia de la primera
+    consulta con la de una repetición inmediata (ya con la bodega activa).
+
+    Parámetros:
+    - intervalo (int): Segundos mínimos entre calentamientos.
+    """
+
+    def __init__(self, intervalo=CALENTAMIENTO_INTERVALO):
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._en_curso = False
+        self._ultimo = None
+        self.calentamientos = 0
+        self.reanudaciones = 0
+        self.segundos_ocultos = 0.0
+        self.ultimo_oculto = 0.0
+        self.errores = 0
+
+    def calentar(self, pool):
+        """
+        Inicia un calentamiento en un hilo de fondo si no hay uno en curso ni uno reciente. Retorna de inmediato.
+
+        Parámetros:
+        - pool (sesiones.PoolSesiones): Pool del que se toma una sesión libre (no la del usuario).
+
+        Retorna:
+        - bool: True si se inició un calentamiento.
+        """
+        ahora = time.monotonic()
+        with self._lock:
+            if self._en_curso or (self._ultimo is not None and (ahora - self._ultimo) < self.intervalo):
+                return False
+            self._en_curso = True
+            self._ultimo = ahora
+        hilo = threading.Thread(target=self._calentar, args=(pool,), name='calentamiento_bodega', daemon=True)
+        hilo.start()
+        return True
+
+    def _calentar(self, pool):
+        sesion = None
+        try:
+            sesion = pool.tomar(espera_max=CALENTAMIENTO_ESPERA_SESION)
+            if sesion is None:
+                return
+
+            # Reanudar la bodega y medir cuánto tardó respecto a una consulta con la bodega activa
+            with consultas.etapa('calentamiento'):
+                inicio = time.perf_counter()
+                consultas.ejecutar(sesion, QUERY_CALENTAMIENTO, plantilla='calentamiento')
+                primera = time.perf_counter() - inicio
+                inicio = time.perf_counter()
+                consultas.ejecutar(sesion, QUERY_CALENTAMIENTO, plantilla='calentamiento')
+                activa = time.perf_counter() - inicio
+                oculto = max(primera - activa, 0.0)
+
+                # Cargar los caches compartidos de la publicación de datos vigente
+                cache.obtener_version_datos(sesion)
+                geografia.obtener_geografia(sesion)
+                parametros.obtener_parametros(sesion)
+
+            with self._lock:
+                self.calentamientos += 1
+                self.ultimo_oculto = oculto
+                if primera >= CALENTAMIENTO_UMBRAL_REANUDACION:
+                    self.reanudaciones += 1
+                    self.segundos_ocultos += oculto
+            print(f"Calentamiento de la bodega: {primera:.2f} s (activa {activa:.2f} s, reanudación oculta {oculto:.2f} s)")
+        except Exception as e:
+            with self._lock:
+                self.errores += 1
+            print(f"Error en el calentamiento de la bodega: {e}")
+        finally:
+            if sesion is not None:
+                pool.devolver(sesion)
+            with self._lock:
+                self._en_curso = False
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con el número de calentamientos, las reanudaciones detectadas y los segundos
+        de reanudación ocultos al usuario.
+        """
+        with self._lock:
+            return {
+                'calentamientos': self.calentamientos,
+                'reanudaciones': self.reanudaciones,
+                'segundos_ocultos': round(self.segundos_ocultos, 3),
+                'ultimo_oculto': round(self.ultimo_oculto, 3),
+                'errores': self.errores,
+            }
+
+
+# Calentador compartido por todas las sesiones del proceso
+calentador = CalentadorBodega()
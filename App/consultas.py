@@ -0,0 +1,247 @@
+# Librerias
+import contextvars
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+import trazas
+
+#####################################################
+# EJECUCIÓN INSTRUMENTADA DE CONSULTAS A SNOWFLAKE
+#####################################################
+
+# Todas las consultas de datos, verificaciones, dimensiones y parámetros pasan por `ejecutar`, que registra
+# la plantilla, el hash del texto normalizado, la latencia, las filas, el tamaño del resultado y la etapa
+# que la originó. Los registros se escriben como líneas JSON y se conservan en un buffer circular en memoria,
+# de modo que cada reporte tiene su línea de tiempo de consultas.
+
+# Archivo de registros (una línea JSON por consulta), compartido por los procesos del servidor
+CONSULTAS_LOG = os.environ.get('TRES_EJES_CONSULTAS_LOG', os.path.join(tempfile.gettempdir(), 'tres_ejes_consultas.jsonl'))
+# Tamaño (bytes) a partir del cual el archivo se rota a <archivo>.1
+CONSULTAS_LOG_MAX = 50 * 1024 * 1024
+# Número de registros que se conservan en memoria
+CONSULTAS_BUFFER = 5000
+# Número de consultas más lentas que se muestran en el resumen de cada reporte
+CONSULTAS_MAS_LENTAS = 5
+
+# Etapa y reporte en curso en el hilo (o tarea) que ejecuta la consulta
+_etapa = contextvars.ContextVar('etapa_consulta', default=None)
+_reporte = contextvars.ContextVar('reporte_consulta', default=None)
+
+# Normalización del texto: literales y números se reemplazan por ?, las listas de ? se reducen a uno
+_LITERALES = re.compile(r"'(?:[^']|'')*'")
+_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTAS = re.compile(r"\?(?:\s*,\s*\?)+")
+_ESPACIOS = re.compile(r"\s+")
+
+
+def normalizar_consulta(query):
+    """
+    Retorna el texto de la consulta sin literales, números ni espacios repetidos, de modo que las consultas
+    de una misma plantilla para distintas unidades tengan el mismo texto normalizado.
+    """
+    texto = _LITERALES.sub('?', query)
+    texto = _NUMEROS.sub('?', texto)
+    texto = _LISTAS.sub('?', texto)
+    return _ESPACIOS.sub(' ', texto).strip().rstrip(';').strip().upper()
+
+
+def hash_consulta(query):
+    """
+    Retorna el hash (sha1, 16 caracteres) del texto normalizado de la consulta.
+    """
+    return hashlib.sha1(normalizar_consulta(query).encode('utf-8')).hexdigest()[:16]
+
+
+def tamano_resultado(resultado):
+    """
+    Estima el tamaño en memoria (bytes) del resultado de una consulta: DataFrame de pandas o lista de filas.
+    """
+    if hasattr(resultado, 'memory_usage'):
+        return int(resultado.memory_usage(index=False, deep=True).sum())
+    return sum(sys.getsizeof(valor) for fila in resultado for valor in fila)
+
+
+@contextmanager
+def etapa(nombre):
+    """
+    Marca las consultas ejecutadas dentro del bloque con la etapa `nombre` (p. ej. 'verif_ejes', 'exportaciones').
+    """
+    token = _etapa.set(nombre)
+    try:
+        yield
+    finally:
+        _etapa.reset(token)
+
+
+@contextmanager
+def reporte(etiqueta):
+    """
+    Agrupa las consultas ejecutadas dentro del bloque bajo un identificador de reporte y, al terminar,
+    imprime su resumen (número de consultas, tiempo total y consultas más lentas).
+
+    Parámetros:
+    - etiqueta (str): Descripción del reporte (p. ej. 'PAISES - Chile').
+
+    Retorna:
+    - str: Identificador del reporte, con el que se consulta su línea de tiempo en `registro_consultas`.
+    """
+    id_reporte = uuid.uuid4().hex[:12]
+    token = _reporte.set(id_reporte)
+    try:
+        yield id_reporte
+    finally:
+        _reporte.reset(token)
+        resumen = registro_consultas.resumen(id_reporte)
+        if resumen['consultas']:
+            lentas = ', '.join(f"{r['plantilla']}: {r['segundos']:.2f} s" for r in resumen['mas_lentas'])
+            print(f"Consultas del reporte {etiqueta} ({id_reporte}): {resumen['consultas']} en {resumen['segundos']:.2f} s, "
+                  f"{resumen['filas']} filas (más lentas: {lentas})")
+
+
+class RegistroConsultas:
+    """
+    Registro de las consultas ejecutadas: buffer circular en memoria y archivo de líneas JSON.
+
+    Parámetros:
+    - ruta (str): Archivo de registros. Si es None solo se conserva el buffer en memoria.
+    - capacidad (int): Número de registros que se conservan en memoria.
+    - tamano_max (int): Tamaño del archivo a partir del cual se rota.
+    """
+
+    def __init__(self, ruta=CONSULTAS_LOG, capacidad=CONSULTAS_BUFFER, tamano_max=CONSULTAS_LOG_MAX):
+        self.ruta = ruta
+        self.tamano_max = tamano_max
+        self._buffer = deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.errores = 0
+        self.errores_log = 0
+
+    def _escribir(self, linea):
+        # Se llama con el bloqueo tomado
+        try:
+            if os.path.exists(self.ruta) and os.path.getsize(self.ruta) >= self.tamano_max:
+                os.replace(self.ruta, f"{self.ruta}.1")
+            with open(self.ruta, 'a', encoding='utf-8') as f:
+                f.write(linea + '\n')
+        except OSError as e:
+            self.errores_log += 1
+            if self.errores_log == 1:
+                print(f"Error escribiendo el registro de consultas en {self.ruta}: {e}")
+
+    def registrar(self, registro):
+        """
+        Agrega el registro de una consulta al buffer y al archivo.
+        """
+        linea = json.dumps(registro, ensure_ascii=False, default=str)
+        with self._lock:
+            self._buffer.append(registro)
+            self.consultas += 1
+            if registro.get('error'):
+                self.errores += 1
+            if self.ruta:
+                self._escribir(linea)
+
+    def recientes(self, n=100):
+        """
+        Retorna los últimos `n` registros en memoria.
+        """
+        with self._lock:
+            return list(self._buffer)[-n:]
+
+    def linea_tiempo(self, id_reporte):
+        """
+        Retorna los registros de un reporte ordenados por inicio, con el desfase (segundos) respecto a la primera consulta.
+        """
+        with self._lock:
+            registros = [dict(r) for r in self._buffer if r['reporte'] == id_reporte]
+        registros.sort(key=lambda r: r['inicio'])
+        if registros:
+            origen = registros[0]['inicio']
+            for r in registros:
+                r['desfase'] = round(r['inicio'] - origen, 4)
+        return registros
+
+    def resumen(self, id_reporte):
+        """
+        Retorna el número de consultas, los segundos acumulados, las filas, los bytes y las consultas más lentas de un reporte.
+        """
+        registros = self.linea_tiempo(id_reporte)
+        return {
+            'consultas': len(registros),
+            'segundos': round(sum(r['segundos'] for r in registros), 4),
+            'filas': sum(r['filas'] for r in registros),
+            'bytes': sum(r['bytes'] for r in registros),
+            'mas_lentas': sorted(registros, key=lambda r: r['segundos'], reverse=True)[:CONSULTAS_MAS_LENTAS],
+        }
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con el número de consultas registradas, los errores y los registros en memoria.
+        """
+        with self._lock:
+            return {
+                'consultas': self.consultas,
+                'errores': self.errores,
+                'en_memoria': len(self._buffer),
+                'errores_log': self.errores_log,
+            }
+
+
+def ejecutar(session, query, plantilla, como='filas'):
+    """
+    Ejecuta una consulta en Snowflake y registra su plantilla, hash normalizado, latencia, filas, tamaño y etapa.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+    - query (str): Consulta SQL a ejecutar.
+    - plantilla (str): Nombre de la plantilla de consulta (p. ej. 'ST_CATEGORIAS_CERRADO', 'verif_ejes.existencia_lote').
+    - como (str): 'filas' retorna la lista de Row (collect); 'pandas' retorna un DataFrame (to_pandas).
+
+    Retorna:
+    - list o pandas.DataFrame: Resultado de la consulta.
+    """
+    inicio_reloj = time.time()
+    inicio_traza = trazas.ahora()
+    inicio = time.perf_counter()
+    resultado, error = None, None
+    try:
+        if como == 'pandas':
+            resultado = session.sql(query).to_pandas()
+        else:
+            resultado = session.sql(query).collect()
+        return resultado
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        segundos = time.perf_counter() - inicio
+        filas = len(resultado) if resultado is not None else 0
+        trazas.registrar(plantilla, 'consulta', inicio_traza, trazas.ahora(), {'filas': filas, 'hash': hash_consulta(query)})
+        registro_consultas.registrar({
+            'inicio': round(inicio_reloj, 6),
+            'fecha': datetime.fromtimestamp(inicio_reloj).isoformat(timespec='milliseconds'),
+            'reporte': _reporte.get(),
+            'etapa': _etapa.get(),
+            'plantilla': plantilla,
+            'hash': hash_consulta(query),
+            'segundos': round(segundos, 6),
+            'filas': filas,
+            'bytes': tamano_resultado(resultado) if resultado is not None else 0,
+            'pid': os.getpid(),
+            'hilo': threading.current_thread().name,
+            'error': error,
+        })
+
+
+# Registro compartido por todas las sesiones del proceso
+registro_consultas = RegistroConsultas()
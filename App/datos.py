@@ -2,15 +2,24 @@
 import pandas as pd
 import numpy as np
 import numbers
-from decimal import Decimal
+import time
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 # import snowflake.connector # [pip install snowflake-connector-python]
 from snowflake.connector.pandas_tools import write_pandas # [pip install "snowflake-connector-python[pandas]"]
 from snowflake.snowpark import Session
+import cache_datos as cache
+import consultas
+import trazas
+import geografia
+import parametros
+import libro_excel
 
 ######################################################
 # FUNCIONES PARA OBTENER Y TRANSFORMAR DATOS TRES EJES
 ######################################################
 
+@trazas.trazar
 def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs=None, tlcs=None, departamentos=None, umbral=None):
     """
     Extrae datos desde Snowflake aplicando filtros específicos y devuelve nombres de columnas para usar como parámetros en consultas posteriores.
@@ -37,6 +46,9 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
         if param is not None and not isinstance(param, list):
             raise ValueError(f"El parámetro '{param_name}' debe ser una lista o None")
 
+    # Las tablas de GEOGRAFIA se resuelven en memoria desde el store compartido (no se requieren para COLOMBIA)
+    geo = geografia.obtener_geografia(session) if agrupacion != 'COLOMBIA' else None
+
     # Retornar parámetros según la agrupación seleccionada
 
     # Caso 'COLOMBIA': retorna solo la agrupación porque incluye todas las bases de los tres ejes
@@ -49,16 +61,8 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
         if not departamentos:
             raise ValueError("El parámetro 'departamentos' es requerido cuando 'agrupacion' es 'DEPARTAMENTOS'")
 
-        # Obtener datos de departamentos desde la tabla en Snowflake
-        df_dept = session.table('DOCUMENTOS_COLOMBIA.GEOGRAFIA.DIAN_DEPARTAMENTOS').select(
-            'COD_DIAN_DEPARTAMENTO',  # Código del departamento según DIAN
-            'DEPARTAMENTO_DIAN'       # Nombre del departamento según DIAN
-        )
-        # Filtrar los departamentos según la lista proporcionada
-        df_dept = df_dept.filter(df_dept['DEPARTAMENTO_DIAN'].isin(departamentos))
-
-        # Convertir el DataFrame de Snowflake a un DataFrame de pandas para manipulación
-        data_dept_df = df_dept.to_pandas()
+        # Obtener los departamentos seleccionados (código y nombre según DIAN)
+        data_dept_df = geo.filtrar('DIAN_DEPARTAMENTOS', 'DEPARTAMENTO_DIAN', departamentos)
 
         if not data_dept_df.empty:
             # Extraer nombres y códigos únicos de los departamentos
@@ -66,16 +70,7 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
             unidad_cod = data_dept_df['COD_DIAN_DEPARTAMENTO'].dropna().unique().tolist()
 
             # Obtener municipios asociados a los departamentos seleccionados
-            df_mun = session.table('DOCUMENTOS_COLOMBIA.GEOGRAFIA.DIVIPOLA_DEPARTAMENTOS_MUNICIPIOS').select(
-                'COD_DANE_DEPARTAMENTO',  # Código DANE del departamento
-                'MUNICIPIO_DANE',         # Nombre del municipio según DANE
-                'COD_DANE_MUNICIPIO'      # Código DANE del municipio
-            )
-            # Filtrar municipios que pertenecen a los departamentos seleccionados
-            df_mun = df_mun.filter(df_mun['COD_DANE_DEPARTAMENTO'].isin(unidad_cod))
-
-            # Convertir el DataFrame de Snowflake a un DataFrame de pandas
-            data_mun_df = df_mun.to_pandas()
+            data_mun_df = geo.filtrar('DIVIPOLA_DEPARTAMENTOS_MUNICIPIOS', 'COD_DANE_DEPARTAMENTO', unidad_cod)
 
             if not data_mun_df.empty:
                 # Extraer códigos y nombres únicos de los municipios
@@ -124,16 +119,8 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
             if not continentes:
                 raise ValueError("El parámetro 'continentes' es requerido cuando 'agrupacion' es 'CONTINENTES'")
 
-            # Obtener datos de continentes desde la tabla en Snowflake
-            df = session.table('DOCUMENTOS_COLOMBIA.GEOGRAFIA.CONTINENTES').select(
-                'REGION_NAME',                    # Nombre de la región
-                'REGION_NAME_EXPORTACIONES',      # Nombre de la región para exportaciones
-                'REGION_NAME_TURISMO_AGREGADA'    # Nombre de la región para turismo
-            )
-            # Filtrar los continentes según la lista proporcionada
-            df = df.filter(df['REGION_NAME'].isin(continentes))
-            # Convertir el DataFrame de Snowflake a un DataFrame de pandas
-            data_df = df.to_pandas()
+            # Obtener los continentes seleccionados con sus nombres para exportaciones y turismo
+            data_df = geo.filtrar('CONTINENTES', 'REGION_NAME', continentes)
 
             if not data_df.empty:
                 # Extraer nombres únicos para exportaciones y turismo
@@ -152,16 +139,8 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
             if not hubs:
                 raise ValueError("El parámetro 'hubs' es requerido cuando 'agrupacion' es 'HUBS'")
 
-            # Obtener datos de hubs desde la tabla en Snowflake
-            df = session.table('DOCUMENTOS_COLOMBIA.GEOGRAFIA.HUBS').select(
-                'NOMBRE_HUB',                # Nombre del hub
-                'HUB_NAME_EXPORTACIONES',    # Nombre del hub para exportaciones
-                'HUB_NAME_TURISMO'           # Nombre del hub para turismo
-            )
-            # Filtrar los hubs según la lista proporcionada
-            df = df.filter(df['NOMBRE_HUB'].isin(hubs))
-            # Convertir el DataFrame de Snowflake a un DataFrame de pandas
-            data_df = df.to_pandas()
+            # Obtener los hubs seleccionados con sus nombres para exportaciones y turismo
+            data_df = geo.filtrar('HUBS', 'NOMBRE_HUB', hubs)
 
             if not data_df.empty:
                 # Extraer nombres únicos de hubs para exportaciones y turismo
@@ -180,15 +159,8 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
             if not paises:
                 raise ValueError("El parámetro 'paises' es requerido cuando 'agrupacion' es 'PAISES'")
 
-            # Obtener datos de países desde la tabla en Snowflake
-            df = session.table('DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES').select(
-                'COUNTRY_OR_AREA',           # Nombre real del país
-                'PAIS_LLAVE_EXPORTACIONES'   # Nombre del país para exportaciones
-            )
-            # Filtrar los países según la lista proporcionada
-            df = df.filter(df['COUNTRY_OR_AREA'].isin(paises))
-            # Convertir el DataFrame de Snowflake a un DataFrame de pandas
-            data_df = df.to_pandas()
+            # Obtener los países seleccionados (nombre real y nombre para exportaciones)
+            data_df = geo.filtrar('ST_PAISES', 'COUNTRY_OR_AREA', paises)
 
             if not data_df.empty:
                 # Extraer nombres únicos para exportaciones
@@ -207,28 +179,15 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
             # La unidad será la lista de TLCs proporcionada
             unidad = tlcs
 
-        # Obtener datos de países para inversión
-        df_inversion = session.table('DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES').select(
-            'PAIS_INVERSION_BANREP',      # Nombre del país para inversión
-            'COUNTRY_OR_AREA',            # Nombre real del país
-            'M49_CODE',                   # Código M49 del país
-            'REGION_NAME_EXPORTACIONES',  # Región para exportaciones
-            'HUB_NAME_EXPORTACIONES',     # Hub para exportaciones
-            'NOMBRE_TLC'                  # Nombre del TLC
-        )
-
-        # Aplicar filtros según los parámetros proporcionados y la agrupación
+        # Obtener datos de países para inversión según la agrupación
         if agrupacion == 'CONTINENTES':
-            df_inversion = df_inversion.filter(df_inversion['REGION_NAME_EXPORTACIONES'].isin(param_continente_exportaciones))
-        if agrupacion == 'HUBS':
-            df_inversion = df_inversion.filter(df_inversion['HUB_NAME_EXPORTACIONES'].isin(param_hub_exportaciones))
-        if agrupacion == 'PAISES':
-            df_inversion = df_inversion.filter(df_inversion['COUNTRY_OR_AREA'].isin(paises))
-        if agrupacion == 'TLCS':
-            df_inversion = df_inversion.filter(df_inversion['NOMBRE_TLC'].isin(tlcs))
-
-        # Convertir el DataFrame de Snowflake a un DataFrame de pandas
-        data_inversion_df = df_inversion.to_pandas()
+            data_inversion_df = geo.filtrar('ST_PAISES', 'REGION_NAME_EXPORTACIONES', param_continente_exportaciones)
+        elif agrupacion == 'HUBS':
+            data_inversion_df = geo.filtrar('ST_PAISES', 'HUB_NAME_EXPORTACIONES', param_hub_exportaciones)
+        elif agrupacion == 'PAISES':
+            data_inversion_df = geo.filtrar('ST_PAISES', 'COUNTRY_OR_AREA', paises)
+        else:  # 'TLCS'
+            data_inversion_df = geo.filtrar('ST_PAISES', 'NOMBRE_TLC', tlcs)
 
         if not data_inversion_df.empty:
             # Extraer listas únicas de países para inversión y códigos M49
@@ -243,28 +202,15 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
             paises_m49 = []
             paises_anexo_str = ''
 
-        # Obtener datos de países para turismo
-        df_turismo = session.table('DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES').select(
-            'CODIGO_PAIS_MIGRACION',      # Código del país para migración
-            'NOMBRE_PAIS_MIGRACION',      # Nombre del país para migración
-            'REGION_NAME_TURISMO_AGREGADA',  # Región para turismo
-            'HUB_NAME_TURISMO',           # Hub para turismo
-            'COUNTRY_OR_AREA',            # Nombre real del país
-            'NOMBRE_TLC'                  # Nombre del TLC
-        )
-
-        # Aplicar filtros según los parámetros proporcionados y la agrupación
+        # Obtener datos de países para turismo según la agrupación
         if agrupacion == 'CONTINENTES':
-            df_turismo = df_turismo.filter(df_turismo['REGION_NAME_TURISMO_AGREGADA'].isin(param_continente_turismo))
-        if agrupacion == 'HUBS':
-            df_turismo = df_turismo.filter(df_turismo['HUB_NAME_TURISMO'].isin(param_hub_turismo))
-        if agrupacion == 'PAISES':
-            df_turismo = df_turismo.filter(df_turismo['COUNTRY_OR_AREA'].isin(paises))
-        if agrupacion == 'TLCS':
-            df_turismo = df_turismo.filter(df_turismo['NOMBRE_TLC'].isin(tlcs))
-
-        # Convertir el DataFrame de Snowflake a un DataFrame de pandas
-        data_turismo_df = df_turismo.to_pandas()
+            data_turismo_df = geo.filtrar('ST_PAISES', 'REGION_NAME_TURISMO_AGREGADA', param_continente_turismo)
+        elif agrupacion == 'HUBS':
+            data_turismo_df = geo.filtrar('ST_PAISES', 'HUB_NAME_TURISMO', param_hub_turismo)
+        elif agrupacion == 'PAISES':
+            data_turismo_df = geo.filtrar('ST_PAISES', 'COUNTRY_OR_AREA', paises)
+        else:  # 'TLCS'
+            data_turismo_df = geo.filtrar('ST_PAISES', 'NOMBRE_TLC', tlcs)
 
         if not data_turismo_df.empty:
             # Extraer listas únicas de códigos y nombres de países para turismo
@@ -304,7 +250,8 @@ def get_data_parametros(session, agrupacion, continentes=None, paises=None, hubs
         # Si la agrupación no es reconocida, lanza un error
         raise ValueError(f"Agrupación '{agrupacion}' no reconocida. Opciones válidas: 'CONTINENTES', 'PAISES', 'HUBS', 'TLCS', 'DEPARTAMENTOS', 'COLOMBIA'.")
 
-def verif_ejes(session, params):
+@trazas.trazar
+def verif_ejes(session, params, modo='lote'):
     """
     Función para verificar la existencia de datos en diferentes categorías (exportaciones, inversión y turismo)
     agrupados por diferentes criterios (CONTINENTES, HUBS, TLCS, PAISES, DEPARTAMENTOS). La función ejecuta
@@ -315,10 +262,15 @@ def verif_ejes(session, params):
     - session: Sesión activa de Snowflake.
     - params: Diccionario con los parámetros necesarios para ejecutar las consultas, incluyendo AGRUPACION,
               UNIDAD, UMBRAL, PAISES_INVERSION, PAISES_TURISMO_COD, y UNIDAD_COD.
+    - modo (str): 'lote' (por defecto) resuelve todas las verificaciones en una sola consulta a Snowflake;
+                  'secuencial' ejecuta una consulta por indicador. Si la consulta en lote falla se usa el modo secuencial.
 
     Retorna:
     - dict_verif: Diccionario con los resultados de la verificación, indicando si hay datos disponibles o no
                   para cada categoría y periodo.
+
+    Lanza:
+    - RuntimeError: Si alguna verificación no se pudo ejecutar (no se marca como SIN DATOS).
     """
 
     # 1. Obtener los parámetros según sea la agrupación y unidad
@@ -342,14 +294,27 @@ def verif_ejes(session, params):
     # 3. Diccionario para almacenar los resultados
     dict_verif = {}
 
-    # 4. Definir función auxiliar para verificar existencia de datos sin descargar todo el conjunto
-    def data_exists(query):
+    # 4. Definir funciones auxiliares para verificar existencia de datos sin descargar todo el conjunto
+    def data_exists(key, query):
+        # Retorna None si la verificación falló (p. ej. por un error transitorio de la bodega), para no
+        # confundirla con una unidad sin datos
         try:
             exists_query = f"SELECT 1 FROM ({query}) AS subquery LIMIT 1"
-            result = session.sql(exists_query).collect()
+            result = consultas.ejecutar(session, exists_query, plantilla=f'verif_ejes.{key}')
             return bool(result)
-        except Exception:
-            return False
+        except Exception as e:
+            print(f"Error verificando {key}: {e}")
+            return None
+
+    def data_exists_lote(consultas_verif):
+        # Cada consulta se convierte en una columna booleana de un único SELECT, de modo que todas
+        # las verificaciones se resuelven en un solo viaje a Snowflake
+        columnas = ',\n'.join(
+            f"(SELECT COUNT(*) FROM ({query}) AS subquery_{i}) > 0 AS {key.upper()}"
+            for i, (key, query) in enumerate(consultas_verif.items())
+        )
+        fila = consultas.ejecutar(session, f"SELECT {columnas}", plantilla='verif_ejes.lote')[0]
+        return {key: bool(fila[i]) for i, key in enumerate(consultas_verif)}
 
     # 5. Definir mapeo de cadenas para indicadores de datos
     indicadores_con_datos = {
@@ -411,6 +376,9 @@ def verif_ejes(session, params):
     # 6. El siguiente proceso no es válido para la agrupación de COLOMBIA ya que esta siempre tiene datos
     if AGRUPACION != 'COLOMBIA':
 
+        # Consultas de verificación por indicador; se ejecutan todas al final
+        consultas_verif = {}
+
         # --------------------
         # Verificación de Exportaciones
         # --------------------
@@ -451,14 +419,8 @@ def verif_ejes(session, params):
             """
         }
 
-        # Ejecutar consultas de exportaciones
-        for key, query in export_queries.items():
-            if key in indicadores_con_datos:
-                dict_verif[key] = (
-                    indicadores_con_datos[key]
-                    if data_exists(query)
-                    else indicadores_sin_datos[key]
-                )
+        # Agregar consultas de exportaciones
+        consultas_verif.update(export_queries)
 
         # --------------------
         # Verificación de Inversión
@@ -487,14 +449,8 @@ def verif_ejes(session, params):
                 """
             }
 
-            # Ejecutar consultas de inversión
-            for key, query in inversion_queries.items():
-                if key in indicadores_con_datos:
-                    dict_verif[key] = (
-                        indicadores_con_datos[key]
-                        if data_exists(query)
-                        else indicadores_sin_datos[key]
-                    )
+            # Agregar consultas de inversión
+            consultas_verif.update(inversion_queries)
 
         # ----------------------
         # Verificación de UNCTAD
@@ -513,14 +469,8 @@ def verif_ejes(session, params):
                 """
             }
 
-            # Ejecutar consultas de unctad
-            for key, query in unctad_queries.items():
-                if key in indicadores_con_datos:
-                    dict_verif[key] = (
-                        indicadores_con_datos[key]
-                        if data_exists(query)
-                        else indicadores_sin_datos[key]
-                    )
+            # Agregar consultas de unctad
+            consultas_verif.update(unctad_queries)
 
         # -----------------------
         # Verificación de Balanza
@@ -533,14 +483,8 @@ def verif_ejes(session, params):
                 """
             }
 
-            # Ejecutar consultas de unctad
-            for key, query in balanza_queries.items():
-                if key in indicadores_con_datos:
-                    dict_verif[key] = (
-                        indicadores_con_datos[key]
-                        if data_exists(query)
-                        else indicadores_sin_datos[key]
-                    )   
+            # Agregar consultas de balanza
+            consultas_verif.update(balanza_queries)
         
 
         # --------------------
@@ -565,14 +509,8 @@ def verif_ejes(session, params):
                 turismo_queries['turismo_cerrado'] += " LIMIT 1"
                 turismo_queries['turismo_corrido'] += " LIMIT 1"
 
-            # Ejecutar consultas de turismo
-            for key, query in turismo_queries.items():
-                if key in indicadores_con_datos:
-                    dict_verif[key] = (
-                        indicadores_con_datos[key]
-                        if data_exists(query)
-                        else indicadores_sin_datos[key]
-                    )
+            # Agregar consultas de turismo
+            consultas_verif.update(turismo_queries)
 
         # --------------------
         # Verificación de Conectividad (solo para DEPARTAMENTOS)
@@ -583,12 +521,7 @@ def verif_ejes(session, params):
                 WHERE COD_DIVIPOLA_DEPARTAMENTO_DESTINO IN ({DEPARTAMENTOS_TURISMO_sql}) LIMIT 1
             """
 
-            if 'conectividad' in indicadores_con_datos and 'conectividad' in indicadores_sin_datos:
-                dict_verif['conectividad'] = (
-                    indicadores_con_datos['conectividad']
-                    if data_exists(query_conectividad)
-                    else indicadores_sin_datos['conectividad']
-                )       
+            consultas_verif['conectividad'] = query_conectividad
         
         # Crear consulta en caso de que sea Bogotá para capturar la conectividad de Cundinamarca
         if UNIDAD == 'Bogotá':
@@ -597,12 +530,7 @@ def verif_ejes(session, params):
                 WHERE COD_DIVIPOLA_DEPARTAMENTO_DESTINO IN ('25') LIMIT 1
             """      
 
-            if 'conectividad' in indicadores_con_datos and 'conectividad' in indicadores_sin_datos:
-                dict_verif['conectividad'] = (
-                    indicadores_con_datos['conectividad']
-                    if data_exists(query_conectividad)
-                    else indicadores_sin_datos['conectividad']
-                )
+            consultas_verif['conectividad'] = query_conectividad
 
         # --------------------
         # Verificación de Oportunidades
@@ -645,32 +573,20 @@ def verif_ejes(session, params):
                 query_oportunidades += f" AND A.PAIS IN ('{UNIDAD}')"
             # TLCS
             elif AGRUPACION == 'TLCS':
-                # Obtener países llave
-                df_llave = pd.DataFrame(
-                        session.sql(f"""
-                            SELECT DISTINCT A.PAIS_LLAVE_EXPORTACIONES 
-                            FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS A 
-                            WHERE A.NOMBRE_TLC = '{UNIDAD}'
-                        """).collect()
-                    )
-                # Obtener string de búsqueda de países
-                PAISES = df_llave['PAIS_LLAVE_EXPORTACIONES'].dropna().unique().tolist()
-                PAISES_sql = ', '.join(f"'{pais}'" for pais in PAISES)
-                # Agregar filtro de tlcs
-                query_oportunidades += f" AND A.PAIS IN ({PAISES_sql})"
+                # Agregar filtro de tlcs con los países llave del TLC como subconsulta (evita una consulta adicional)
+                query_oportunidades += f"""
+                    AND A.PAIS IN (
+                        SELECT DISTINCT B.PAIS_LLAVE_EXPORTACIONES
+                        FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS B
+                        WHERE B.NOMBRE_TLC = '{UNIDAD}' AND B.PAIS_LLAVE_EXPORTACIONES IS NOT NULL
+                    )"""
                 
             elif AGRUPACION == 'DEPARTAMENTOS' and DEPARTAMENTOS_TURISMO:
                 query_oportunidades += f" AND A.COD_DIVIPOLA_DEPARTAMENTO IN ({DEPARTAMENTOS_TURISMO_sql})"
             query_oportunidades += " LIMIT 1"
 
-            # Verificar si existen indicadores definidos para la clave actual
-            if key in indicadores_con_datos and key in indicadores_sin_datos:
-                # Ejecutar consulta y asignar el indicador correspondiente
-                dict_verif[key] = (
-                    indicadores_con_datos[key]
-                    if data_exists(query_oportunidades)
-                    else indicadores_sin_datos[key]
-                )
+            # Agregar consulta de oportunidades
+            consultas_verif[key] = query_oportunidades
 
 
         # --------------------
@@ -688,12 +604,32 @@ def verif_ejes(session, params):
                 SELECT 1 FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.{dataset}
                 WHERE TABLA = '{tabla}' AND AGRUPACION = '{AGRUPACION}' AND UNIDAD = '{UNIDAD}' LIMIT 1
             """
+            consultas_verif[key] = query_pesos
+
+        # --------------------
+        # Ejecución de las verificaciones
+        # --------------------
+        inicio = time.perf_counter()
+        resultados = None
+        if modo == 'lote':
+            try:
+                resultados = data_exists_lote(consultas_verif)
+            except Exception as e:
+                print(f"Error en la verificación en lote, se usa el modo secuencial: {e}")
+                modo = 'secuencial'
+        if resultados is None:
+            resultados = {key: data_exists(key, query) for key, query in consultas_verif.items()}
+
+        # Una verificación fallida no se reporta como SIN DATOS: el error se propaga y el resultado no se guarda en cache
+        fallidas = [key for key, existe in resultados.items() if existe is None]
+        if fallidas:
+            raise RuntimeError(f"No se pudo verificar la disponibilidad de datos de {AGRUPACION} - {UNIDAD}: {', '.join(fallidas)}")
+
+        for key, existe in resultados.items():
             if key in indicadores_con_datos and key in indicadores_sin_datos:
-                dict_verif[key] = (
-                    indicadores_con_datos[key]
-                    if data_exists(query_pesos)
-                    else indicadores_sin_datos[key]
-                )
+                dict_verif[key] = indicadores_con_datos[key] if existe else indicadores_sin_datos[key]
+
+        print(f"verif_ejes ({modo}) {AGRUPACION} - {UNIDAD}: {len(consultas_verif)} verificaciones en {time.perf_counter() - inicio:.2f} s")
 
     else:
         # Si la agrupación es COLOMBIA, se asume que siempre hay datos
@@ -719,6 +655,115 @@ def verif_ejes(session, params):
 
 
 
+# Cache de verificaciones compartido por todas las sesiones del proceso
+cache_verificacion = cache.CacheVersionada('verif_ejes')
+
+@trazas.trazar
+def obtener_verificacion(session, params):
+    """
+    Devuelve el diccionario de verificación de datos para la agrupación y unidad de `params`, calculándolo
+    con verif_ejes solo una vez por unidad y por publicación de datos. Si alguna verificación falla, verif_ejes
+    lanza RuntimeError y nada se guarda en cache, de modo que la siguiente solicitud vuelve a verificar.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+    - params: Diccionario de parámetros geográficos generado por get_data_parametros.
+
+    Retorna:
+    - dict_verif: Copia del diccionario de verificación (mismo formato que verif_ejes).
+    """
+    clave = (params['AGRUPACION'], params['UNIDAD'][0])
+    version = cache.obtener_version_datos(session)
+
+    def calcular():
+        with consultas.etapa('verif_ejes'):
+            return verif_ejes(session, params)
+
+    dict_verif = cache_verificacion.obtener(clave, version, calcular)
+    # Se retorna una copia para que ningún consumidor modifique el valor compartido
+    return dict(dict_verif)
+
+# Esquema numérico declarado de las columnas que devuelven las consultas de los tres ejes.
+# Las medidas se leen como float64 y los conteos como int64; las columnas no declaradas conservan el tipo de Arrow.
+ESQUEMA_NUMERICO = {
+    'SUMA_USD_T_1': 'float64',
+    'SUMA_USD_T': 'float64',
+    'SUMA_PESO_T_1': 'float64',
+    'SUMA_PESO_T': 'float64',
+    'SUMA_INVERSION_T_1': 'float64',
+    'SUMA_INVERSION_T': 'float64',
+    'SUMA_TURISMO_T_1': 'float64',
+    'SUMA_TURISMO_T': 'float64',
+    'DIFERENCIA_PORCENTUAL': 'float64',
+    'DIFERENCIA_PORCENTUAL_T': 'float64',
+    'VALOR': 'float64',
+    'RANKING': 'int64',
+    'CONTEO_T': 'int64',
+    'Frecuencias': 'int64',
+}
+
+def aplicar_esquema(df, esquema=ESQUEMA_NUMERICO):
+    """
+    Ajusta los tipos de un DataFrame al esquema numérico declarado.
+
+    Parámetros:
+    - df (pandas.DataFrame): DataFrame resultado de una consulta.
+    - esquema (dict): Diccionario {columna: dtype} con los tipos esperados ('float64' o 'int64').
+
+    Retorna:
+    - pandas.DataFrame con las columnas declaradas en float64/int64. Las columnas enteras con valores nulos
+      quedan en float64 y las columnas numéricas no declaradas se normalizan a int64/float64.
+    """
+    for columna in df.columns:
+        tipo = esquema.get(columna)
+        if tipo is None:
+            # Arrow puede reducir los enteros a int8/int16/int32 según el rango de los valores
+            if pd.api.types.is_integer_dtype(df[columna]) and not pd.api.types.is_bool_dtype(df[columna]):
+                df[columna] = df[columna].astype('int64')
+            elif pd.api.types.is_float_dtype(df[columna]):
+                df[columna] = df[columna].astype('float64')
+            continue
+        if df[columna].dtype == tipo:
+            continue
+        # Solo las columnas object (p. ej. Decimal) requieren conversión valor a valor
+        valores = df[columna] if pd.api.types.is_numeric_dtype(df[columna]) else pd.to_numeric(df[columna], errors='coerce')
+        if tipo == 'int64' and valores.isna().any():
+            tipo = 'float64'
+        df[columna] = valores.astype(tipo)
+    return df
+
+
+def consultar_df(session, query, plantilla, esquema=ESQUEMA_NUMERICO):
+    """
+    Ejecuta una consulta (instrumentada en consultas.py) y retorna el resultado como DataFrame leyendo los
+    lotes Arrow del conector (`to_pandas`), sin materializar objetos Row ni columnas de Decimal.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+    - query (str): Consulta SQL a ejecutar.
+    - plantilla (str): Nombre de la plantilla de consulta con que se registra la ejecución.
+    - esquema (dict): Esquema numérico declarado {columna: dtype}. Por defecto ESQUEMA_NUMERICO.
+
+    Retorna:
+    - pandas.DataFrame con columnas numéricas tipadas (float64/int64).
+    """
+    # to_pandas no requiere el punto y coma final de las plantillas de consulta
+    query = query.strip().rstrip(';')
+    try:
+        df = consultas.ejecutar(session, query, plantilla, como='pandas')
+    except ImportError:
+        # Si el conector no tiene soporte de pandas (pyarrow) se conserva la conversión desde filas
+        df = pd.DataFrame(consultas.ejecutar(session, query, plantilla))
+    return aplicar_esquema(df, esquema)
+
+
+def a_numerico(serie):
+    """
+    Retorna la serie como numérica; solo se aplica pd.to_numeric cuando la serie no tiene ya un tipo numérico.
+    """
+    return serie if pd.api.types.is_numeric_dtype(serie) else pd.to_numeric(serie, errors='coerce')
+
+
 def calcular_diferencia_porcentual(valor_actual, valor_anterior):
     """
     Calcula la diferencia porcentual entre dos valores.
@@ -780,7 +825,8 @@ def calcular_participacion_porcentual(df, columna, total, nombre_columna_resulta
 
 
 
-def get_data_exportaciones(session, geo_params, dict_verificacion):
+@trazas.trazar
+def get_data_exportaciones(session, geo_params, dict_verificacion, modo='consolidado'):
     """
     Obtiene y procesa datos de exportaciones desde Snowflake, realizando cálculos adicionales y estructurando
     la información en diccionarios y DataFrames para su uso posterior.
@@ -789,6 +835,9 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
     - session (snowflake.snowpark.Session): Sesión activa en Snowflake.
     - geo_params (dict): Parámetros geográficos obtenidos de la función get_data_parametros().
     - dict_verificacion (dict): Diccionario de verificación obtenido de la función verif_ejes().
+    - modo (str): 'consolidado' (por defecto) descarga en una sola consulta todas las filas de la unidad de cada tabla
+                  ST_CATEGORIAS_* y ST_CATEGORIAS_PESO_* y las separa localmente por TABLA; 'detallado' ejecuta una
+                  consulta por cada TABLA.
 
     Retorna:
     - dict: Un diccionario que contiene múltiples DataFrames y estructuras de datos con la información procesada.
@@ -838,11 +887,67 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
             # Formatear la consulta SQL con los parámetros adecuados, incluyendo argumentos adicionales
             query = query_template.format(tabla=tabla, AGRUPACION=AGRUPACION, UNIDAD=UNIDAD, **kwargs)
             # Ejecutar la consulta y convertir el resultado a DataFrame
-            return pd.DataFrame(session.sql(query).collect())
+            return consultar_df(session, query, plantilla=tabla)
         else:
             # Retornar un DataFrame vacío si no hay datos
             return pd.DataFrame()
 
+    # Valores de la columna TABLA que se leen de cada tabla fuente en modo consolidado
+    tablas_fuente = {
+        'ST_CATEGORIAS_CERRADO': ['TOTAL', 'TIPOS'] + categorias,
+        'ST_CATEGORIAS_CORRIDO': ['TOTAL', 'TIPOS'] + categorias,
+        'ST_CATEGORIAS_PESO_CERRADO': ['TOTAL', 'TIPOS', 'MEDIO MINERAS', 'MEDIO NO MINERAS'],
+        'ST_CATEGORIAS_PESO_CORRIDO': ['TOTAL', 'TIPOS', 'MEDIO MINERAS', 'MEDIO NO MINERAS']
+    }
+    # Filas de la unidad ya descargadas por tabla fuente
+    filas_tabla = {}
+
+    def consultar_tabla(tabla, verif_key, valor_tabla, query_template, **kwargs):
+        """
+        Retorna las filas de `tabla` con TABLA = `valor_tabla` para la unidad. En modo consolidado la tabla fuente
+        se descarga una sola vez (todas sus filas de la unidad) y se filtra localmente; en modo detallado se ejecuta
+        la plantilla de consulta original.
+
+        Parámetros:
+        - tabla (str): Nombre de la tabla a consultar.
+        - verif_key (str): Clave en dict_verificacion para verificar la disponibilidad de datos.
+        - valor_tabla (str): Valor de la columna TABLA requerido ('TOTAL', 'TIPOS', categoría o medio).
+        - query_template (str): Plantilla de la consulta SQL para el modo detallado.
+        - **kwargs: Argumentos adicionales para formatear la plantilla de la consulta.
+
+        Retorna:
+        - pandas.DataFrame: Filas de la tabla sin la columna TABLA.
+        """
+        if modo != 'consolidado':
+            return ejecutar_consulta(tabla, verif_key, query_template, **kwargs)
+        if not dict_verificacion.get(verif_key, '').startswith('CON DATOS'):
+            return pd.DataFrame()
+
+        if tabla not in filas_tabla:
+            medida = 'PESO' if 'PESO' in tabla else 'USD'
+            tablas_sql = ', '.join(f"'{valor}'" for valor in tablas_fuente[tabla])
+            query = f"""
+                SELECT A.TABLA,
+                       A.CATEGORIA,
+                       A.SUMA_{medida}_T_1,
+                       A.SUMA_{medida}_T,
+                       A.DIFERENCIA_PORCENTUAL
+                FROM DOCUMENTOS_COLOMBIA.EXPORTACIONES.{tabla} AS A
+                WHERE A.AGRUPACION = '{AGRUPACION}'
+                  AND A.UNIDAD = '{UNIDAD}'
+                  AND A.TABLA IN ({tablas_sql})
+                ORDER BY A.TABLA, A.SUMA_{medida}_T DESC;
+            """
+            filas_tabla[tabla] = consultar_df(session, query, plantilla=tabla)
+
+        data = filas_tabla[tabla]
+        if data.empty:
+            return pd.DataFrame()
+        data = data[data['TABLA'] == valor_tabla].drop(columns='TABLA').reset_index(drop=True)
+        if valor_tabla == 'TOTAL':
+            data['CATEGORIA'] = 'Total'
+        return data
+
     # =============================
     # 1. Totales de exportaciones en USD
     # =============================
@@ -861,7 +966,7 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
               AND A.TABLA = 'TOTAL';
         """
         # Ejecutar la consulta y almacenar el resultado
-        data = ejecutar_consulta(tabla, verif_key, query_totales)
+        data = consultar_tabla(tabla, verif_key, 'TOTAL', query_totales)
         if not data.empty:
             totales[tabla] = data
 
@@ -883,7 +988,7 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
               AND A.TABLA = 'TIPOS';
         """
         # Ejecutar la consulta y almacenar el resultado
-        data = ejecutar_consulta(tabla, verif_key, query_tipos)
+        data = consultar_tabla(tabla, verif_key, 'TIPOS', query_tipos)
         if not data.empty and tabla in totales:
             # Calcular el total para participación
             total_t = totales[tabla]['SUMA_USD_T'].sum()
@@ -932,9 +1037,10 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
                     ORDER BY A.SUMA_USD_T DESC;
                 """
                 # Ejecutar la consulta y almacenar el resultado
-                data = ejecutar_consulta(
+                data = consultar_tabla(
                     tabla_usd, 
                     verif_key, 
+                    categoria,
                     query_categoria,
                     categoria=categoria  # Pasar 'categoria' como argumento adicional
                 )
@@ -1114,7 +1220,7 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
               AND A.TABLA = 'TOTAL';
         """
         # Ejecutar la consulta y almacenar el resultado
-        data_totales = ejecutar_consulta(tabla, verif_key, query_totales_peso)
+        data_totales = consultar_tabla(tabla, verif_key, 'TOTAL', query_totales_peso)
         if not data_totales.empty:
             totales_peso[tabla] = data_totales
 
@@ -1130,7 +1236,7 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
                   AND A.TABLA = 'TIPOS';
             """
             # Ejecutar la consulta y almacenar el resultado
-            data_tipos = ejecutar_consulta(tabla, verif_key, query_tipos_peso)
+            data_tipos = consultar_tabla(tabla, verif_key, 'TIPOS', query_tipos_peso)
             if not data_tipos.empty:
                 # Calcular el total para participación
                 total_t = data_totales['SUMA_PESO_T'].sum()
@@ -1182,9 +1288,10 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
                       AND A.TABLA = '{tabla_medio}';
                 """
                 # Ejecutar la consulta y almacenar el resultado
-                data = ejecutar_consulta(
+                data = consultar_tabla(
                     tabla, 
                     verif_key, 
+                    tabla_medio,
                     query_medios_peso,
                     tabla_medio=tabla_medio  # Pasar 'tabla_medio' como argumento adicional
                 )
@@ -1254,6 +1361,7 @@ def get_data_exportaciones(session, geo_params, dict_verificacion):
 
 
 
+@trazas.trazar
 def get_data_inversion(session, geo_params, dict_verificacion):
     """
     Obtiene y procesa datos de inversión (IED e ICE) desde Snowflake, realizando cálculos adicionales y estructurando
@@ -1324,7 +1432,7 @@ def get_data_inversion(session, geo_params, dict_verificacion):
         if dict_verificacion.get(verif_key, '').startswith('CON DATOS'):
             try:
                 # Ejecutar la consulta y convertir el resultado a DataFrame
-                return pd.DataFrame(session.sql(query).collect())
+                return consultar_df(session, query, plantilla=verif_key)
             except Exception as e:
                 print(f"Error ejecutando la consulta para {verif_key}: {e}")
                 return pd.DataFrame()
@@ -1638,7 +1746,7 @@ def get_data_inversion(session, geo_params, dict_verificacion):
             query_ied_acumulado += f" AND A.UNIDAD IN ({PAISES_INVERSION_sql});"
         
         # Ejecutar consulta
-        df_ied_acumulado = pd.DataFrame(session.sql(query_ied_acumulado).collect())
+        df_ied_acumulado = consultar_df(session, query_ied_acumulado, plantilla='ied_acumulado')
 
         # Extraer los datos para el diccionario de resumen 
         resumen_key = "IED PAISES ACUMULADA"
@@ -1880,7 +1988,7 @@ def get_data_inversion(session, geo_params, dict_verificacion):
             query_ice_acumulado += f" AND A.UNIDAD IN ({PAISES_INVERSION_sql});"
         
         # Ejecutar consulta
-        df_ice_acumulado = pd.DataFrame(session.sql(query_ice_acumulado).collect())
+        df_ice_acumulado = consultar_df(session, query_ice_acumulado, plantilla='ice_acumulado')
 
         # Extraer los datos para el diccionario de resumen 
         resumen_key = "ICE PAISES ACUMULADA"
@@ -2025,6 +2133,7 @@ def get_data_inversion(session, geo_params, dict_verificacion):
     }
 
 
+@trazas.trazar
 def get_data_turismo(session, geo_params, dict_verificacion):
     """
     Obtiene y procesa datos de turismo desde Snowflake, basándose en los parámetros geográficos especificados.
@@ -2074,255 +2183,77 @@ def get_data_turismo(session, geo_params, dict_verificacion):
     turismo_cerrado = {}   # Datos para el año 'CERRADO'
     turismo_corrido = {}   # Datos para el año 'CORRIDO'
 
-    #########
-    # CERRADO
-    #########
+    ##############################################
+    # CONSULTA ÚNICA CON GROUPING SETS (AMBOS AÑOS)
+    ##############################################
 
-    # Construir consulta para obtener datos de turismo por países en el año 'CERRADO'
-    query_paises_turismo_paises_cerrado = f"""
-        SELECT A.PAIS_RESIDENCIA,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL_T
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CERRADO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones a la consulta según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_paises_cerrado += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_paises_cerrado += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_paises_cerrado += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_paises_cerrado += f" GROUP BY A.PAIS_RESIDENCIA ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Construir consultas similares para departamentos, municipios, género y motivo en el año 'CERRADO'
-    # Consulta para departamentos
-    query_paises_turismo_departamentos_cerrado = f"""
-        SELECT A.DPTO_HOSPEDAJE,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL_T
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CERRADO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_departamentos_cerrado += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_departamentos_cerrado += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_departamentos_cerrado += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_departamentos_cerrado += f" GROUP BY A.DPTO_HOSPEDAJE ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Consulta para municipios
-    query_paises_turismo_municipio_cerrado = f"""
-        SELECT A.CIUDAD_HOSPEDAJE,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL_T
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CERRADO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_municipio_cerrado += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_municipio_cerrado += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_municipio_cerrado += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_municipio_cerrado += f" GROUP BY A.CIUDAD_HOSPEDAJE ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Consulta para género
-    query_paises_turismo_genero_cerrado = f"""
-        SELECT A.DESCRIPCION_GENERO,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL_T
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CERRADO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_genero_cerrado += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_genero_cerrado += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_genero_cerrado += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_genero_cerrado += f" GROUP BY A.DESCRIPCION_GENERO ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Consulta para motivo de viaje
-    query_paises_turismo_motivo_cerrado = f"""
-        SELECT A.MOVC_NOMBRE,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL_T
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CERRADO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
+    # Condición de filtro según la agrupación
+    condicion_turismo = ""
     if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_motivo_cerrado += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
+        condicion_turismo = f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
     if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_motivo_cerrado += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_motivo_cerrado += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_motivo_cerrado += f" GROUP BY A.MOVC_NOMBRE ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
+        condicion_turismo = f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
 
-    #########
-    # CORRIDO
-    #########
+    # Dimensiones de desagregación: países, departamentos, municipios, género y motivo de viaje
+    dimensiones_turismo = ['PAIS_RESIDENCIA', 'DPTO_HOSPEDAJE', 'CIUDAD_HOSPEDAJE', 'DESCRIPCION_GENERO', 'MOVC_NOMBRE']
 
-    # Construir consultas similares para el año 'CORRIDO'
-    # Consulta para países
-    query_paises_turismo_paises_corrido = f"""
-        SELECT A.PAIS_RESIDENCIA,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CORRIDO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_paises_corrido += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_paises_corrido += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_paises_corrido += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_paises_corrido += f" GROUP BY A.PAIS_RESIDENCIA ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Consulta para departamentos
-    query_paises_turismo_departamentos_corrido = f"""
-        SELECT A.DPTO_HOSPEDAJE,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CORRIDO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_departamentos_corrido += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_departamentos_corrido += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_departamentos_corrido += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_departamentos_corrido += f" GROUP BY A.DPTO_HOSPEDAJE ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Consulta para municipios
-    query_paises_turismo_municipio_corrido = f"""
-        SELECT A.CIUDAD_HOSPEDAJE,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CORRIDO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_municipio_corrido += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_municipio_corrido += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_municipio_corrido += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_municipio_corrido += f" GROUP BY A.CIUDAD_HOSPEDAJE ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Consulta para género
-    query_paises_turismo_genero_corrido = f"""
-        SELECT A.DESCRIPCION_GENERO,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CORRIDO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_genero_corrido += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_genero_corrido += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_genero_corrido += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_genero_corrido += f" GROUP BY A.DESCRIPCION_GENERO ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
-
-    # Consulta para motivo de viaje
-    query_paises_turismo_motivo_corrido = f"""
-        SELECT A.MOVC_NOMBRE,
-            SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
-            SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
-            CASE 
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
-                WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
-                WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
-                ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
-            END AS DIFERENCIA_PORCENTUAL
-        FROM DOCUMENTOS_COLOMBIA.TURISMO.ST_PAISES_CORRIDO AS A
-        WHERE 1=1
-    """
-    # Agregar condiciones según la agrupación
-    if AGRUPACION in ['CONTINENTES', 'HUBS', 'TLCS', 'PAISES']:
-        query_paises_turismo_motivo_corrido += f" AND A.PAIS_RESIDENCIA IN ({PAISES_TURISMO_sql})"
-    if AGRUPACION in ['DEPARTAMENTOS']:
-        query_paises_turismo_motivo_corrido += f" AND A.DPTO_HOSPEDAJE IN ({DEPARTAMENTOS_TURISMO_sql})"
-    if AGRUPACION == 'COLOMBIA':
-        query_paises_turismo_motivo_corrido += f" AND 1=1"
-    # Agrupar y ordenar los resultados
-    query_paises_turismo_motivo_corrido += f" GROUP BY A.MOVC_NOMBRE ORDER BY SUM(A.SUMA_TURISMO_T) DESC;"
+    # Periodos con datos disponibles y su tabla fuente
+    periodos_turismo = {}
+    if dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO':
+        periodos_turismo['CERRADO'] = 'ST_PAISES_CERRADO'
+    if dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO':
+        periodos_turismo['CORRIDO'] = 'ST_PAISES_CORRIDO'
+
+    # Construir una consulta por periodo con todas las desagregaciones y el total general en una sola pasada.
+    # La columna DIMENSION identifica el conjunto de agrupación de cada fila ('TOTAL' para el total general).
+    dimension_sql = ' '.join(f"WHEN GROUPING(A.{dimension}) = 0 THEN '{dimension}'" for dimension in dimensiones_turismo)
+    columnas_sql = ', '.join(f"A.{dimension}" for dimension in dimensiones_turismo)
+    grouping_sets_sql = ', '.join(f"(A.{dimension})" for dimension in dimensiones_turismo)
+    consultas_turismo = []
+    for periodo, tabla in periodos_turismo.items():
+        consultas_turismo.append(f"""
+            SELECT '{periodo}' AS PERIODO,
+                CASE {dimension_sql} ELSE 'TOTAL' END AS DIMENSION,
+                {columnas_sql},
+                SUM(A.SUMA_TURISMO_T_1) AS SUMA_TURISMO_T_1,
+                SUM(A.SUMA_TURISMO_T) AS SUMA_TURISMO_T,
+                CASE 
+                    WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) > 0 THEN 100
+                    WHEN SUM(A.SUMA_TURISMO_T_1) = 0 AND SUM(A.SUMA_TURISMO_T) = 0 THEN 0
+                    WHEN SUM(A.SUMA_TURISMO_T) = 0 AND SUM(A.SUMA_TURISMO_T_1) > 0 THEN -100
+                    ELSE ((SUM(A.SUMA_TURISMO_T) - SUM(A.SUMA_TURISMO_T_1)) / SUM(A.SUMA_TURISMO_T_1)) * 100
+                END AS DIFERENCIA_PORCENTUAL
+            FROM DOCUMENTOS_COLOMBIA.TURISMO.{tabla} AS A
+            WHERE 1=1{condicion_turismo}
+            GROUP BY GROUPING SETS ({grouping_sets_sql}, ())
+        """)
+
+    # Ejecutar la consulta (una sola para ambos periodos) si algún periodo tiene datos
+    if consultas_turismo:
+        query_turismo = ' UNION ALL '.join(consultas_turismo) + " ORDER BY PERIODO, DIMENSION, SUMA_TURISMO_T DESC;"
+        data_turismo = consultar_df(session, query_turismo, plantilla='turismo')
+    else:
+        data_turismo = pd.DataFrame()
+
+    def separar_turismo(periodo, dimension, columna_diferencia):
+        """
+        Extrae del resultado de GROUPING SETS las filas de un periodo y una dimensión, con las mismas columnas
+        que tenía la consulta individual de esa dimensión.
+
+        Parámetros:
+        - periodo (str): 'CERRADO' o 'CORRIDO'.
+        - dimension (str): Dimensión de desagregación o 'TOTAL' para el total general.
+        - columna_diferencia (str): Nombre de la columna de variación ('DIFERENCIA_PORCENTUAL_T' para CERRADO).
+
+        Retorna:
+        - pandas.DataFrame con la dimensión (si aplica), SUMA_TURISMO_T_1, SUMA_TURISMO_T y la variación.
+        """
+        columnas = ([dimension] if dimension != 'TOTAL' else []) + ['SUMA_TURISMO_T_1', 'SUMA_TURISMO_T', 'DIFERENCIA_PORCENTUAL']
+        if data_turismo.empty:
+            df = pd.DataFrame(columns=columnas)
+        else:
+            df = data_turismo.loc[(data_turismo['PERIODO'] == periodo) & (data_turismo['DIMENSION'] == dimension), columnas]
+        return df.rename(columns={'DIFERENCIA_PORCENTUAL': columna_diferencia}).reset_index(drop=True)
 
     ######################################
     # EJECUTAR CONSULTAS Y PROCESAR DATOS
@@ -2330,12 +2261,13 @@ def get_data_turismo(session, geo_params, dict_verificacion):
 
     # Ejecutar consultas y procesar datos para el año 'CERRADO' si hay datos disponibles
     if dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO':
-        # Ejecutar las consultas y almacenar los resultados en DataFrames de pandas
-        turismo_paises_cerrado = pd.DataFrame(session.sql(query_paises_turismo_paises_cerrado).collect())
-        turismo_departamentos_cerrado = pd.DataFrame(session.sql(query_paises_turismo_departamentos_cerrado).collect())
-        turismo_municipio_cerrado = pd.DataFrame(session.sql(query_paises_turismo_municipio_cerrado).collect())
-        turismo_genero_cerrado = pd.DataFrame(session.sql(query_paises_turismo_genero_cerrado).collect())
-        turismo_motivo_cerrado = pd.DataFrame(session.sql(query_paises_turismo_motivo_cerrado).collect())
+        # Separar las desagregaciones del resultado de GROUPING SETS
+        turismo_paises_cerrado = separar_turismo('CERRADO', 'PAIS_RESIDENCIA', 'DIFERENCIA_PORCENTUAL_T')
+        turismo_departamentos_cerrado = separar_turismo('CERRADO', 'DPTO_HOSPEDAJE', 'DIFERENCIA_PORCENTUAL_T')
+        turismo_municipio_cerrado = separar_turismo('CERRADO', 'CIUDAD_HOSPEDAJE', 'DIFERENCIA_PORCENTUAL_T')
+        turismo_genero_cerrado = separar_turismo('CERRADO', 'DESCRIPCION_GENERO', 'DIFERENCIA_PORCENTUAL_T')
+        turismo_motivo_cerrado = separar_turismo('CERRADO', 'MOVC_NOMBRE', 'DIFERENCIA_PORCENTUAL_T')
+        turismo_total_cerrado = separar_turismo('CERRADO', 'TOTAL', 'DIFERENCIA_PORCENTUAL_T')
 
         # Calcular el número de filas en cada DataFrame para determinar si se debe agregar la categoría 'Otros'
         row_num_turismo_paises_cerrado = turismo_paises_cerrado.shape[0]
@@ -2344,9 +2276,9 @@ def get_data_turismo(session, geo_params, dict_verificacion):
         row_num_turismo_genero_cerrado = turismo_genero_cerrado.shape[0]
         row_num_turismo_motivo_cerrado = turismo_motivo_cerrado.shape[0]
 
-        # Calcular los totales generales
-        turismo_total_cerrado_t_1 = turismo_paises_cerrado['SUMA_TURISMO_T_1'].sum()
-        turismo_total_cerrado_t = turismo_paises_cerrado['SUMA_TURISMO_T'].sum()
+        # Calcular los totales generales a partir del conjunto de agrupación vacío ()
+        turismo_total_cerrado_t_1 = turismo_total_cerrado['SUMA_TURISMO_T_1'].sum()
+        turismo_total_cerrado_t = turismo_total_cerrado['SUMA_TURISMO_T'].sum()
         turismo_total_cerrado_diferencia_porcentual = calcular_diferencia_porcentual(turismo_total_cerrado_t, turismo_total_cerrado_t_1)
 
         # Tomar los top 5 registros en cada DataFrame
@@ -2440,12 +2372,13 @@ def get_data_turismo(session, geo_params, dict_verificacion):
 
     # Ejecutar consultas y procesar datos para el año 'CORRIDO' si hay datos disponibles
     if dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO':
-        # Ejecutar las consultas y almacenar los resultados en DataFrames de pandas
-        turismo_paises_corrido = pd.DataFrame(session.sql(query_paises_turismo_paises_corrido).collect())
-        turismo_departamentos_corrido = pd.DataFrame(session.sql(query_paises_turismo_departamentos_corrido).collect())
-        turismo_municipio_corrido = pd.DataFrame(session.sql(query_paises_turismo_municipio_corrido).collect())
-        turismo_genero_corrido = pd.DataFrame(session.sql(query_paises_turismo_genero_corrido).collect())
-        turismo_motivo_corrido = pd.DataFrame(session.sql(query_paises_turismo_motivo_corrido).collect())
+        # Separar las desagregaciones del resultado de GROUPING SETS
+        turismo_paises_corrido = separar_turismo('CORRIDO', 'PAIS_RESIDENCIA', 'DIFERENCIA_PORCENTUAL')
+        turismo_departamentos_corrido = separar_turismo('CORRIDO', 'DPTO_HOSPEDAJE', 'DIFERENCIA_PORCENTUAL')
+        turismo_municipio_corrido = separar_turismo('CORRIDO', 'CIUDAD_HOSPEDAJE', 'DIFERENCIA_PORCENTUAL')
+        turismo_genero_corrido = separar_turismo('CORRIDO', 'DESCRIPCION_GENERO', 'DIFERENCIA_PORCENTUAL')
+        turismo_motivo_corrido = separar_turismo('CORRIDO', 'MOVC_NOMBRE', 'DIFERENCIA_PORCENTUAL')
+        turismo_total_corrido = separar_turismo('CORRIDO', 'TOTAL', 'DIFERENCIA_PORCENTUAL')
 
         # Calcular el número de filas en cada DataFrame
         row_num_turismo_paises_corrido = turismo_paises_corrido.shape[0]
@@ -2454,9 +2387,9 @@ def get_data_turismo(session, geo_params, dict_verificacion):
         row_num_turismo_genero_corrido = turismo_genero_corrido.shape[0]
         row_num_turismo_motivo_corrido = turismo_motivo_corrido.shape[0]
 
-        # Calcular los totales generales
-        turismo_total_corrido_t_1 = turismo_paises_corrido['SUMA_TURISMO_T_1'].sum()
-        turismo_total_corrido_t = turismo_paises_corrido['SUMA_TURISMO_T'].sum()
+        # Calcular los totales generales a partir del conjunto de agrupación vacío ()
+        turismo_total_corrido_t_1 = turismo_total_corrido['SUMA_TURISMO_T_1'].sum()
+        turismo_total_corrido_t = turismo_total_corrido['SUMA_TURISMO_T'].sum()
         turismo_total_corrido_diferencia_porcentual = calcular_diferencia_porcentual(turismo_total_corrido_t, turismo_total_corrido_t_1)
 
         # Tomar los top 5 registros en cada DataFrame
@@ -2551,6 +2484,7 @@ def get_data_turismo(session, geo_params, dict_verificacion):
         'RESUMEN': datos_resumen
     }
 
+@trazas.trazar
 def get_data_oportunidades_conectividad(session, geo_params, dict_verificacion):
     """
     Obtiene y procesa datos de oportunidades y conectividad desde Snowflake, basándose en los parámetros geográficos especificados.
@@ -2606,7 +2540,7 @@ def get_data_oportunidades_conectividad(session, geo_params, dict_verificacion):
             query_conectividad += f" AND A.COD_DIVIPOLA_DEPARTAMENTO_DESTINO IN ({DEPARTAMENTOS_TURISMO_sql})"
 
         # Ejecutar la consulta y almacenar los resultados en un DataFrame de pandas
-        df_conectividad = pd.DataFrame(session.sql(query_conectividad).collect())
+        df_conectividad = consultar_df(session, query_conectividad, plantilla='conectividad')
 
         # Agregar el DataFrame al diccionario de conectividad
         conectividad['CONECTIVIDAD'] = df_conectividad
@@ -2619,14 +2553,8 @@ def get_data_oportunidades_conectividad(session, geo_params, dict_verificacion):
 
     # Obtener los países llaves de exportación en caso de que la agrupación sea de turismo:
     if AGRUPACION == 'TLCS':
-        # Obtener países llave
-        df_llave = pd.DataFrame(
-                        session.sql(f"""
-                            SELECT DISTINCT A.PAIS_LLAVE_EXPORTACIONES 
-                            FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS A 
-                            WHERE A.NOMBRE_TLC = '{UNIDAD}'
-                        """).collect()
-                    )    
+        # Obtener países llave desde el store de geografía en memoria
+        df_llave = geografia.obtener_geografia(session).filtrar('ST_PAISES', 'NOMBRE_TLC', [UNIDAD], ['PAIS_LLAVE_EXPORTACIONES'])
         # Obtener string de búsqueda de países
         PAISES = df_llave['PAIS_LLAVE_EXPORTACIONES'].dropna().unique().tolist()
         PAISES_sql = ', '.join(f"'{pais}'" for pais in PAISES)
@@ -2662,7 +2590,7 @@ def get_data_oportunidades_conectividad(session, geo_params, dict_verificacion):
             query_oportunidades_exportacion += " ORDER BY 1, 2 ASC"
 
             # Ejecutar la consulta y almacenar los resultados en un DataFrame
-            oportunidades_exportacion_df = pd.DataFrame(session.sql(query_oportunidades_exportacion).collect())
+            oportunidades_exportacion_df = consultar_df(session, query_oportunidades_exportacion, plantilla='oportunidades_exportacion')
             # Agregar el DataFrame al diccionario de oportunidades
             oportunidades['EXPORTACIONES'] = oportunidades_exportacion_df
 
@@ -2695,7 +2623,7 @@ def get_data_oportunidades_conectividad(session, geo_params, dict_verificacion):
             query_oportunidades_ied += " ORDER BY 1, 2 ASC"
 
             # Ejecutar la consulta y almacenar los resultados en un DataFrame
-            oportunidades_inversion_df = pd.DataFrame(session.sql(query_oportunidades_ied).collect())
+            oportunidades_inversion_df = consultar_df(session, query_oportunidades_ied, plantilla='oportunidades_ied')
             # Agregar el DataFrame al diccionario de oportunidades
             oportunidades['INVERSION'] = oportunidades_inversion_df
 
@@ -2728,7 +2656,7 @@ def get_data_oportunidades_conectividad(session, geo_params, dict_verificacion):
             query_oportunidades_turismo += " ORDER BY 1, 2 ASC"
 
             # Ejecutar la consulta y almacenar los resultados en un DataFrame
-            oportunidades_turismo_df = pd.DataFrame(session.sql(query_oportunidades_turismo).collect())
+            oportunidades_turismo_df = consultar_df(session, query_oportunidades_turismo, plantilla='oportunidades_turismo')
             # Agregar el DataFrame al diccionario de oportunidades
             oportunidades['TURISMO'] = oportunidades_turismo_df
 
@@ -2738,7 +2666,11 @@ def get_data_oportunidades_conectividad(session, geo_params, dict_verificacion):
         'OPORTUNIDADES': oportunidades
     }
 
-def get_data(session, geo_params, dict_verificacion):
+# Número máximo de ejes consultados en paralelo por get_data (1 equivale a consultas secuenciales)
+EJES_MAX_CONCURRENCIA = 4
+
+@trazas.trazar
+def get_data(session, geo_params, dict_verificacion=None, modo='concurrente', max_concurrencia=EJES_MAX_CONCURRENCIA):
     """
     Esta función recopila y procesa datos relacionados con exportaciones, inversión, turismo, conectividad y oportunidades,
     utilizando parámetros predefinidos. Devuelve un diccionario con los datos recopilados y procesados.
@@ -2747,26 +2679,57 @@ def get_data(session, geo_params, dict_verificacion):
     - session: Objeto de sesión de Snowflake.
     - geo_params: Parámetros geográficos generados externamente.
     - dict_verificacion: Diccionario que indica la disponibilidad de datos para los diferentes ejes.
+                         Si es None se obtiene del cache de verificaciones.
+    - modo (str): 'concurrente' (por defecto) consulta los ejes en paralelo en un pool de hilos acotado;
+                  'secuencial' los consulta uno después del otro.
+    - max_concurrencia (int): Número máximo de ejes consultados al mismo tiempo en modo 'concurrente'.
 
     Retorna:
     - Un diccionario que contiene todos los datos recopilados y procesados.
     """
 
+    # Obtener la verificación de datos si no fue proporcionada
+    if dict_verificacion is None:
+        dict_verificacion = obtener_verificacion(session, geo_params)
+
     ########################################
     # EJECUTAR FUNCIONES PARA OBTENER DATOS
     ########################################
 
-    # Obtener datos de exportaciones
-    data_exportaciones = get_data_exportaciones(session, geo_params, dict_verificacion)
+    # Funciones de cada eje: exportaciones, inversión, turismo y conectividad/oportunidades.
+    # Son independientes entre sí y pasan casi todo el tiempo esperando a Snowflake.
+    ejes = {
+        'exportaciones': get_data_exportaciones,
+        'inversion': get_data_inversion,
+        'turismo': get_data_turismo,
+        'oportunidades_conectividad': get_data_oportunidades_conectividad,
+    }
 
-    # Obtener datos de inversión
-    data_inversion = get_data_inversion(session, geo_params, dict_verificacion)
+    def ejecutar_eje(eje):
+        # Cada consulta de la sesión abre su propio cursor, por lo que la sesión se puede compartir entre hilos
+        inicio = time.perf_counter()
+        with consultas.etapa(eje):
+            resultado = ejes[eje](session, geo_params, dict_verificacion)
+        return resultado, time.perf_counter() - inicio
+
+    inicio_total = time.perf_counter()
+    if modo == 'concurrente' and max_concurrencia and max_concurrencia > 1:
+        with ThreadPoolExecutor(max_workers=min(max_concurrencia, len(ejes)), thread_name_prefix='get_data') as executor:
+            # Cada hilo hereda el contexto del reporte en curso (registro de consultas)
+            futuros = {eje: executor.submit(contextvars.copy_context().run, ejecutar_eje, eje) for eje in ejes}
+            resultados_ejes = {eje: futuro.result() for eje, futuro in futuros.items()}
+    else:
+        modo = 'secuencial'
+        resultados_ejes = {eje: ejecutar_eje(eje) for eje in ejes}
 
-    # Obtener datos de turismo
-    data_turismo = get_data_turismo(session, geo_params, dict_verificacion)
+    # Reportar el tiempo de cada eje y el tiempo total
+    tiempos = ', '.join(f"{eje}: {duracion:.2f} s" for eje, (_, duracion) in resultados_ejes.items())
+    print(f"get_data ({modo}) {geo_params['AGRUPACION']} - {geo_params['UNIDAD'][0]}: {time.perf_counter() - inicio_total:.2f} s ({tiempos})")
 
-    # Obtener datos de conectividad y oportunidades
-    data_oportunidades_conectividad = get_data_oportunidades_conectividad(session, geo_params, dict_verificacion)
+    data_exportaciones = resultados_ejes['exportaciones'][0]
+    data_inversion = resultados_ejes['inversion'][0]
+    data_turismo = resultados_ejes['turismo'][0]
+    data_oportunidades_conectividad = resultados_ejes['oportunidades_conectividad'][0]
 
     #######################################
     # COMPILAR TODOS LOS RESULTADOS
@@ -2806,9 +2769,10 @@ def get_data(session, geo_params, dict_verificacion):
     return resultados
 
 
+@trazas.trazar
 def get_parameters_exportaciones(session):
     """
-    Obtiene los parámetros de año cerrado y año corrido para exportaciones desde la base de datos de Snowflake.
+    Obtiene los parámetros de año cerrado y año corrido para exportaciones desde el snapshot de PARAMETROS.
     
     Parámetros:
     - session: Objeto de sesión de Snowflake.
@@ -2816,32 +2780,21 @@ def get_parameters_exportaciones(session):
     Retorna:
     - dict: Un diccionario con los parámetros 'T' y 'T_1' para año cerrado y año corrido, así como información adicional.
     """
-    # Consulta de parámetros para año cerrado
-    query_cerrado = """
-    SELECT
-        MAX(CASE WHEN PARAMETRO = 'Año cerrado (T-1)' THEN VALOR ELSE NULL END) AS T_1_YEAR,
-        MAX(CASE WHEN PARAMETRO = 'Año cerrado (T)' THEN VALOR ELSE NULL END) AS T_YEAR
-    FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS
-    WHERE EJE = 'Exportaciones'
-      AND PARAMETRO IN ('Año cerrado (T-1)', 'Año cerrado (T)');
-    """
-    # Ejecutar la consulta y obtener los resultados
-    params_cerrado_df = session.sql(query_cerrado).to_pandas()
-    params_cerrado = params_cerrado_df.iloc[0]
-    
-    # Consulta de parámetros para año corrido
-    query_corrido = """
-    SELECT
-        MAX(CASE WHEN PARAMETRO = 'Año corrido (T-1)' THEN VALOR ELSE NULL END) AS T_1_YEAR,
-        MAX(CASE WHEN PARAMETRO = 'Año corrido (T)' THEN VALOR ELSE NULL END) AS T_YEAR,
-        MAX(CASE WHEN PARAMETRO = 'Mes corrido texto (T)' THEN VALOR ELSE NULL END) AS MES_T
-    FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS
-    WHERE EJE = 'Exportaciones'
-      AND PARAMETRO IN ('Año corrido (T-1)', 'Año corrido (T)', 'Mes corrido texto (T)');
-    """
-    # Ejecutar la consulta y obtener los resultados
-    params_corrido_df = session.sql(query_corrido).to_pandas()
-    params_corrido = params_corrido_df.iloc[0]
+    # Obtener los parámetros desde el snapshot de la publicación de datos vigente
+    snapshot = parametros.obtener_parametros(session)
+
+    # Parámetros para año cerrado
+    params_cerrado = {
+        'T_1_YEAR': snapshot.valor('Exportaciones', 'Año cerrado (T-1)'),
+        'T_YEAR': snapshot.valor('Exportaciones', 'Año cerrado (T)')
+    }
+
+    # Parámetros para año corrido
+    params_corrido = {
+        'T_1_YEAR': snapshot.valor('Exportaciones', 'Año corrido (T-1)'),
+        'T_YEAR': snapshot.valor('Exportaciones', 'Año corrido (T)'),
+        'MES_T': snapshot.valor('Exportaciones', 'Mes corrido texto (T)')
+    }
     
     # Función auxiliar para obtener el año del periodo corrido
     def get_year(year_str):
@@ -2873,9 +2826,10 @@ def get_parameters_exportaciones(session):
 
 
 
+@trazas.trazar
 def get_parameters_inversion(session):
     """
-    Obtiene los parámetros de año cerrado y año corrido para inversión desde la base de datos de Snowflake.
+    Obtiene los parámetros de año cerrado y año corrido para inversión desde el snapshot de PARAMETROS.
     
     Parámetros:
     - session: Objeto de sesión de Snowflake.
@@ -2883,31 +2837,20 @@ def get_parameters_inversion(session):
     Retorna:
     - dict: Un diccionario con los parámetros 'T' y 'T_1' para año cerrado y año corrido, incluyendo información de trimestres.
     """
-    # Consulta de parámetros para año cerrado
-    query_cerrado = """
-    SELECT
-        MAX(CASE WHEN PARAMETRO = 'Año cerrado (T-1)' THEN VALOR ELSE NULL END) AS T_1_YEAR,
-        MAX(CASE WHEN PARAMETRO = 'Año cerrado (T)' THEN VALOR ELSE NULL END) AS T_YEAR
-    FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS
-    WHERE EJE = 'Inversión'
-      AND PARAMETRO IN ('Año cerrado (T-1)', 'Año cerrado (T)');
-    """
-    # Ejecutar la consulta y obtener los resultados
-    params_cerrado_df = session.sql(query_cerrado).to_pandas()
-    params_cerrado = params_cerrado_df.iloc[0]
-    
-    # Consulta de parámetros para año corrido
-    query_corrido = """
-    SELECT
-        MAX(CASE WHEN PARAMETRO = 'Año corrido (T-1)' THEN VALOR ELSE NULL END) AS T_1_YEAR,
-        MAX(CASE WHEN PARAMETRO = 'Año corrido (T)' THEN VALOR ELSE NULL END) AS T_YEAR
-    FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS
-    WHERE EJE = 'Inversión'
-      AND PARAMETRO IN ('Año corrido (T-1)', 'Año corrido (T)');
-    """
-    # Ejecutar la consulta y obtener los resultados
-    params_corrido_df = session.sql(query_corrido).to_pandas()
-    params_corrido = params_corrido_df.iloc[0]
+    # Obtener los parámetros desde el snapshot de la publicación de datos vigente
+    snapshot = parametros.obtener_parametros(session)
+
+    # Parámetros para año cerrado
+    params_cerrado = {
+        'T_1_YEAR': snapshot.valor('Inversión', 'Año cerrado (T-1)'),
+        'T_YEAR': snapshot.valor('Inversión', 'Año cerrado (T)')
+    }
+
+    # Parámetros para año corrido
+    params_corrido = {
+        'T_1_YEAR': snapshot.valor('Inversión', 'Año corrido (T-1)'),
+        'T_YEAR': snapshot.valor('Inversión', 'Año corrido (T)')
+    }
     
     # Función auxiliar para obtener el nombre del trimestre
     def get_trimestre_name(year_quarter):
@@ -2961,9 +2904,10 @@ def get_parameters_inversion(session):
     }
 
 
+@trazas.trazar
 def get_parameters_turismo(session):
     """
-    Obtiene los parámetros de año cerrado y mes corrido para turismo desde la base de datos de Snowflake.
+    Obtiene los parámetros de año cerrado y mes corrido para turismo desde el snapshot de PARAMETROS.
     
     Parámetros:
     - session: Objeto de sesión de Snowflake.
@@ -2971,20 +2915,15 @@ def get_parameters_turismo(session):
     Retorna:
     - dict: Un diccionario con los parámetros 'T', 'T_1' para año cerrado y corrido, y detalles del mes.
     """
-    # Consulta de parámetros de turismo
-    query_turismo = """
-    SELECT
-        MAX(CASE WHEN PARAMETRO = 'Año cerrado (T-1)' THEN VALOR ELSE NULL END) AS T_1_YEAR,
-        MAX(CASE WHEN PARAMETRO = 'Año cerrado (T)' THEN VALOR ELSE NULL END) AS T_YEAR,
-        MAX(CASE WHEN PARAMETRO = 'Año corrido (T-1)' THEN VALOR ELSE NULL END) AS T_1_YEAR_CORRIDO,
-        MAX(CASE WHEN PARAMETRO = 'Año corrido (T)' THEN VALOR ELSE NULL END) AS T_YEAR_CORRIDO,
-        MAX(CASE WHEN PARAMETRO = 'Mes corrido' THEN VALOR ELSE NULL END) AS T_MONTH_CORRIDO
-    FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS
-    WHERE EJE = 'Turismo';
-    """
-    # Ejecutar la consulta y obtener los resultados
-    params_turismo_df = session.sql(query_turismo).to_pandas()
-    params_turismo = params_turismo_df.iloc[0]
+    # Obtener los parámetros de turismo desde el snapshot de la publicación de datos vigente
+    snapshot = parametros.obtener_parametros(session)
+    params_turismo = {
+        'T_1_YEAR': snapshot.valor('Turismo', 'Año cerrado (T-1)'),
+        'T_YEAR': snapshot.valor('Turismo', 'Año cerrado (T)'),
+        'T_1_YEAR_CORRIDO': snapshot.valor('Turismo', 'Año corrido (T-1)'),
+        'T_YEAR_CORRIDO': snapshot.valor('Turismo', 'Año corrido (T)'),
+        'T_MONTH_CORRIDO': snapshot.valor('Turismo', 'Mes corrido')
+    }
     
     # Diccionarios para los meses en español
     meses_abreviados = {
@@ -3069,7 +3008,7 @@ def format_columns_exportaciones(df):
         # Formatear columnas de valor en USD y peso en toneladas
         if 'USD' in col or 'TONELADAS' in col:
             # Convertir a numérico, ignorando errores y redondear a 0 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(0)
+            df[col] = a_numerico(df[col]).round(0)
             # Aplicar formato de separadores de miles y reemplazar puntos por comas
             df[col] = df[col].apply(
                 lambda x: f"{x:,.0f}".replace(',', 'X').replace('.', ',').replace('X', '.')
@@ -3079,7 +3018,7 @@ def format_columns_exportaciones(df):
     # Formatear columna de variación porcentual si existe
     if 'Variación (%)' in df.columns:
         # Convertir a numérico y redondear a 1 decimal
-        df['Variación (%)'] = pd.to_numeric(df['Variación (%)'], errors='coerce').round(1)
+        df['Variación (%)'] = a_numerico(df['Variación (%)']).round(1)
         # Añadir símbolo de porcentaje y reemplazar punto por coma
         df['Variación (%)'] = df['Variación (%)'].apply(
             lambda x: f"{x:.1f}%".replace('.', ',') if not pd.isnull(x) else x
@@ -3090,7 +3029,7 @@ def format_columns_exportaciones(df):
         # Identificar columnas que comienzan con 'Participación (%)'
         if col.startswith('Participación (%)'):
             # Convertir a numérico y redondear a 1 decimal
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(1)
+            df[col] = a_numerico(df[col]).round(1)
             # Añadir símbolo de porcentaje y reemplazar punto por coma
             df[col] = df[col].apply(
                 lambda x: f"{x:.1f}%".replace('.', ',') if not pd.isnull(x) else x
@@ -3115,19 +3054,19 @@ def format_columns_exportaciones_excel(df):
         # Formatear columnas de valor en USD y peso en toneladas
         if 'USD' in col or 'TONELADAS' in col:
             # Convertir a numérico, ignorando errores y redondear a 2 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+            df[col] = a_numerico(df[col]).round(2)
 
     # Formatear columna de variación porcentual si existe
     if 'Variación (%)' in df.columns:
         # Convertir a numérico y redondear a 2 decimales
-        df['Variación (%)'] = pd.to_numeric(df['Variación (%)'], errors='coerce').round(2)
+        df['Variación (%)'] = a_numerico(df['Variación (%)']).round(2)
 
     # Formatear columnas de participación porcentual
     for col in df.columns:
         # Identificar columnas que comienzan con 'Participación (%)'
         if col.startswith('Participación (%)'):
             # Convertir a numérico y redondear a 2 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+            df[col] = a_numerico(df[col]).round(2)
 
     # Devolver el DataFrame formateado para Excel
     return df
@@ -3158,7 +3097,7 @@ def format_columns_inversion(df):
         # Formatear columnas de valor en USD
         if 'USD' in col:
             # Convertir a numérico y redondear a 1 decimal
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(1)
+            df[col] = a_numerico(df[col]).round(1)
             # Aplicar formato de separadores de miles y reemplazar puntos por comas
             df[col] = df[col].apply(
                 lambda x: f"{x:,.1f}".replace(',', 'X').replace('.', ',').replace('X', '.')
@@ -3167,7 +3106,7 @@ def format_columns_inversion(df):
         # Formatear columnas de participación y variación porcentual
         elif col.startswith('Participación (%)') or col.startswith('Variación (%)'):
             # Convertir a numérico y redondear a 1 decimal
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(1)
+            df[col] = a_numerico(df[col]).round(1)
             # Añadir símbolo de porcentaje y reemplazar punto por coma
             df[col] = df[col].apply(
                 lambda x: f"{x:.1f}%".replace('.', ',') if not pd.isnull(x) else x
@@ -3201,11 +3140,11 @@ def format_columns_inversion_excel(df):
         # Formatear columnas de valor en USD
         if 'USD' in col:
             # Convertir a numérico y redondear a 2 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+            df[col] = a_numerico(df[col]).round(2)
         # Formatear columnas de participación y variación porcentual
         elif col.startswith('Participación (%)') or col.startswith('Variación (%)'):
             # Convertir a numérico y redondear a 2 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+            df[col] = a_numerico(df[col]).round(2)
 
     # Devolver el DataFrame formateado para Excel
     return df
@@ -3227,7 +3166,7 @@ def format_columns_unctad(df):
         # Verificar si la columna es numérica
         if pd.api.types.is_numeric_dtype(df[col]):
             # Convertir a numérico y redondear a 1 decimal
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(1)
+            df[col] = a_numerico(df[col]).round(1)
             # Aplicar formato de separadores de miles y reemplazar puntos por comas
             df[col] = df[col].apply(
                 lambda x: f"{x:,.1f}".replace(',', 'X').replace('.', ',').replace('X', '.')
@@ -3254,7 +3193,7 @@ def format_columns_unctad_excel(df):
         # Verificar si la columna es numérica
         if pd.api.types.is_numeric_dtype(df[col]):
             # Convertir a numérico y redondear a 2 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+            df[col] = a_numerico(df[col]).round(2)
 
     # Devolver el DataFrame formateado para Excel
     return df
@@ -3276,7 +3215,7 @@ def format_columns_balanza(df):
         # Verificar si la columna es numérica
         if pd.api.types.is_numeric_dtype(df[col]):
             # Convertir a numérico y redondear a 0 decimal
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(0)
+            df[col] = a_numerico(df[col]).round(0)
             # Aplicar formato de separadores de miles y reemplazar puntos por comas
             df[col] = df[col].apply(
                 lambda x: f"{x:,.1f}".replace(',', 'X').replace('.', ',').replace('X', '.')
@@ -3303,7 +3242,7 @@ def format_columns_balanza_excel(df):
         # Verificar si la columna es numérica
         if pd.api.types.is_numeric_dtype(df[col]):
             # Convertir a numérico y redondear a 0 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(0)
+            df[col] = a_numerico(df[col]).round(0)
 
     # Devolver el DataFrame formateado para Excel
     return df
@@ -3334,7 +3273,7 @@ def format_columns_turismo(df):
     for col in df.columns:
         if col.startswith('20') or col.startswith('Ene') or col.startswith('Diferencia'):
             # Convertir a numérico y redondear a 0 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(0)
+            df[col] = a_numerico(df[col]).round(0)
             # Aplicar formato de separadores de miles y reemplazar puntos por comas
             df[col] = df[col].apply(
                 lambda x: f"{x:,.0f}".replace(',', 'X').replace('.', ',').replace('X', '.')
@@ -3345,7 +3284,7 @@ def format_columns_turismo(df):
     for col in df.columns:
         if col.startswith('Participación (%)') or col.startswith('Variación (%)') or col.startswith('Diferencia'):
             # Convertir a numérico y redondear a 1 decimal
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(1)
+            df[col] = a_numerico(df[col]).round(1)
             # Añadir símbolo de porcentaje y reemplazar punto por coma
             df[col] = df[col].apply(
                 lambda x: f"{x:.1f}%".replace('.', ',') if not pd.isnull(x) else x
@@ -3379,13 +3318,13 @@ def format_columns_turismo_excel(df):
     for col in df.columns:
         if col.startswith('20') or col.startswith('Ene'):
             # Convertir a numérico y redondear a 2 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+            df[col] = a_numerico(df[col]).round(2)
 
     # Formatear columnas de participación y variación porcentual
     for col in df.columns:
         if col.startswith('Participación (%)') or col.startswith('Variación (%)') or col.startswith('Diferencia'):
             # Convertir a numérico y redondear a 2 decimales
-            df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
+            df[col] = a_numerico(df[col]).round(2)
 
     # Devolver el DataFrame formateado para Excel
     return df
@@ -3393,96 +3332,57 @@ def format_columns_turismo_excel(df):
 def obtener_paises_correlativa(session, eje):
     """
     Obtiene una lista de países según el eje especificado (Exportaciones, Inversión o Turismo) o datos UNCTAD por país o región.
-    Consulta la base de datos de Snowflake para obtener los códigos y nombres de los países relacionados con cada eje.
+    La correlativa se resuelve desde el store de geografía en memoria (ST_PAISES), sin consultar Snowflake en cada reporte.
 
     Parámetros:
-    - session: Objeto de sesión de Snowflake para ejecutar las consultas.
-    - eje (str): El eje de análisis ('EXPORTACIONES', 'INVERSION', 'TURISMO').
+    - session: Objeto de sesión de Snowflake, usado solo si el store aún no está cargado.
+    - eje (str): El eje de análisis ('EXPORTACIONES', 'INVERSION', 'TURISMO', 'UNCTAD_PAIS', 'UNCTAD_CONTINENTE').
 
     Retorna:
-    - pandas.DataFrame: Un DataFrame con los códigos y nombres de los países obtenidos de la consulta.
+    - pandas.DataFrame: Un DataFrame con los códigos de los países y su nombre oficial (COUNTRY_OR_AREA_UNSD).
     """
 
-    # Definir la consulta SQL según el eje especificado
-    if eje == 'EXPORTACIONES':
-        query = """
-            SELECT DISTINCT A.PAIS_LLAVE_EXPORTACIONES, A.COUNTRY_OR_AREA AS COUNTRY_OR_AREA_UNSD 
-            FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS A;
-        """
-    elif eje == 'INVERSION':
-        query = """
-            SELECT DISTINCT A.PAIS_INVERSION_BANREP, A.COUNTRY_OR_AREA AS COUNTRY_OR_AREA_UNSD 
-            FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS A;
-        """
-    elif eje == 'TURISMO':
-        query = """
-            SELECT DISTINCT A.CODIGO_PAIS_MIGRACION, A.COUNTRY_OR_AREA AS COUNTRY_OR_AREA_UNSD 
-            FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS A;
-        """
-    elif eje == 'UNCTAD_PAIS':
-        query = """
-            SELECT DISTINCT A.M49_CODE, A.COUNTRY_OR_AREA AS COUNTRY_OR_AREA_UNSD 
-            FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS A;
-        """
-    elif eje == 'UNCTAD_CONTINENTE':
-        query = """
-            SELECT DISTINCT A.M49_CODE, A.COUNTRY_OR_AREA AS COUNTRY_OR_AREA_UNSD 
-            FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.ST_PAISES AS A;
-        """
-    else:
+    # Validar el eje solicitado
+    if eje not in ['EXPORTACIONES', 'INVERSION', 'TURISMO', 'UNCTAD_PAIS', 'UNCTAD_CONTINENTE']:
         raise ValueError("El eje proporcionado no es válido. Debe ser 'EXPORTACIONES', 'INVERSION' o 'TURISMO'.")
 
-    # Ejecutar la consulta y convertir los resultados en un DataFrame
-    data = pd.DataFrame(session.sql(query).collect())
+    # Obtener la correlativa desde el store de geografía
+    data = geografia.obtener_geografia(session).correlativa(eje)
 
     return data
 
 def obtener_departamentos_correlativa(session):
     """
-    Obtiene una lista de departamentos y sus códigos DIAN desde la base de datos de Snowflake.
-    Consulta la tabla 'DIAN_DEPARTAMENTOS' para extraer los nombres y códigos de los departamentos registrados.
+    Obtiene una lista de departamentos y sus códigos DIAN desde el store de geografía en memoria
+    (tabla 'DIAN_DEPARTAMENTOS').
 
     Parámetros:
-    - session (snowflake.connector.SnowflakeConnection): Objeto de sesión de Snowflake para ejecutar la consulta.
+    - session (snowflake.snowpark.Session): Sesión de Snowflake, usada solo si el store aún no está cargado.
 
     Retorna:
-    - pandas.DataFrame: Un DataFrame con dos columnas: 'DEPARTAMENTO_DIAN' (nombre del departamento) y 
-      'COD_DIAN_DEPARTAMENTO' (código del departamento según la DIAN).
-    """
-    # Definir la consulta SQL para obtener los departamentos y sus códigos DIAN
-    query = """
-    SELECT A.DEPARTAMENTO_DIAN,
-           A.COD_DIAN_DEPARTAMENTO
-    FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.DIAN_DEPARTAMENTOS AS A;
+    - pandas.DataFrame: Un DataFrame con dos columnas: 'COD_DIAN_DEPARTAMENTO' (código del departamento según la DIAN) y
+      'DEPARTAMENTO_DIAN' (nombre del departamento).
     """
-    
-    # Ejecutar la consulta en Snowflake y convertir el resultado en un DataFrame de pandas
-    data = pd.DataFrame(session.sql(query).collect())
+    # Obtener la correlativa desde el store de geografía
+    data = geografia.obtener_geografia(session).correlativa('DEPARTAMENTOS')
         
     return data
 
 
 def obtener_municipios_correlativa(session):
     """
-    Obtiene una lista de municipios y sus códigos DANE desde la base de datos de Snowflake.
-    Consulta la tabla 'DIVIPOLA_MUNICIPIOS' para extraer los nombres y códigos de los municipios registrados.
+    Obtiene una lista de municipios y sus códigos DANE desde el store de geografía en memoria
+    (tabla 'DIVIPOLA_MUNICIPIOS').
 
     Parámetros:
-    - session (snowflake.connector.SnowflakeConnection): Objeto de sesión de Snowflake para ejecutar la consulta.
+    - session (snowflake.snowpark.Session): Sesión de Snowflake, usada solo si el store aún no está cargado.
 
     Retorna:
     - pandas.DataFrame: Un DataFrame con dos columnas: 'COD_DANE_MUNICIPIO' (código del municipio según DANE) y 
       'MUNICIPIO_DANE' (nombre del municipio según DANE).
     """
-    # Definir la consulta SQL para obtener los municipios y sus códigos DANE
-    query = """
-    SELECT A.COD_DANE_MUNICIPIO,
-           A.MUNICIPIO_DANE
-    FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.DIVIPOLA_MUNICIPIOS AS A;
-    """
-    
-    # Ejecutar la consulta en Snowflake y convertir el resultado en un DataFrame de pandas
-    data = pd.DataFrame(session.sql(query).collect())
+    # Obtener la correlativa desde el store de geografía
+    data = geografia.obtener_geografia(session).correlativa('MUNICIPIOS')
         
     return data
 
@@ -3517,8 +3417,8 @@ def format_number_no_decimal(value):
     Retorna:
     - str: El número formateado como cadena sin decimales.
     """
-    # Verificar si el valor es numérico
-    if isinstance(value, (int, float, Decimal)):
+    # Verificar si el valor es numérico (incluye los enteros de numpy que devuelve Arrow)
+    if isinstance(value, numbers.Number):
         # Formatear el número sin decimales, usando coma como separador decimal y punto como separador de miles
         # Se utiliza una cadena de formato y reemplazos para ajustar los separadores
         formatted_value = f"{value:,.0f}".replace(',', 'X').replace('.', ',').replace('X', '.')
@@ -3561,6 +3461,7 @@ def variacion_palabra(valor):
     else:
         return "menos"
     
+@trazas.trazar
 def resumen_datos(data_dict, agrupacion, unidad, export_params, inversion_params, turismo_params, dict_verif):
     """
     Genera un resumen de datos de exportaciones, inversión y turismo.
@@ -4187,7 +4088,8 @@ def crear_diccionario_turismo(data):
 
     return diccionario
 
-def process_data(session, geo_params, dict_verificacion):
+@trazas.trazar
+def process_data(session, geo_params, dict_verificacion=None):
     """
     Procesa y formatea los datos obtenidos de diversas fuentes para su posterior uso en la aplicación.
     La función utiliza parámetros geográficos y de verificación para obtener y transformar datos de exportaciones,
@@ -4201,6 +4103,7 @@ def process_data(session, geo_params, dict_verificacion):
     - session: Objeto de sesión de Snowflake.
     - geo_params: Parámetros geográficos generados externamente.
     - dict_verificacion: Diccionario que indica la disponibilidad de datos para los diferentes ejes.
+                         Si es None se obtiene del cache de verificaciones.
 
     Retorna:
     - processed_data (dict): Diccionario con los datos procesados y formateados para visualización general.
@@ -4215,7 +4118,9 @@ def process_data(session, geo_params, dict_verificacion):
     #################################
 
     # Verificar la disponibilidad de datos en los diferentes ejes (exportaciones, inversión, turismo)
-    dict_verificacion = verif_ejes(session, geo_params)
+    # solo si no fue proporcionada; el cache evita repetir la verificación de la misma unidad
+    if dict_verificacion is None:
+        dict_verificacion = obtener_verificacion(session, geo_params)
     
     # Obtener los parámetros temporales (años y meses) para exportaciones, inversión y turismo
     params_exportaciones = get_parameters_exportaciones(session)
@@ -4229,18 +4134,14 @@ def process_data(session, geo_params, dict_verificacion):
     processed_data = {}
     processed_data_excel = {}
 
-    # Obtener DataFrames de referencia para reemplazar códigos por nombres oficiales
-    df_paises_exportaciones = obtener_paises_correlativa(session, 'EXPORTACIONES')
-    df_paises_inversion = obtener_paises_correlativa(session, 'INVERSION')
-    df_paises_turismo = obtener_paises_correlativa(session, 'TURISMO')
-    df_departamentos = obtener_departamentos_correlativa(session)
-    df_municipios = obtener_municipios_correlativa(session)
+    # Obtener las correlativas en memoria para reemplazar códigos por nombres oficiales
+    geo = geografia.obtener_geografia(session)
 
     # Obtener nombres de paíse o regiones segund UNCTAD dependiendo de la agrupación activa
     if AGRUPACION in ['CONTINENTES']:
-        df_paises_unctad = obtener_paises_correlativa(session, 'UNCTAD_CONTINENTE')
-    elif AGRUPACION in ['HUBS', 'TLCS', 'PAISES', 'COLOMBIA']:
-        df_paises_unctad = obtener_paises_correlativa(session, 'UNCTAD_PAIS')
+        eje_unctad = 'UNCTAD_CONTINENTE'
+    else:
+        eje_unctad = 'UNCTAD_PAIS'
 
     ###############
     # Exportaciones
@@ -4259,6 +4160,7 @@ def process_data(session, geo_params, dict_verificacion):
     }
 
     # Función auxiliar para procesar y formatear DataFrames de exportaciones
+    @trazas.trazar
     def process_exportaciones(data_section_keys, params):
         """
         Procesa y formatea los datos de exportaciones para las secciones especificadas.
@@ -4285,14 +4187,7 @@ def process_data(session, geo_params, dict_verificacion):
 
                 # Reemplazar códigos de país por nombres oficiales si corresponde
                 if sub_key == 'PAIS':
-                    df = df.merge(
-                        df_paises_exportaciones[['PAIS_LLAVE_EXPORTACIONES', 'COUNTRY_OR_AREA_UNSD']],
-                        left_on='CATEGORIA',
-                        right_on='PAIS_LLAVE_EXPORTACIONES',
-                        how='left'
-                    )
-                    df['CATEGORIA'] = df['COUNTRY_OR_AREA_UNSD'].combine_first(df['CATEGORIA'])
-                    df.drop(['PAIS_LLAVE_EXPORTACIONES', 'COUNTRY_OR_AREA_UNSD'], axis=1, inplace=True)
+                    df = geo.reemplazar_nombres(df, 'CATEGORIA', 'EXPORTACIONES')
 
                 # Renombrar la columna 'CATEGORIA' según el diccionario de nombres
                 if 'CATEGORIA' in df.columns and sub_key in column_names_dict_exportaciones:
@@ -4336,6 +4231,7 @@ def process_data(session, geo_params, dict_verificacion):
     processed_data_excel.update(export_processed_data_excel)
 
     # Procesar y formatear los datos de 'TIPOS' y 'TIPOS PESO' en exportaciones
+    @trazas.trazar
     def process_tipos_exportaciones(keys_list, params):
         """
         Procesa y formatea los datos de 'TIPOS' y 'TIPOS PESO' en exportaciones.
@@ -4410,6 +4306,7 @@ def process_data(session, geo_params, dict_verificacion):
     processed_data_excel.update(tipos_processed_data_excel)
 
     # Procesar y formatear los datos de 'EMPRESAS' en exportaciones
+    @trazas.trazar
     def process_empresas_exportaciones(key, params):
         """
         Procesa y formatea los datos de 'EMPRESAS' en exportaciones.
@@ -4494,6 +4391,7 @@ def process_data(session, geo_params, dict_verificacion):
         }    
 
     # Función auxiliar para procesar y formatear DataFrames de inversión
+    @trazas.trazar
     def process_inversion(keys_list):
         """
         Procesa y formatea los datos de inversión para las secciones especificadas.
@@ -4519,14 +4417,7 @@ def process_data(session, geo_params, dict_verificacion):
 
                 # Reemplazar códigos de país por nombres oficiales si corresponde
                 if key in ['IED PAISES', 'ICE PAISES']:
-                    df = df.merge(
-                        df_paises_inversion[['PAIS_INVERSION_BANREP', 'COUNTRY_OR_AREA_UNSD']],
-                        left_on='UNIDAD',
-                        right_on='PAIS_INVERSION_BANREP',
-                        how='left'
-                    )
-                    df['UNIDAD'] = df['COUNTRY_OR_AREA_UNSD'].combine_first(df['UNIDAD'])
-                    df.drop(['PAIS_INVERSION_BANREP', 'COUNTRY_OR_AREA_UNSD'], axis=1, inplace=True)
+                    df = geo.reemplazar_nombres(df, 'UNIDAD', 'INVERSION')
 
                 # Renombrar la columna 'UNIDAD' según el diccionario de nombres
                 if 'UNIDAD' in df.columns and key in column_names_dict_inversion:
@@ -4591,14 +4482,7 @@ def process_data(session, geo_params, dict_verificacion):
                 continue  # Saltar DataFrames vacíos
             
             # Reemplazar códigos de país por nombres oficiales si corresponde
-            df = df.merge(
-                df_paises_unctad[['M49_CODE', 'COUNTRY_OR_AREA_UNSD']],
-                left_on='ECONOMY',
-                right_on='M49_CODE',
-                how='left'
-            )
-            df['ECONOMY'] = df['COUNTRY_OR_AREA_UNSD'].combine_first(df['ECONOMY'])
-            df.drop(['M49_CODE', 'COUNTRY_OR_AREA_UNSD'], axis=1, inplace=True)
+            df = geo.reemplazar_nombres(df, 'ECONOMY', eje_unctad)
             
             # Renombrar economía
             df.rename(columns={'ECONOMY': 'País'}, inplace=True)
@@ -4668,6 +4552,7 @@ def process_data(session, geo_params, dict_verificacion):
     }
 
     # Función auxiliar para procesar y formatear DataFrames de turismo
+    @trazas.trazar
     def process_turismo(key):
         """
         Procesa y formatea los datos de turismo para la sección especificada.
@@ -4693,34 +4578,13 @@ def process_data(session, geo_params, dict_verificacion):
 
             # Reemplazar códigos por nombres oficiales si corresponde
             if sub_key == 'PAIS_RESIDENCIA':
-                df = df.merge(
-                    df_paises_turismo[['CODIGO_PAIS_MIGRACION', 'COUNTRY_OR_AREA_UNSD']],
-                    left_on='País de residencia',
-                    right_on='CODIGO_PAIS_MIGRACION',
-                    how='left'
-                )
-                df['País de residencia'] = df['COUNTRY_OR_AREA_UNSD'].combine_first(df['País de residencia'])
-                df.drop(['CODIGO_PAIS_MIGRACION', 'COUNTRY_OR_AREA_UNSD'], axis=1, inplace=True)
+                df = geo.reemplazar_nombres(df, 'País de residencia', 'TURISMO')
 
             elif sub_key == 'DPTO_HOSPEDAJE':
-                df = df.merge(
-                    df_departamentos[['COD_DIAN_DEPARTAMENTO', 'DEPARTAMENTO_DIAN']],
-                    left_on='Departamento de hospedaje',
-                    right_on='COD_DIAN_DEPARTAMENTO',
-                    how='left'
-                )
-                df['Departamento de hospedaje'] = df['DEPARTAMENTO_DIAN'].combine_first(df['Departamento de hospedaje'])
-                df.drop(['COD_DIAN_DEPARTAMENTO', 'DEPARTAMENTO_DIAN'], axis=1, inplace=True)
+                df = geo.reemplazar_nombres(df, 'Departamento de hospedaje', 'DEPARTAMENTOS')
 
             elif sub_key == 'CIUDAD_HOSPEDAJE':
-                df = df.merge(
-                    df_municipios[['COD_DANE_MUNICIPIO', 'MUNICIPIO_DANE']],
-                    left_on='Ciudad de hospedaje',
-                    right_on='COD_DANE_MUNICIPIO',
-                    how='left'
-                )
-                df['Ciudad de hospedaje'] = df['MUNICIPIO_DANE'].combine_first(df['Ciudad de hospedaje'])
-                df.drop(['COD_DANE_MUNICIPIO', 'MUNICIPIO_DANE'], axis=1, inplace=True)
+                df = geo.reemplazar_nombres(df, 'Ciudad de hospedaje', 'MUNICIPIOS')
 
             # Renombrar y formatear columnas de valores y participaciones
             if 'SUMA_TURISMO_T_1' in df.columns:
@@ -4820,6 +4684,7 @@ def process_data(session, geo_params, dict_verificacion):
     #################################
 
     # Procesar y formatear datos de peso por medios de transporte
+    @trazas.trazar
     def process_peso_medios(keys_list):
         """
         Procesa y formatea los datos de peso por medios de transporte.
@@ -4885,6 +4750,7 @@ def process_data(session, geo_params, dict_verificacion):
     # Retornar los diccionarios con todos los datos procesados y formateados
     return processed_data, processed_data_excel
 
+@trazas.trazar
 def guardar_tablas_en_excel(data_dict, file_path):
     """
     Guarda los DataFrames contenidos en data_dict en un objeto BytesIO como archivo Excel, organizándolos en pestañas específicas
@@ -5057,8 +4923,10 @@ def guardar_tablas_en_excel(data_dict, file_path):
         ('TURISMO CORRIDO', 'MOVC_NOMBRE')
     ]
 
-    # Crear un objeto ExcelWriter para escribir múltiples DataFrames en un archivo Excel
-    with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
+    def hojas():
+        """
+        Recorre las tablas en el orden deseado y entrega los pares (nombre de la pestaña, DataFrame o escalar).
+        """
         # Iterar sobre el orden deseado de las llaves y subllaves
         for key, sub_key in orden_deseado:
             # Omitir ciertas claves específicas que no se desean guardar
@@ -5067,23 +4935,11 @@ def guardar_tablas_en_excel(data_dict, file_path):
             # Verificar si la clave y subclave existen en data_dict
             if key in data_dict and sub_key in data_dict[key]:
                 df = data_dict[key][sub_key]
-                # Verificar si el objeto es un DataFrame
-                if isinstance(df, pd.DataFrame):
-                    # Asegurarse de que el DataFrame no esté vacío
-                    if not df.empty:
-                        # Buscar el nombre de la pestaña en el diccionario de mapeo
-                        sheet_name = sheet_name_mapping.get((key, sub_key), f"{key}_{sub_key}")
-                        # Limitar el nombre de la pestaña a 31 caracteres (límite de Excel)
-                        sheet_name = sheet_name[:31]
-                        # Guardar el DataFrame en la pestaña correspondiente
-                        df.to_excel(writer, sheet_name=sheet_name, index=False)
-                else:
-                    # Si el objeto no es un DataFrame, asume que es un número u otro tipo escalar
-                    # Crear un DataFrame con una sola celda para almacenar el valor
-                    single_value_df = pd.DataFrame({'Valor': [df]})
-                    # Buscar el nombre de la pestaña en el diccionario de mapeo
-                    sheet_name = sheet_name_mapping.get((key, sub_key), f"{key}_{sub_key}")
-                    # Limitar el nombre de la pestaña a 31 caracteres (límite de Excel)
-                    sheet_name = sheet_name[:31]
-                    # Guardar el DataFrame de un solo valor en la pestaña correspondiente
-                    single_value_df.to_excel(writer, sheet_name=sheet_name, index=False)
\ No newline at end of file
+                # Los DataFrames vacíos no generan pestaña; los escalares se escriben en una sola celda
+                if isinstance(df, pd.DataFrame) and df.empty:
+                    continue
+                # Buscar el nombre de la pestaña en el diccionario de mapeo (libro_excel lo limita a 31 caracteres)
+                yield sheet_name_mapping.get((key, sub_key), f"{key}_{sub_key}"), df
+
+    # Escribir el libro fila por fila en modo de memoria constante con celdas numéricas nativas
+    libro_excel.escribir_libro(hojas(), file_path)
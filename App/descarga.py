@@ -1,74 +1,204 @@
 # Librerias
 # Datos
 import datos as dat
-# Documentos 
-import documentos as doc
-# Conversión
-import io
-import base64
+# Generación de Word y Excel en procesos de trabajo
+import generacion as gen
+from concurrent.futures import wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+# Cache de documentos generados, versión de datos y parámetros
+import artefactos as art
+import cache_datos as cache
+import parametros
+# Registro de consultas y trazas por reporte
+import consultas
+import trazas
+# Cola de trabajos de generación
+import trabajos as trab
+import time
+# Usuarios autorizados y registro de eventos
+import usuarios as usr
+import eventos as ev
 # Streamlit
 import streamlit as st
-# Pandas
-import pandas as pd
 
-# Función para cargar el archivo .xlsx con los correos de los usuarios autorizados
-def load_authorized_users():
-    # Leer archivo de planta
-    df = pd.read_excel(".streamlit/Planta.xlsx")
-
-    # Eliminar espacios
-    df['CORREO'] = df['CORREO'].str.strip()
+# Decorador de fragmentos de Streamlit (st.fragment desde la versión 1.37, st.experimental_fragment antes):
+# los clics dentro de un fragmento solo vuelven a ejecutar el fragmento y no toda la página
+fragmento = getattr(st, 'fragment', None) or st.experimental_fragment
 
-    # Extrar correos
-    df_list = df['CORREO'].tolist()
-
-    # Devolver lista
-    return df_list
+# Función para obtener los correos de los usuarios autorizados
+def load_authorized_users():
+    """
+    Retorna el conjunto de correos autorizados (normalizados) del índice compartido por todas las sesiones.
+    El archivo .streamlit/Planta.xlsx solo se vuelve a leer cuando cambia.
+    """
+    return usr.indice_usuarios.correos()
 
 # Función para insertar datos en la tabla de seguimiento
 def registrar_evento(sesion_activa, tipo_evento, detalle_evento, unidad, correo, tipo_boton):
     """
-    Registra un evento en la base de datos Snowflake.
+    Registra un evento en la tabla de seguimiento de Snowflake. El evento se encola en memoria y se escribe
+    por lotes en un hilo de fondo (eventos.py), por lo que la interacción del usuario no espera la escritura.
 
     Args:
-    - sesion_activa: Sesión activa de conexión a la base de datos.
+    - sesion_activa: Sesión activa de conexión a la base de datos (se usa solo si no hay pool de sesiones configurado).
     - tipo_evento (str): Tipo de evento ('selección' o 'descarga').
     - detalle_evento (str): Detalle de evento ('selección continente', 'selección país', etc)
     - unidad (str): Unidad específica del evento (e.g., 'América', 'Colombia').
     - correo (str): Correo electrónico con que el usuario se validó o realizó la descarga.
     - tipo_boton (str): Tipo de botón con tres valores "Selección", "Validación de correo electrónico" o  "Descarga validada".
     """
-    # Crear objeto de conexión
-    conn = sesion_activa.connection
-    try:
-        # Crear consulta para el insert
-        query_insert = f"""
-        INSERT INTO DOCUMENTOS_COLOMBIA.SEGUIMIENTO.SEGUIMIENTO_EVENTOS (TIPO_EVENTO, DETALLE_EVENTO, UNIDAD, CORREO, TIPO_BOTON, FECHA_HORA) 
-        VALUES ('{tipo_evento}', '{detalle_evento}', '{unidad}', '{correo}', '{tipo_boton}', CONVERT_TIMEZONE('America/Los_Angeles', 'America/Bogota', CURRENT_TIMESTAMP));
-        """
-        # Crear un cursor para ejecutar la consulta
-        cur = conn.cursor()
-        try:
-            # Ejecutar la consulta SQL con los valores
-            cur.execute(query_insert)
-        finally:
-            # Cerrar el cursor
-            cur.close()
-    # Error
-    except Exception as e:
-        st.write(f"Error al registrar evento: {e}")
+    ev.registro_eventos.registrar(sesion_activa, tipo_evento, detalle_evento, unidad, correo, tipo_boton)
 
     
+# Detalle del evento de selección por agrupación
+DETALLE_EVENTO_SELECCION = {
+    'CONTINENTES': 'Selección de continente',
+    'PAISES': 'Selección de país',
+    'HUBS': 'Selección de HUB',
+    'TLCS': 'Selección de TLC',
+    'DEPARTAMENTOS': 'Selección de departamento',
+    'COLOMBIA': 'Selección de Colombia'
+}
+
+# Función para generar los documentos Word y Excel (bytes) de una agrupación
+def construir_documentos(agrupacion, _sesion_activa, continentes=None, paises=None, hubs=None, tlcs=None, departamentos=None, umbral=None, header_image_left=None, footer_image=None, progress_bar=None, en_paralelo=True):
+    """
+    Consulta los datos y construye los documentos Word y Excel de la agrupación seleccionada.
+
+    Args:
+    - agrupacion (str): Tipo de agrupación para el informe.
+    - _sesion_activa: Sesión activa de conexión a la base de datos.
+    - continentes, paises, hubs, tlcs, departamentos (list, optional): Unidad seleccionada según la agrupación.
+    - umbral (list, optional): Lista de umbrales de valores.
+    - header_image_left (str, optional): Ruta a la imagen del encabezado izquierdo.
+    - footer_image (str, optional): Ruta a la imagen del pie de página.
+    - progress_bar (optional): Barra de progreso de Streamlit a actualizar.
+    - en_paralelo (bool, optional): Si es True, Word y Excel se construyen al mismo tiempo en el pool de procesos de generacion.py.
+
+    Returns:
+    - tuple: (bytes del documento Word, bytes del documento Excel).
+    """
+    # Unidad del reporte, usada en la traza y en el registro de consultas
+    unidad = next((lista[0] for lista in (continentes, paises, hubs, tlcs, departamentos) if lista), 'Colombia')
+    # Traza por etapas del reporte (trazas.py), exportada en formato Trace Event al terminar
+    with trazas.traza(f"{agrupacion} - {unidad}") as traza_reporte, trazas.tramo('construir_documentos', agrupacion=agrupacion, unidad=unidad):
+        # Las consultas de la unidad se registran bajo un mismo reporte (línea de tiempo en consultas.registro_consultas)
+        with consultas.reporte(f"{agrupacion} - {unidad}"):
+            # Obtener parámetros de datos
+            geo_params = dat.get_data_parametros(_sesion_activa, agrupacion, continentes, paises, hubs, tlcs, departamentos, umbral)
+            # Obtener diccionario de verificación de datos 
+            dict_verificacion = dat.obtener_verificacion(_sesion_activa, geo_params)
+            # Actualizar progreso
+            if progress_bar is not None:
+                progress_bar.progress(5)
+
+            # Procesar datos
+            tables, tables_excel = dat.process_data(_sesion_activa, geo_params, dict_verificacion)
+            if progress_bar is not None:
+                progress_bar.progress(50)
+
+            # Los procesos de generación no tienen sesión de Snowflake: los parámetros del documento se resuelven aquí
+            doc_params = parametros.obtener_parametros(_sesion_activa).documento()
+
+        # Título del documento según la agrupación
+        if agrupacion not in DETALLE_EVENTO_SELECCION:
+            raise ValueError("Agrupación no reconocida")
+        titulo = {
+            'CONTINENTES': continentes[0] if continentes else None,
+            'PAISES': geo_params['NOMBRE PAIS'][0] if agrupacion == 'PAISES' else None,
+            'HUBS': hubs[0] if hubs else None,
+            'TLCS': tlcs[0] if tlcs else None,
+            'DEPARTAMENTOS': departamentos[0] if departamentos else None,
+            'COLOMBIA': None
+        }[agrupacion]
+        argumentos_word = (agrupacion, tables, titulo, header_image_left, footer_image, doc_params, geo_params, dict_verificacion)
+
+        def generar_en_este_proceso():
+            # Generación secuencial (sin pool de procesos)
+            docx_bytes = gen.generar_word(*argumentos_word)
+            if progress_bar is not None:
+                progress_bar.progress(60)
+            xlsx_bytes = gen.generar_excel(tables_excel)
+            if progress_bar is not None:
+                progress_bar.progress(75)
+            return docx_bytes, xlsx_bytes
+
+        if not en_paralelo:
+            return generar_en_este_proceso()
+
+        # Generar el documento Word y el libro Excel al mismo tiempo en procesos de trabajo
+        try:
+            pool = gen.obtener_pool()
+            if traza_reporte is None:
+                futuros = {pool.submit(gen.generar_word, *argumentos_word): 'docx', pool.submit(gen.generar_excel, tables_excel): 'xlsx'}
+            else:
+                # Los tramos de los procesos de trabajo se devuelven con el resultado y se suman a la traza del reporte
+                futuros = {pool.submit(gen.generar_con_traza, 'docx', gen.generar_word, *argumentos_word): 'docx',
+                           pool.submit(gen.generar_con_traza, 'xlsx', gen.generar_excel, tables_excel): 'xlsx'}
+            resultados = {}
+            pendientes = set(futuros)
+            while pendientes:
+                terminados, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    resultado = futuro.result()
+                    if traza_reporte is not None:
+                        resultado, eventos = resultado
+                        traza_reporte.extender(eventos)
+                    resultados[futuros[futuro]] = resultado
+                # Actualizar progreso a medida que termina cada documento
+                if progress_bar is not None:
+                    progress_bar.progress(75 if not pendientes else 60)
+        except BrokenProcessPool:
+            # Un proceso de trabajo terminó de forma inesperada: se recrea el pool y se genera en este proceso
+            gen.reiniciar_pool()
+            return generar_en_este_proceso()
+
+        return resultados['docx'], resultados['xlsx']
+
+# Función para esperar un trabajo de la cola mostrando su progreso
+def esperar_trabajo(id_trabajo, progress_bar, espera_max=trab.TRABAJOS_ESPERA_MAX, intervalo=trab.TRABAJOS_INTERVALO):
+    """
+    Consulta periódicamente un trabajo de la cola y actualiza la barra de progreso hasta que termine.
+
+    Args:
+    - id_trabajo (str): Identificador del trabajo en la cola.
+    - progress_bar: Barra de progreso de Streamlit.
+    - espera_max (int, optional): Segundos máximos de espera.
+    - intervalo (float, optional): Segundos entre consultas.
+
+    Raises:
+    - RuntimeError: Si el trabajo termina con error o no existe.
+    - TimeoutError: Si el trabajo no termina dentro de `espera_max` segundos.
+    """
+    limite = time.monotonic() + espera_max
+    while True:
+        estado = trab.cola_trabajos.consultar(id_trabajo)
+        if estado is None:
+            raise RuntimeError("La solicitud de generación no existe.")
+        if estado['estado'] == trab.TERMINADO:
+            return
+        if estado['estado'] == trab.ERROR:
+            raise RuntimeError(estado['mensaje'])
+        if estado['posicion'] > 0:
+            progress_bar.progress(0, text=f"Solicitud en cola: {estado['posicion']} documentos por delante")
+        else:
+            progress_bar.progress(estado['progreso'], text="Generando el documento")
+        if time.monotonic() > limite:
+            raise TimeoutError("El documento sigue en generación. Por favor, intente de nuevo en unos minutos.")
+        time.sleep(intervalo)
+
 # Función para generar archivos sin generar botón de descarga
-@st.cache_data(show_spinner=False)
-def generar_documentos(agrupacion, _sesion_activa, continentes=None, paises=None, hubs=None, tlcs=None, departamentos=None, umbral=[10000], header_image_left=None, footer_image=None):
+def generar_documentos(agrupacion, _sesion_activa, continentes=None, paises=None, hubs=None, tlcs=None, departamentos=None, umbral=[10000], header_image_left=None, footer_image=None, liberar_sesion=None):
     
     """
     Genera documentos Word y Excel para la agrupación seleccionada y los pone disponibles para descarga.
+    Los documentos se guardan en el cache de artefactos por (agrupación, unidad, versión de datos), de modo que
+    solicitudes posteriores de cualquier usuario para la misma unidad se sirven sin volver a generarlos.
+    Si no están en el cache, la generación se encola en la cola de trabajos (trabajos.py) y se espera su resultado.
 
     Args:
     - agrupacion (str): Tipo de agrupación para el informe (e.g., 'CONTINENTES', 'PAISES', 'HUBS', 'TLCS', 'DEPARTAMENTOS', 'COLOMBIA').
-    - _sesion_activa: Sesión activa de conexión a la base de datos (OBJETO NO HASHEABLE POR ELLO SE PONE _ AL INICIO).
+    - _sesion_activa: Sesión activa de conexión a la base de datos.
     - continentes (tuple, optional): Tupla de continentes seleccionados. Default es None.
     - paises (tuple, optional): Tupla de países seleccionados. Default es None.
     - hubs (tuple, optional): Tupla de HUBs seleccionados. Default es None.
@@ -78,6 +208,8 @@ def generar_documentos(agrupacion, _sesion_activa, continentes=None, paises=None
     - header_image_left (str, optional): Ruta a la imagen del encabezado izquierdo. Default es None.
     - header_image_right (str, optional): Ruta a la imagen del encabezado derecho. Default es None.
     - footer_image (str, optional): Ruta a la imagen del pie de página. Default es None.
+    - liberar_sesion (callable, optional): Función que devuelve la sesión del usuario al pool de sesiones. Si se indica,
+      se llama antes de esperar un trabajo de la cola, ya que la espera no consulta Snowflake. Default es None.
     """
 
     # Convertir tuplas a listas, o definir como None si no se proporcionan valores
@@ -92,77 +224,70 @@ def generar_documentos(agrupacion, _sesion_activa, continentes=None, paises=None
     progress_bar = st.progress(0)
     with st.spinner('Generando el documento, por favor espere...'):
         try:
-            # Obtener parámetros de datos
-            geo_params = dat.get_data_parametros(_sesion_activa, agrupacion, continentes, paises, hubs, tlcs, departamentos, umbral)
-            # Obtener diccionario de verificación de datos 
-            dict_verificacion = dat.verif_ejes(_sesion_activa, geo_params)
-            # Actualizar progreso
-            progress_bar.progress(5)
-            
-            # Procesar datos
-            tables, tables_excel = dat.process_data(_sesion_activa, geo_params, dict_verificacion)
-            progress_bar.progress(50)
+            if agrupacion not in DETALLE_EVENTO_SELECCION:
+                raise ValueError("Agrupación no reconocida")
 
-            # Determinar los nombres de los archivos
+            # Determinar la unidad y los nombres de los archivos
             if agrupacion == 'COLOMBIA':
+                unidad = 'Colombia'
                 file_name_suffix = 'Colombia'
             else:
-                entity_name = (continentes[0] if continentes else
-                               paises[0] if paises else
-                               hubs[0] if hubs else
-                               tlcs[0] if tlcs else
-                               departamentos[0])
-                file_name_suffix = f"{agrupacion} - {entity_name}"
-
-            # Nombres de archivo para descarga
-            file_name_docx = f"Tres Ejes {file_name_suffix}.docx"
-            file_name_xlsx = f"Tres Ejes {file_name_suffix}.xlsx"
-
-            # Crear objetos BytesIO
-            docx_buffer = io.BytesIO()
-            xlsx_buffer = io.BytesIO()
-
-            # Generar el documento Word y registrar evento de selección en la base de datos
-            if agrupacion == 'CONTINENTES':
-                doc.create_document_continentes(tablas=tables, file_path=docx_buffer, titulo=continentes[0], header_image_left=header_image_left, footer_image=footer_image, session=_sesion_activa, geo_params=geo_params, dict_verificacion=dict_verificacion)
-                registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Selección', detalle_evento='Selección de continente', unidad=continentes[0], correo='Correo sin validar', tipo_boton='Selección')
-            elif agrupacion == 'PAISES':
-                doc.create_document_paises(tablas=tables, file_path=docx_buffer, titulo=geo_params['NOMBRE PAIS'][0], header_image_left=header_image_left, footer_image=footer_image, session=_sesion_activa, geo_params=geo_params, dict_verificacion=dict_verificacion)
-                registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Selección', detalle_evento='Selección de país', unidad=paises[0], correo='Correo sin validar', tipo_boton='Selección')
-            elif agrupacion == 'HUBS':
-                doc.create_document_hubs(tablas=tables, file_path=docx_buffer, titulo=hubs[0], header_image_left=header_image_left, footer_image=footer_image, session=_sesion_activa, geo_params=geo_params, dict_verificacion=dict_verificacion)
-                registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Selección', detalle_evento='Selección de HUB', unidad=hubs[0], correo='Correo sin validar', tipo_boton='Selección')   
-            elif agrupacion == 'TLCS':
-                doc.create_document_tlcs(tablas=tables, file_path=docx_buffer, titulo=tlcs[0], header_image_left=header_image_left, footer_image=footer_image, session=_sesion_activa, geo_params=geo_params, dict_verificacion=dict_verificacion)
-                registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Selección', detalle_evento='Selección de TLC', unidad=tlcs[0], correo='Correo sin validar', tipo_boton='Selección')
-            elif agrupacion == 'DEPARTAMENTOS':
-                doc.create_document_departamentos(tablas=tables, file_path=docx_buffer, titulo=departamentos[0], header_image_left=header_image_left, footer_image=footer_image, session=_sesion_activa, geo_params=geo_params, dict_verificacion=dict_verificacion)
-                registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Selección', detalle_evento='Selección de departamento', unidad=departamentos[0], correo='Correo sin validar', tipo_boton='Selección')
-            elif agrupacion == 'COLOMBIA':
-                doc.create_document_colombia(tablas=tables, file_path=docx_buffer, header_image_left=header_image_left, footer_image=footer_image, session=_sesion_activa, dict_verificacion=dict_verificacion)
-                registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Selección', detalle_evento='Selección de Colombia', unidad='Colombia', correo='Correo sin validar', tipo_boton='Selección')
-            else:
-                raise ValueError("Agrupación no reconocida")
-            # Actualizar estado
-            progress_bar.progress(60)
-        
-            # Crear el archivo Excel utilizando la función original
-            dat.guardar_tablas_en_excel(data_dict=tables_excel, file_path=xlsx_buffer)
-            progress_bar.progress(75)
+                unidad = (continentes[0] if continentes else
+                          paises[0] if paises else
+                          hubs[0] if hubs else
+                          tlcs[0] if tlcs else
+                          departamentos[0])
+                file_name_suffix = f"{agrupacion} - {unidad}"
 
-            # Mover los punteros al inicio
-            docx_buffer.seek(0)
-            xlsx_buffer.seek(0)
+            # Buscar los documentos en el cache de artefactos de la publicación de datos vigente
+            version = cache.obtener_version_datos(_sesion_activa)
+            artefacto = art.cache_artefactos.consultar(agrupacion, unidad, version)
 
-            # Codificar los archivos en base64
-            b64_docx = base64.b64encode(docx_buffer.read()).decode()
-            b64_xlsx = base64.b64encode(xlsx_buffer.read()).decode()
+            if artefacto is None:
+                # Encolar la generación (o unirse al trabajo activo de la misma unidad) y esperar a que los
+                # procesos de trabajo guarden los documentos en el cache. Si un rerun interrumpe la espera,
+                # el trabajo continúa y la siguiente ejecución retoma la espera del mismo trabajo, guardado en
+                # session_state, sin volver a encolar la solicitud.
+                clave = (agrupacion, unidad, version)
+                trabajo = st.session_state.get('trabajo_documentos')
+                id_trabajo = None
+                if trabajo is not None and trabajo['clave'] == clave:
+                    estado = trab.cola_trabajos.consultar(trabajo['id'])
+                    if estado is not None and estado['estado'] in (trab.PENDIENTE, trab.EN_PROCESO):
+                        id_trabajo = trabajo['id']
+                if id_trabajo is None:
+                    id_trabajo = trab.cola_trabajos.encolar(agrupacion, unidad, version, {
+                        'continentes': continentes, 'paises': paises, 'hubs': hubs, 'tlcs': tlcs, 'departamentos': departamentos,
+                        'umbral': umbral, 'header_image_left': header_image_left, 'footer_image': footer_image,
+                        'file_name_docx': f"Tres Ejes {file_name_suffix}.docx",
+                        'file_name_xlsx': f"Tres Ejes {file_name_suffix}.xlsx"
+                    })
+                    st.session_state['trabajo_documentos'] = {'clave': clave, 'id': id_trabajo}
+                # La espera no consulta Snowflake: la sesión vuelve al pool para que otros usuarios la usen
+                # mientras tanto (la siguiente ejecución de la página toma una de nuevo)
+                if liberar_sesion is not None:
+                    liberar_sesion()
+                    _sesion_activa = None
+                esperar_trabajo(id_trabajo, progress_bar)
+                st.session_state.pop('trabajo_documentos', None)
+                artefacto = art.cache_artefactos.consultar(agrupacion, unidad, version)
+                if artefacto is None:
+                    raise RuntimeError("El documento generado ya no está disponible en el cache.")
 
-            # Almacenar en session_state
-            st.session_state['b64_docx'] = b64_docx
-            st.session_state['b64_xlsx'] = b64_xlsx
-            st.session_state['file_name_docx'] = file_name_docx
-            st.session_state['file_name_xlsx'] = file_name_xlsx
+            # Registrar evento de selección en la base de datos solo cuando cambia la unidad seleccionada
+            # (la página se vuelve a ejecutar en cada interacción mientras la unidad sigue seleccionada)
+            anteriores = st.session_state.get('documentos')
+            if anteriores is None or (anteriores['agrupacion'], anteriores['unidad']) != (agrupacion, unidad):
+                registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Selección', detalle_evento=DETALLE_EVENTO_SELECCION[agrupacion], unidad=unidad, correo='Correo sin validar', tipo_boton='Selección')
+
+            # Almacenar en session_state solo la referencia a los documentos del cache de artefactos
+            st.session_state['documentos'] = {
+                'agrupacion': agrupacion,
+                'unidad': unidad,
+                'version': version,
+                'file_name_docx': artefacto['file_name_docx'],
+                'file_name_xlsx': artefacto['file_name_xlsx']
+            }
 
             # Actualizar progreso al 100%
             progress_bar.progress(100)
@@ -178,30 +303,40 @@ def generar_documentos(agrupacion, _sesion_activa, continentes=None, paises=None
             progress_bar.empty()
 
 # Función para crear los botones de descarga con validación de correo
-def botones_descarga_word_xlsx(agrupacion, _sesion_activa, unidad):
+@fragmento
+def botones_descarga_word_xlsx(agrupacion, unidad):
 
     """
     Genera botones de descarga para documentos en formatos Word y Excel, con eventos de registro.
     Implementa un proceso donde se solicita el correo electrónico antes de permitir la descarga.
+    Se ejecuta como fragmento de Streamlit: los botones y el campo de correo solo vuelven a ejecutar esta función,
+    sin repetir la conexión, los selectores ni la consulta de los documentos del resto de la página. Por eso no
+    recibe la sesión de la página (al volver a ejecutarse ya pudo volver al pool): los eventos se escriben con
+    sesiones del pool (eventos.py).
 
     Args:
     - agrupacion (str): Tipo de agrupación para el informe (e.g., 'CONTINENTES', 'PAISES', 'HUBS', 'TLCS', 'DEPARTAMENTOS', 'COLOMBIA').
-    - _sesion_activa: Sesión activa de conexión a la base de datos.
     - unidad (tuple or list): Unidad seleccionada para el evento (e.g., continente, país, HUB).
     """
 
     # Cargar lista de usuarios verificados
     usuarios_verificados =  load_authorized_users()
 
-    # Verificar que los archivos están en session_state
-    if 'b64_docx' not in st.session_state or 'b64_xlsx' not in st.session_state:
+    # Verificar que la referencia a los documentos está en session_state
+    if 'documentos' not in st.session_state:
         st.error("No se encontraron los documentos para descargar. Por favor, genere el documento nuevamente.")
         return
 
-    b64_docx = st.session_state['b64_docx']
-    b64_xlsx = st.session_state['b64_xlsx']
-    file_name_docx = st.session_state['file_name_docx']
-    file_name_xlsx = st.session_state['file_name_xlsx']
+    documentos = st.session_state['documentos']
+    file_name_docx = documentos['file_name_docx']
+    file_name_xlsx = documentos['file_name_xlsx']
+
+    def leer_documento(tipo):
+        # Los bytes se leen del cache de artefactos solo cuando se muestra el botón de descarga
+        datos = art.cache_artefactos.leer(documentos['agrupacion'], documentos['unidad'], documentos['version'], tipo)
+        if datos is None:
+            st.error("El documento ya no está disponible. Por favor, genere el documento nuevamente.")
+        return datos
 
     # Creación de detalles de eventos:
     # Parte común 
@@ -257,20 +392,21 @@ def botones_descarga_word_xlsx(agrupacion, _sesion_activa, unidad):
         email_word = st.text_input('Por favor, introduzca su correo electrónico de ProColombia', key='email_word')
         if email_word:
             # Registrar evento de validación
-            registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Descarga', detalle_evento=descripcion_evento_word, unidad=unidad_evento, correo=email_word, tipo_boton='Validación de correo electrónico')
+            registrar_evento(sesion_activa=None, tipo_evento='Descarga', detalle_evento=descripcion_evento_word, unidad=unidad_evento, correo=email_word, tipo_boton='Validación de correo electrónico')
             # Validar el correo
-            if email_word in usuarios_verificados:
+            if usr.normalizar_correo(email_word) in usuarios_verificados:
                 st.session_state['word_email_validated'] = True
                 st.session_state['word_email'] = email_word
                 st.success('Correo electrónico validado. Puede descargar el documento.')
             else:
                 st.error('El correo electrónico debe ser un correo válido para funcionarios de ProColombia')
     # Si el correo es válido, mostrar botón de descarga
-    if st.session_state['word_email_validated']:
-        st.download_button(label='Descargar el documento en Microsoft Word', data=base64.b64decode(b64_docx), 
+    datos_docx = leer_documento('docx') if st.session_state['word_email_validated'] else None
+    if datos_docx is not None:
+        st.download_button(label='Descargar el documento en Microsoft Word', data=datos_docx, 
                 file_name=file_name_docx, help='Presione el botón para descargar el archivo Word', 
                 mime='application/vnd.openxmlformats-officedocument.wordprocessingml.document', 
-                on_click=lambda: registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Descarga', detalle_evento=descripcion_evento_word, unidad=unidad_evento, correo=st.session_state['word_email'], tipo_boton='Descarga validada'),
+                on_click=lambda: registrar_evento(sesion_activa=None, tipo_evento='Descarga', detalle_evento=descripcion_evento_word, unidad=unidad_evento, correo=st.session_state['word_email'], tipo_boton='Descarga validada'),
                 type='secondary',
                 use_container_width=True)
         
@@ -283,19 +419,20 @@ def botones_descarga_word_xlsx(agrupacion, _sesion_activa, unidad):
         email_excel = st.text_input('Por favor, introduzca su correo electrónico de ProColombia', key='email_excel')
         if email_excel:
             # Registrar evento de validación
-            registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Descarga', detalle_evento=descripcion_evento_excel, unidad=unidad_evento, correo=email_excel, tipo_boton='Validación de correo electrónico')
+            registrar_evento(sesion_activa=None, tipo_evento='Descarga', detalle_evento=descripcion_evento_excel, unidad=unidad_evento, correo=email_excel, tipo_boton='Validación de correo electrónico')
             # Validar el correo
-            if email_excel in usuarios_verificados:
+            if usr.normalizar_correo(email_excel) in usuarios_verificados:
                 st.session_state['excel_email_validated'] = True
                 st.session_state['excel_email'] = email_excel
                 st.success('Correo electrónico validado. Puede descargar el documento.')
             else:
                 st.error('El correo electrónico debe ser un correo válido para funcionarios de ProColombia')
     # Si el correo es válido, mostrar botón de descarga
-    if st.session_state['excel_email_validated']:
-        st.download_button(label='Descargar el documento en Microsoft Excel', data=base64.b64decode(b64_xlsx), 
+    datos_xlsx = leer_documento('xlsx') if st.session_state['excel_email_validated'] else None
+    if datos_xlsx is not None:
+        st.download_button(label='Descargar el documento en Microsoft Excel', data=datos_xlsx, 
                 file_name=file_name_xlsx, help='Presione el botón para descargar el archivo Excel', 
                 mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 
-                on_click=lambda: registrar_evento(sesion_activa=_sesion_activa, tipo_evento='Descarga', detalle_evento=descripcion_evento_excel, unidad=unidad_evento, correo=st.session_state['excel_email'], tipo_boton='Descarga validada'),
+                on_click=lambda: registrar_evento(sesion_activa=None, tipo_evento='Descarga', detalle_evento=descripcion_evento_excel, unidad=unidad_evento, correo=st.session_state['excel_email'], tipo_boton='Descarga validada'),
                 type='secondary',
                 use_container_width=True)
@@ -1,15 +1,20 @@
 # Liberias 
+import io
+import os
+import threading
 import pandas as pd
 from docx import Document
-from docx.shared import Pt, RGBColor, Inches, Cm
+from docx.shared import Pt, RGBColor, Inches, Cm, Emu
 from docx.enum.style import WD_STYLE_TYPE
 from docx.enum.text import WD_PARAGRAPH_ALIGNMENT, WD_BREAK
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml import parse_xml, OxmlElement
 from docx.oxml.ns import nsdecls, qn
-from docx.enum.table import WD_TABLE_ALIGNMENT, WD_ALIGN_VERTICAL
+from docx.enum.table import WD_ALIGN_VERTICAL
 from docx.oxml.section import CT_SectPr
 from docx.table import _Row
+import parametros
+import trazas
 
 #####################################
 # FUNCIONES PARA CREAR LOS DOCUMENTOS
@@ -133,92 +138,106 @@ def set_cell_border(cell, **kwargs):
                     element.set(qn("w:{}".format(key)), str(edge_data[key]))
 
 
-def add_table(doc: Document, dataframe: pd.DataFrame, style: str, font_size: int, fuente: str):
+# Bordes de las tablas: se definen una sola vez a nivel de tabla (w:tblBorders) en lugar de celda por celda
+BORDES_TABLA_XML = (
+    '<w:tblBorders>'
+    + ''.join(f'<w:{borde} w:val="single" w:sz="1" w:space="0" w:color="000000"/>' for borde in ['top', 'left', 'bottom', 'right', 'insideH', 'insideV'])
+    + '</w:tblBorders>'
+)
+
+# Colores de relleno de la cabecera y de la fila de total
+COLOR_CABECERA = '#215E99'
+COLOR_TOTAL = '#DAE9F7'
+
+
+def texto_xml(texto):
     """
-    Agrega una tabla al documento a partir de un DataFrame y asegura que no se divida entre páginas.
-    También agrega una nota al final con la fuente de los datos, asegurando que esté en la misma página que la tabla.
+    Convierte un texto en el contenido XML de un run (w:t), escapando caracteres especiales y
+    convirtiendo saltos de línea y tabulaciones igual que python-docx.
+    """
+    texto = texto.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    partes = []
+    for i, linea in enumerate(texto.split('\n')):
+        if i > 0:
+            partes.append('<w:br/>')
+        for j, segmento in enumerate(linea.split('\t')):
+            if j > 0:
+                partes.append('<w:tab/>')
+            if segmento:
+                partes.append(f'<w:t xml:space="preserve">{segmento}</w:t>')
+    return ''.join(partes) or '<w:t/>'
+
+
+def tabla_xml(dataframe: pd.DataFrame, style_id: str, ancho, font_size: int, resaltar_ultima_fila: bool):
+    """
+    Construye en una sola pasada el XML (OOXML) de una tabla con el formato de los documentos: cabecera en negrita
+    con texto blanco sobre #215E99, celdas centradas que se mantienen en la misma página, bordes negros finos y,
+    opcionalmente, la última fila (total) en negrita sobre #DAE9F7.
 
     Args:
-    doc (Document): El documento al que se añadirá la tabla.
     dataframe (DataFrame): El DataFrame que se convertirá en tabla.
-    style (str): El estilo de la tabla.
+    style_id (str): Identificador del estilo de tabla (p. ej. 'TableGrid').
+    ancho (Length): Ancho disponible entre márgenes.
     font_size (int): El tamaño de la letra para los títulos y el contenido de la tabla.
-    fuente (str): La fuente de los datos.
+    resaltar_ultima_fila (bool): Si se aplica el formato de total a la última fila.
+
+    Returns:
+    str: XML del elemento w:tbl.
+    """
+    columnas = len(dataframe.columns)
+    ancho_columna = Emu(ancho // columnas).twips
+    tamano = int(font_size * 2)
+
+    # Plantillas compartidas por todas las celdas de la tabla
+    ppr = '<w:pPr><w:keepNext/><w:keepLines/><w:jc w:val="center"/></w:pPr>'
+    tcpr_base = f'<w:tcW w:type="dxa" w:w="{Emu(ancho).twips}"/>'
+
+    def fila_xml(valores, relleno=None, rpr_extra=''):
+        tcpr = '<w:tcPr>' + tcpr_base + (f'<w:shd w:fill="{relleno}"/>' if relleno else '') + '<w:vAlign w:val="center"/></w:tcPr>'
+        rpr = f'<w:rPr>{rpr_extra}<w:sz w:val="{tamano}"/></w:rPr>'
+        return '<w:tr>' + ''.join(
+            f'<w:tc>{tcpr}<w:p>{ppr}<w:r>{rpr}{texto_xml(str(valor))}</w:r></w:p></w:tc>' for valor in valores
+        ) + '</w:tr>'
+
+    filas = [fila_xml(dataframe.columns, COLOR_CABECERA, '<w:b/><w:color w:val="FFFFFF"/>')]
+    valores_filas = dataframe.itertuples(index=False, name=None)
+    ultima = len(dataframe) - 1
+    for i, valores in enumerate(valores_filas):
+        if resaltar_ultima_fila and i == ultima:
+            filas.append(fila_xml(valores, COLOR_TOTAL, '<w:b/><w:color w:val="000000"/>'))
+        else:
+            filas.append(fila_xml(valores))
+
+    return (
+        f'<w:tbl {nsdecls("w")}>'
+        '<w:tblPr>'
+        f'<w:tblStyle w:val="{style_id}"/>'
+        '<w:tblW w:type="auto" w:w="0"/>'
+        '<w:jc w:val="center"/>'
+        f'{BORDES_TABLA_XML}'
+        '<w:tblLayout w:type="autofit"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+        '</w:tblPr>'
+        '<w:tblGrid>' + f'<w:gridCol w:w="{ancho_columna}"/>' * columnas + '</w:tblGrid>'
+        + ''.join(filas) +
+        '</w:tbl>'
+    )
+
+
+def agregar_tabla_xml(doc: Document, dataframe: pd.DataFrame, style: str, font_size: int, resaltar_ultima_fila: bool):
+    """
+    Inserta al final del documento la tabla construida con tabla_xml, ocupando todo el ancho entre márgenes.
+    """
+    seccion = doc.sections[0]
+    ancho = seccion.page_width - seccion.left_margin - seccion.right_margin
+    tbl = parse_xml(tabla_xml(dataframe, doc.styles[style].style_id, ancho, font_size, resaltar_ultima_fila))
+    doc.element.body._insert_tbl(tbl)
+
+
+def agregar_fuente(doc: Document, fuente: str):
+    """
+    Agrega la fuente de los datos en un nuevo párrafo después de una tabla, en la misma página que la tabla.
     """
-    if not isinstance(dataframe, pd.DataFrame) or dataframe.empty:
-        print(f"El valor proporcionado no es un DataFrame válido o está vacío: {dataframe}")
-        return
-    
-    # Añadir la tabla al documento
-    table = doc.add_table(rows=1, cols=len(dataframe.columns))
-    table.style = doc.styles[style]
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    table.autofit = True  # Desactivar ajuste automático para controlar el ancho de las celdas
-
-    # Configurar encabezados de la tabla
-    hdr_cells = table.rows[0].cells
-    for i, column in enumerate(dataframe.columns):
-        hdr_cells[i].text = str(column)
-        paragraph = hdr_cells[i].paragraphs[0]
-        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        paragraph_format = paragraph.paragraph_format
-        paragraph_format.keep_with_next = True  # Mantener la cabecera con la siguiente fila
-        paragraph_format.keep_together = True  # Mantener la cabecera en una sola página
-        hdr_cells[i].vertical_alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        hdr_cells[i].paragraphs[0].runs[0].bold = True
-        hdr_cells[i].paragraphs[0].runs[0].font.color.rgb = RGBColor(255, 255, 255)
-        hdr_cells[i].paragraphs[0].runs[0].font.size = Pt(font_size)
-        set_cell_border(
-            hdr_cells[i],
-            top={"sz": 1, "val": "single", "color": "000000"},
-            bottom={"sz": 1, "val": "single", "color": "000000"},
-            left={"sz": 1, "val": "single", "color": "000000"},
-            right={"sz": 1, "val": "single", "color": "000000"},
-        )
-
-    # Añadir filas de datos a la tabla
-    for index, row in dataframe.iterrows():
-        row_cells = table.add_row().cells
-        for i, cell in enumerate(row):
-            row_cells[i].text = str(cell)
-            paragraph = row_cells[i].paragraphs[0]
-            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            paragraph_format = paragraph.paragraph_format
-            paragraph_format.keep_with_next = True  # Mantener cada celda con la siguiente en la misma fila
-            paragraph_format.keep_together = True  # Mantener el contenido de la celda en una sola página
-            row_cells[i].vertical_alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            row_cells[i].paragraphs[0].runs[0].font.size = Pt(font_size)
-            set_cell_border(
-                row_cells[i],
-                top={"sz": 1, "val": "single", "color": "000000"},
-                bottom={"sz": 1, "val": "single", "color": "000000"},
-                left={"sz": 1, "val": "single", "color": "000000"},
-                right={"sz": 1, "val": "single", "color": "000000"},
-            )
-
-    # Aplicar formato especial a la primera fila (cabecera)
-    for cell in hdr_cells:
-        shading_elm = OxmlElement("w:shd")
-        shading_elm.set(qn("w:fill"), "#215E99")
-        cell._element.get_or_add_tcPr().append(shading_elm)
-
-    # Aplicar formato especial a la última fila y asegurar que se mantenga unida con la fuente
-    last_row_cells = table.rows[-1].cells
-    for cell in last_row_cells:
-        paragraph = cell.paragraphs[0]
-        paragraph.paragraph_format.keep_with_next = True  # Mantener última fila unida con la fuente
-        cell.paragraphs[0].runs[0].bold = True
-        shading_elm = OxmlElement("w:shd")
-        shading_elm.set(qn("w:fill"), "#DAE9F7")
-        cell._element.get_or_add_tcPr().append(shading_elm)
-        cell.paragraphs[0].runs[0].font.color.rgb = RGBColor(0, 0, 0)
-
-    # Ajustar el ancho de las celdas para que la tabla ocupe todo el ancho de las márgenes del documento
-    for row in table.rows:
-        for cell in row.cells:
-            cell.width = doc.sections[0].page_width - doc.sections[0].left_margin - doc.sections[0].right_margin
-
-    # Agregar la fuente de los datos en un nuevo párrafo y asegurar que esté en la misma página que la tabla
     fuente_paragraph = doc.add_paragraph(f"Fuente: {fuente}", style='Normal')
     fuente_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
     fuente_paragraph_format = fuente_paragraph.paragraph_format
@@ -229,6 +248,30 @@ def add_table(doc: Document, dataframe: pd.DataFrame, style: str, font_size: int
     fuente_paragraph.paragraph_format.left_indent = Cm(0.75)  # Indentación izquierda
     for run in fuente_paragraph.runs:
         run.font.size = Pt(9)  # Ajustar el tamaño de la fuente a 9 puntos
+
+
+def add_table(doc: Document, dataframe: pd.DataFrame, style: str, font_size: int, fuente: str):
+    """
+    Agrega una tabla al documento a partir de un DataFrame y asegura que no se divida entre páginas.
+    La última fila (total) se resalta en negrita con relleno #DAE9F7.
+    También agrega una nota al final con la fuente de los datos, asegurando que esté en la misma página que la tabla.
+
+    Args:
+    doc (Document): El documento al que se añadirá la tabla.
+    dataframe (DataFrame): El DataFrame que se convertirá en tabla.
+    style (str): El estilo de la tabla.
+    font_size (int): El tamaño de la letra para los títulos y el contenido de la tabla.
+    fuente (str): La fuente de los datos.
+    """
+    if not isinstance(dataframe, pd.DataFrame) or dataframe.empty:
+        print(f"El valor proporcionado no es un DataFrame válido o está vacío: {dataframe}")
+        return
+
+    # Construir e insertar la tabla completa en una sola pasada
+    agregar_tabla_xml(doc, dataframe, style, font_size, resaltar_ultima_fila=True)
+
+    # Agregar la fuente de los datos
+    agregar_fuente(doc, fuente)
     
 def add_table_resumen(doc: Document, dataframe: pd.DataFrame, style: str, font_size: int, fuente: str):
     """
@@ -245,76 +288,12 @@ def add_table_resumen(doc: Document, dataframe: pd.DataFrame, style: str, font_s
     if not isinstance(dataframe, pd.DataFrame) or dataframe.empty:
         print(f"El valor proporcionado no es un DataFrame válido o está vacío: {dataframe}")
         return
-    
-    # Añadir la tabla al documento
-    table = doc.add_table(rows=1, cols=len(dataframe.columns))
-    table.style = doc.styles[style]
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
-    table.autofit = True  # Desactivar ajuste automático para controlar el ancho de las celdas
-    
-    # Configurar encabezados de la tabla
-    hdr_cells = table.rows[0].cells
-    for i, column in enumerate(dataframe.columns):
-        hdr_cells[i].text = str(column)
-        paragraph = hdr_cells[i].paragraphs[0]
-        paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        paragraph_format = paragraph.paragraph_format
-        paragraph_format.keep_with_next = True  # Mantener la cabecera con la siguiente fila
-        paragraph_format.keep_together = True  # Mantener la cabecera en una sola página
-        hdr_cells[i].vertical_alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-        hdr_cells[i].paragraphs[0].runs[0].bold = True
-        hdr_cells[i].paragraphs[0].runs[0].font.color.rgb = RGBColor(255, 255, 255)
-        hdr_cells[i].paragraphs[0].runs[0].font.size = Pt(font_size)
-        set_cell_border(
-            hdr_cells[i],
-            top={"sz": 1, "val": "single", "color": "000000"},
-            bottom={"sz": 1, "val": "single", "color": "000000"},
-            left={"sz": 1, "val": "single", "color": "000000"},
-            right={"sz": 1, "val": "single", "color": "000000"},
-        )
-
-    # Añadir filas de datos a la tabla
-    for index, row in dataframe.iterrows():
-        row_cells = table.add_row().cells
-        for i, cell in enumerate(row):
-            row_cells[i].text = str(cell)
-            paragraph = row_cells[i].paragraphs[0]
-            paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            paragraph_format = paragraph.paragraph_format
-            paragraph_format.keep_with_next = True  # Mantener cada celda con la siguiente en la misma fila
-            paragraph_format.keep_together = True  # Mantener el contenido de la celda en una sola página
-            row_cells[i].vertical_alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            row_cells[i].paragraphs[0].runs[0].font.size = Pt(font_size)
-            set_cell_border(
-                row_cells[i],
-                top={"sz": 1, "val": "single", "color": "000000"},
-                bottom={"sz": 1, "val": "single", "color": "000000"},
-                left={"sz": 1, "val": "single", "color": "000000"},
-                right={"sz": 1, "val": "single", "color": "000000"},
-            )
-
-    # Aplicar formato especial a la primera fila (cabecera)
-    for cell in hdr_cells:
-        shading_elm = OxmlElement("w:shd")
-        shading_elm.set(qn("w:fill"), "#215E99")
-        cell._element.get_or_add_tcPr().append(shading_elm)
-
-    # Ajustar el ancho de las celdas para que la tabla ocupe todo el ancho de las márgenes del documento
-    for row in table.rows:
-        for cell in row.cells:
-            cell.width = doc.sections[0].page_width - doc.sections[0].left_margin - doc.sections[0].right_margin
-
-    # Agregar la fuente de los datos en un nuevo párrafo y asegurar que esté en la misma página que la tabla
-    fuente_paragraph = doc.add_paragraph(f"Fuente: {fuente}", style='Normal')
-    fuente_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
-    fuente_paragraph_format = fuente_paragraph.paragraph_format
-    fuente_paragraph_format.keep_together = True  # Mantener la fuente en una sola página
-    fuente_paragraph_format.keep_with_next = False  # No es necesario mantener con otro contenido después
-    fuente_paragraph.space_before = Pt(12)  # Espacio antes del párrafo
-    fuente_paragraph.space_after = Pt(12)  # Espacio después del párrafo
-    fuente_paragraph.paragraph_format.left_indent = Cm(0.75)  # Indentación izquierda
-    for run in fuente_paragraph.runs:
-        run.font.size = Pt(9)  # Ajustar el tamaño de la fuente a 9 puntos
+
+    # Construir e insertar la tabla completa en una sola pasada
+    agregar_tabla_xml(doc, dataframe, style, font_size, resaltar_ultima_fila=False)
+
+    # Agregar la fuente de los datos
+    agregar_fuente(doc, fuente)
 
 
 
@@ -434,6 +413,50 @@ def add_header_footer(doc: Document, header_image_left: str, footer_image: str,
     footer_run_right = footer_paragraph_right.add_run()
     footer_run_right.add_picture(footer_image, width=Inches(2.0))
 
+
+# Plantillas base ya serializadas: (imágenes, texto del pie de página) -> bytes del .docx con estilos, encabezado y pie
+_plantillas_base = {}
+_plantillas_base_lock = threading.Lock()
+
+def plantilla_base(header_image_left: str, footer_image: str, footer_text: str) -> bytes:
+    """
+    Retorna los bytes de un documento vacío con los estilos, el encabezado y el pie de página ya aplicados.
+    La plantilla se construye una sola vez por proceso (y de nuevo solo si cambia alguna de las imágenes).
+    
+    Args:
+    header_image_left (str): Ruta de la imagen izquierda del encabezado.
+    footer_image (str): Ruta de la imagen del pie de página.
+    footer_text (str): Texto para el pie de página.
+    """
+    llave = (header_image_left, os.path.getmtime(header_image_left), footer_image, os.path.getmtime(footer_image), footer_text)
+    with _plantillas_base_lock:
+        plantilla = _plantillas_base.get(llave)
+        if plantilla is None:
+            doc = Document()
+            estilos(doc)
+            add_header_footer(doc, header_image_left, footer_image, footer_text)
+            buffer = io.BytesIO()
+            doc.save(buffer)
+            plantilla = buffer.getvalue()
+            # Solo se conserva la plantilla vigente de cada combinación de imágenes y texto
+            for otra in [otra for otra in _plantillas_base if (otra[0], otra[2], otra[4]) == (llave[0], llave[2], llave[4])]:
+                del _plantillas_base[otra]
+            _plantillas_base[llave] = plantilla
+    return plantilla
+
+
+def documento_base(header_image_left: str, footer_image: str, footer_text: str) -> Document:
+    """
+    Crea un documento nuevo a partir de la plantilla base (equivale a Document() + estilos + add_header_footer
+    sin volver a leer ni a insertar las imágenes).
+    
+    Args:
+    header_image_left (str): Ruta de la imagen izquierda del encabezado.
+    footer_image (str): Ruta de la imagen del pie de página.
+    footer_text (str): Texto para el pie de página.
+    """
+    return Document(io.BytesIO(plantilla_base(header_image_left, footer_image, footer_text)))
+
 def add_bullet_points(doc, bullet_points):
     """
     Agrega una lista de puntos de bala a un documento de Word con el texto justificado.
@@ -487,8 +510,8 @@ def agregar_oportunidades_al_documento(doc, data_dict, key):
 
 def obtener_parametros_documento(session):
     """
-    Esta función extrae los parámetros específicos desde una base de datos en Snowflake
-    y devuelve los resultados en un diccionario.
+    Esta función extrae los parámetros específicos de los documentos desde el snapshot de PARAMETROS
+    de la publicación de datos vigente y devuelve los resultados en un diccionario.
 
     Parámetros:
     - session: sesión de Snowflake.
@@ -496,39 +519,27 @@ def obtener_parametros_documento(session):
     Retorna:
     - dict: Un diccionario con los parámetros solicitados.
     """
-    # Definir la consulta SQL
-    query = """
-    SELECT A.PARAMETRO, A.VALOR
-    FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS AS A
-    WHERE A.PARAMETRO IN ('Fecha de actualización', 'Año cerrado (T)', 'Año corrido texto (T)', 'Texto corrido', 'Corte de información exportaciones', 'Corte de información inversión', 'Corte de información turismo') 
-        AND A.EJE IN ('Transversal', 'Exportaciones', 'Inversión');
-    """
-
-    # Ejecutar la consulta y almacenar los resultados en un DataFrame de pandas
-    data = pd.DataFrame(session.sql(query).collect())
-
-    # Convertir el DataFrame en un diccionario
-    parametros_dict = pd.Series(data.VALOR.values, index=data.PARAMETRO).to_dict()
+    # Obtener los parámetros desde el snapshot compartido (solo consulta Snowflake si cambió la publicación)
+    parametros_dict = parametros.obtener_parametros(session).documento()
 
     return parametros_dict
 
 
-def create_document_colombia(tablas, file_path, header_image_left, footer_image, session, dict_verificacion):
+@trazas.trazar
+def create_document_colombia(tablas, file_path, header_image_left, footer_image, doc_params, dict_verificacion):
   
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
+    # Documento con estilos, encabezado y pie de página a partir de la plantilla base
     footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, footer_image, footer_text)
+    doc = documento_base(header_image_left, footer_image, footer_text)
+    # Secciones del documento medidas en la traza del reporte
+    secciones = trazas.Secciones()
         
+    secciones.iniciar('Portada')
     # Agregar el título principal del informe
     title_paragraph = doc.add_paragraph(f'TRES EJES COLOMBIA', style='Title')
     title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Agregar la fecha
-    doc_params = obtener_parametros_documento(session)
     fecha = doc_params['Fecha de actualización']
     date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
     date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -553,6 +564,7 @@ def create_document_colombia(tablas, file_path, header_image_left, footer_image,
     #########
     # RESUMEN
     #########
+    secciones.iniciar('Resumen')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO') or (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO') or (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Resumen', level=2, style='Heading 1')
 
@@ -649,6 +661,7 @@ def create_document_colombia(tablas, file_path, header_image_left, footer_image,
     ###############
     # Exportaciones
     ###############
+    secciones.iniciar('Exportaciones')
     add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         
@@ -792,6 +805,7 @@ def create_document_colombia(tablas, file_path, header_image_left, footer_image,
     ###########
     # Inversión
     ###########
+    secciones.iniciar('Inversión')
     add_heading(doc, 'Inversión', level=2, style='Heading 1')
     if (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO'):
         
@@ -857,6 +871,7 @@ def create_document_colombia(tablas, file_path, header_image_left, footer_image,
     #########
     # Turismo
     #########
+    secciones.iniciar('Turismo')
     if (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Turismo', level=2, style='Heading 1')
        
@@ -942,6 +957,7 @@ def create_document_colombia(tablas, file_path, header_image_left, footer_image,
     ###########
     # Logística
     ###########
+    secciones.iniciar('Logística')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         add_heading(doc, 'Logística', level=2, style='Heading 1')
     #######
@@ -986,6 +1002,7 @@ def create_document_colombia(tablas, file_path, header_image_left, footer_image,
     ############
     # Disclaimer
     ############
+    secciones.iniciar('Disclaimer')
     # Salto de página
     doc.add_page_break()
     # Agregar saltos de línea para centrar el texto verticalmente
@@ -1002,25 +1019,26 @@ def create_document_colombia(tablas, file_path, header_image_left, footer_image,
     paragraph_disclaimer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Guardar el documento
+    secciones.iniciar('Guardar')
     doc.save(file_path)
+    secciones.terminar()
 
 
-def create_document_continentes(tablas, file_path, titulo, header_image_left, footer_image, session, geo_params, dict_verificacion):
+@trazas.trazar
+def create_document_continentes(tablas, file_path, titulo, header_image_left, footer_image, doc_params, geo_params, dict_verificacion):
   
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
+    # Documento con estilos, encabezado y pie de página a partir de la plantilla base
     footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, footer_image, footer_text)
+    doc = documento_base(header_image_left, footer_image, footer_text)
+    # Secciones del documento medidas en la traza del reporte
+    secciones = trazas.Secciones()
         
+    secciones.iniciar('Portada')
     # Agregar el título principal del informe
     title_paragraph = doc.add_paragraph(f'TRES EJES CONTINENTES: {str(titulo).upper()}', style='Title')
     title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Agregar la fecha
-    doc_params = obtener_parametros_documento(session)
     fecha = doc_params['Fecha de actualización']
     date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
     date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -1047,6 +1065,7 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     #########
     # RESUMEN
     #########
+    secciones.iniciar('Resumen')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO') or (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO') or (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Resumen', level=2, style='Heading 1')
 
@@ -1147,6 +1166,7 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     ###############
     # Exportaciones
     ###############
+    secciones.iniciar('Exportaciones')
     add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         
@@ -1271,6 +1291,7 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     ###########
     # Inversión
     ###########
+    secciones.iniciar('Inversión')
     add_heading(doc, 'Inversión', level=2, style='Heading 1')
     if (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO'):
         
@@ -1343,6 +1364,7 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     #########
     # Turismo
     #########
+    secciones.iniciar('Turismo')
     if (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Turismo', level=2, style='Heading 1')
        
@@ -1428,6 +1450,7 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     ###########
     # Logística
     ###########
+    secciones.iniciar('Logística')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         add_heading(doc, 'Logística', level=2, style='Heading 1')
     #######
@@ -1464,6 +1487,7 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     #######
     # Anexo
     #######
+    secciones.iniciar('Anexo')
     add_heading(doc, 'Anexo: Países considerados', level=2, style='Heading 1')
     # Agregar el párrafo introductorio
     paragraph_intro = doc.add_paragraph(
@@ -1478,6 +1502,7 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     ############
     # Disclaimer
     ############
+    secciones.iniciar('Disclaimer')
     # Salto de página
     doc.add_page_break()
     # Agregar saltos de línea para centrar el texto verticalmente
@@ -1494,24 +1519,25 @@ def create_document_continentes(tablas, file_path, titulo, header_image_left, fo
     paragraph_disclaimer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Guardar el documento
+    secciones.iniciar('Guardar')
     doc.save(file_path)
+    secciones.terminar()
 
-def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_image, session, geo_params, dict_verificacion):
+@trazas.trazar
+def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_image, doc_params, geo_params, dict_verificacion):
   
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
+    # Documento con estilos, encabezado y pie de página a partir de la plantilla base
     footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, footer_image, footer_text)
+    doc = documento_base(header_image_left, footer_image, footer_text)
+    # Secciones del documento medidas en la traza del reporte
+    secciones = trazas.Secciones()
         
+    secciones.iniciar('Portada')
     # Agregar el título principal del informe
     title_paragraph = doc.add_paragraph(f'TRES EJES HUBS: {str(titulo).upper()}', style='Title')
     title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Agregar la fecha
-    doc_params = obtener_parametros_documento(session)
     fecha = doc_params['Fecha de actualización']
     date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
     date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -1539,6 +1565,7 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     #########
     # RESUMEN
     #########
+    secciones.iniciar('Resumen')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO') or (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO') or (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Resumen', level=2, style='Heading 1')
 
@@ -1637,6 +1664,7 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     ###############
     # Exportaciones
     ###############
+    secciones.iniciar('Exportaciones')
     add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         
@@ -1760,6 +1788,7 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     ###########
     # Inversión
     ###########
+    secciones.iniciar('Inversión')
     add_heading(doc, 'Inversión', level=2, style='Heading 1')
     if (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO'):
         
@@ -1830,6 +1859,7 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     #########
     # Turismo
     #########
+    secciones.iniciar('Turismo')
     if (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Turismo', level=2, style='Heading 1')
        
@@ -1915,6 +1945,7 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     ###########
     # Logística
     ###########
+    secciones.iniciar('Logística')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         add_heading(doc, 'Logística', level=2, style='Heading 1')
     #######
@@ -1951,6 +1982,7 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     #######
     # Anexo
     #######
+    secciones.iniciar('Anexo')
     add_heading(doc, 'Anexo: Países considerados', level=2, style='Heading 1')
     # Agregar el párrafo introductorio
     paragraph_intro = doc.add_paragraph(
@@ -1965,6 +1997,7 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     ############
     # Disclaimer
     ############
+    secciones.iniciar('Disclaimer')
     # Salto de página
     doc.add_page_break()
     # Agregar saltos de línea para centrar el texto verticalmente
@@ -1981,25 +2014,26 @@ def create_document_hubs(tablas, file_path, titulo, header_image_left, footer_im
     paragraph_disclaimer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Guardar el documento
+    secciones.iniciar('Guardar')
     doc.save(file_path)
+    secciones.terminar()
 
 
-def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_image, session, geo_params, dict_verificacion):
+@trazas.trazar
+def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_image, doc_params, geo_params, dict_verificacion):
   
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
+    # Documento con estilos, encabezado y pie de página a partir de la plantilla base
     footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, footer_image, footer_text)
+    doc = documento_base(header_image_left, footer_image, footer_text)
+    # Secciones del documento medidas en la traza del reporte
+    secciones = trazas.Secciones()
         
+    secciones.iniciar('Portada')
     # Agregar el título principal del informe
     title_paragraph = doc.add_paragraph(f'TRES EJES TLCS: {str(titulo).upper()}', style='Title')
     title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Agregar la fecha
-    doc_params = obtener_parametros_documento(session)
     fecha = doc_params['Fecha de actualización']
     date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
     date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -2028,6 +2062,7 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     #########
     # RESUMEN
     #########
+    secciones.iniciar('Resumen')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO') or (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO') or (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Resumen', level=2, style='Heading 1')
 
@@ -2125,6 +2160,7 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     ###############
     # Exportaciones
     ###############
+    secciones.iniciar('Exportaciones')
     add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         
@@ -2248,6 +2284,7 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     ###########
     # Inversión
     ###########
+    secciones.iniciar('Inversión')
     add_heading(doc, 'Inversión', level=2, style='Heading 1')
     if (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO'):
         
@@ -2318,6 +2355,7 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     #########
     # Turismo
     #########
+    secciones.iniciar('Turismo')
     if (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Turismo', level=2, style='Heading 1')
        
@@ -2404,6 +2442,7 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     ###########
     # Logística
     ###########
+    secciones.iniciar('Logística')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         add_heading(doc, 'Logística', level=2, style='Heading 1')
     #######
@@ -2440,6 +2479,7 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     #######
     # Anexo
     #######
+    secciones.iniciar('Anexo')
     add_heading(doc, 'Anexo: Países considerados', level=2, style='Heading 1')
     # Agregar el párrafo introductorio
     paragraph_intro = doc.add_paragraph(
@@ -2454,6 +2494,7 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     ############
     # Disclaimer
     ############
+    secciones.iniciar('Disclaimer')
     # Salto de página
     doc.add_page_break()
     # Agregar saltos de línea para centrar el texto verticalmente
@@ -2470,25 +2511,26 @@ def create_document_tlcs(tablas, file_path, titulo, header_image_left, footer_im
     paragraph_disclaimer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Guardar el documento
+    secciones.iniciar('Guardar')
     doc.save(file_path)
+    secciones.terminar()
 
 
-def create_document_paises(tablas, file_path, titulo, header_image_left, footer_image, session, geo_params, dict_verificacion):
+@trazas.trazar
+def create_document_paises(tablas, file_path, titulo, header_image_left, footer_image, doc_params, geo_params, dict_verificacion):
   
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
+    # Documento con estilos, encabezado y pie de página a partir de la plantilla base
     footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, footer_image, footer_text)
+    doc = documento_base(header_image_left, footer_image, footer_text)
+    # Secciones del documento medidas en la traza del reporte
+    secciones = trazas.Secciones()
         
+    secciones.iniciar('Portada')
     # Agregar el título principal del informe
     title_paragraph = doc.add_paragraph(f'TRES EJES PAÍSES: {str(titulo).upper()}', style='Title')
     title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
         # Agregar la fecha
-    doc_params = obtener_parametros_documento(session)
     fecha = doc_params['Fecha de actualización']
     date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
     date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -2517,6 +2559,7 @@ def create_document_paises(tablas, file_path, titulo, header_image_left, footer_
     #########
     # RESUMEN
     #########
+    secciones.iniciar('Resumen')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO') or (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO') or (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Resumen', level=2, style='Heading 1')
 
@@ -2620,6 +2663,7 @@ def create_document_paises(tablas, file_path, titulo, header_image_left, footer_
     ###############
     # Exportaciones
     ###############
+    secciones.iniciar('Exportaciones')
     add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         
@@ -2739,6 +2783,7 @@ def create_document_paises(tablas, file_path, titulo, header_image_left, footer_
     ###########
     # Inversión
     ###########
+    secciones.iniciar('Inversión')
     add_heading(doc, 'Inversión', level=2, style='Heading 1')
     if (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO'):
         
@@ -2792,6 +2837,7 @@ def create_document_paises(tablas, file_path, titulo, header_image_left, footer_
     #########
     # Turismo
     #########
+    secciones.iniciar('Turismo')
     if (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Turismo', level=2, style='Heading 1')
        
@@ -2877,6 +2923,7 @@ def create_document_paises(tablas, file_path, titulo, header_image_left, footer_
     ###########
     # Logística
     ###########
+    secciones.iniciar('Logística')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         add_heading(doc, 'Logística', level=2, style='Heading 1')
     #######
@@ -2911,6 +2958,7 @@ def create_document_paises(tablas, file_path, titulo, header_image_left, footer_
     ############
     # Disclaimer
     ############
+    secciones.iniciar('Disclaimer')
     # Salto de página
     doc.add_page_break()
     # Agregar saltos de línea para centrar el texto verticalmente
@@ -2927,25 +2975,26 @@ def create_document_paises(tablas, file_path, titulo, header_image_left, footer_
     paragraph_disclaimer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Guardar el documento
+    secciones.iniciar('Guardar')
     doc.save(file_path)
+    secciones.terminar()
 
 
-def create_document_departamentos(tablas, file_path, titulo, header_image_left, footer_image, session, geo_params, dict_verificacion):
+@trazas.trazar
+def create_document_departamentos(tablas, file_path, titulo, header_image_left, footer_image, doc_params, geo_params, dict_verificacion):
   
-    doc = Document()
-    estilos(doc)
-
-    # Agregar encabezado y pie de página
+    # Documento con estilos, encabezado y pie de página a partir de la plantilla base
     footer_text = """Calle 28 # 13ª - 15, Edificio CCI Pisos 35 - 36 | Bogotá, Colombia T: +57 (1) 560 0100 | info@procolombia.co | www.procolombia.co"""
-
-    add_header_footer(doc, header_image_left, footer_image, footer_text)
+    doc = documento_base(header_image_left, footer_image, footer_text)
+    # Secciones del documento medidas en la traza del reporte
+    secciones = trazas.Secciones()
         
+    secciones.iniciar('Portada')
     # Agregar el título principal del informe
     title_paragraph = doc.add_paragraph(f'TRES EJES DEPARTAMENTOS: {str(titulo).upper()}', style='Title')
     title_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
         # Agregar la fecha
-    doc_params = obtener_parametros_documento(session)
     fecha = doc_params['Fecha de actualización']
     date_paragraph = doc.add_paragraph(f'ÚLTIMA ACTUALIZACIÓN: {fecha.upper()}', style='Title')
     date_paragraph.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
@@ -2966,6 +3015,7 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     #########
     # RESUMEN
     #########
+    secciones.iniciar('Resumen')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO') or (dict_verificacion['ied_cerrado'] == 'CON DATOS DE IED CERRADO') or (dict_verificacion['ied_corrido'] == 'CON DATOS DE IED CORRIDO') or (dict_verificacion['ice_cerrado'] == 'CON DATOS DE ICE CERRADO') or (dict_verificacion['ice_corrido'] == 'CON DATOS DE ICE CORRIDO') or (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Resumen', level=2, style='Heading 1')
 
@@ -3031,6 +3081,7 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     ###############
     # Exportaciones
     ###############
+    secciones.iniciar('Exportaciones')
     add_heading(doc, 'Exportaciones', level=2, style='Heading 1')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         
@@ -3154,6 +3205,7 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     ###########
     # Inversión
     ###########
+    secciones.iniciar('Inversión')
     if (dict_verificacion['oportunidades_inversion'] == "CON OPORTUNIDADES"):
             add_heading(doc, 'Inversión', level=2, style='Heading 1')
             add_heading(doc, 'Oportunidades de inversión identificadas', level=3, style='Heading 2')
@@ -3162,6 +3214,7 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     #########
     # Turismo
     #########
+    secciones.iniciar('Turismo')
     if (dict_verificacion['turismo_cerrado'] == 'CON DATOS DE TURISMO CERRADO') or (dict_verificacion['turismo_corrido'] == 'CON DATOS DE TURISMO CORRIDO'):
         add_heading(doc, 'Turismo', level=2, style='Heading 1')
        
@@ -3247,6 +3300,7 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     ##############
     # CONECTIVIDAD
     ##############
+    secciones.iniciar('Conectividad')
     if (dict_verificacion['conectividad'] == "CON DATOS DE CONECTIVIDAD"):
         add_heading(doc, 'Conectividad', level=2, style='Heading 1')
         add_table_resumen(doc, pd.DataFrame(tablas['CONECTIVIDAD']['CONECTIVIDAD']), 'Table Grid', 10, fuente_conectividad)
@@ -3256,6 +3310,7 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     ###########
     # Logística
     ###########
+    secciones.iniciar('Logística')
     if (dict_verificacion['exportaciones_totales_cerrado'] == 'CON DATOS DE EXPORTACIONES TOTALES CERRADO') or (dict_verificacion['exportaciones_totales_corrido'] == 'CON DATOS DE EXPORTACIONES TOTALES CORRIDO'):
         add_heading(doc, 'Logística', level=2, style='Heading 1')
     #######
@@ -3290,6 +3345,7 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     ############
     # Disclaimer
     ############
+    secciones.iniciar('Disclaimer')
     # Salto de página
     doc.add_page_break()
     # Agregar saltos de línea para centrar el texto verticalmente
@@ -3306,4 +3362,6 @@ def create_document_departamentos(tablas, file_path, titulo, header_image_left,
     paragraph_disclaimer.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
     # Guardar el documento
+    secciones.iniciar('Guardar')
     doc.save(file_path)
+    secciones.terminar()
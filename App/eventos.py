@@ -0,0 +1,192 @@
+# Librerias
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+###########################################################
+# REGISTRO ASÍNCRONO DE EVENTOS (SEGUIMIENTO_EVENTOS)
+###########################################################
+
+# Los eventos de selección, validación de correo y descarga se encolan en memoria y un hilo de fondo los
+# inserta por lotes, de modo que ningún clic espera una escritura en Snowflake.
+
+# Número máximo de eventos pendientes en memoria; los que llegan con la cola llena se descartan y se cuentan
+EVENTOS_MAX_PENDIENTES = 10000
+# Número máximo de eventos por INSERT
+EVENTOS_LOTE = 500
+# Segundos máximos que un evento espera antes de escribirse
+EVENTOS_INTERVALO = 2
+# Intentos de escritura de un lote antes de descartarlo
+EVENTOS_REINTENTOS = 3
+# Segundos que se espera una sesión del pool para escribir un lote
+EVENTOS_ESPERA_SESION = 5
+# Segundos máximos para escribir los eventos pendientes al terminar el proceso
+EVENTOS_ESPERA_CIERRE = 10
+
+# Hora de Colombia (UTC-5, sin horario de verano), la misma que se registraba con CONVERT_TIMEZONE
+ZONA_BOGOTA = timezone(timedelta(hours=-5))
+
+# Inserción con parámetros enlazados; executemany la envía como un solo INSERT de varias filas
+QUERY_INSERT = """
+INSERT INTO DOCUMENTOS_COLOMBIA.SEGUIMIENTO.SEGUIMIENTO_EVENTOS (TIPO_EVENTO, DETALLE_EVENTO, UNIDAD, CORREO, TIPO_BOTON, FECHA_HORA)
+VALUES (%s, %s, %s, %s, %s, %s)
+"""
+
+
+class RegistroEventos:
+    """
+    Registro de eventos en SEGUIMIENTO_EVENTOS con cola acotada en memoria y escritura por lotes en un hilo de fondo.
+
+    Parámetros:
+    - max_pendientes (int): Número máximo de eventos en memoria.
+    - lote (int): Número máximo de eventos por INSERT.
+    - intervalo (float): Segundos máximos que un evento espera antes de escribirse.
+    """
+
+    def __init__(self, max_pendientes=EVENTOS_MAX_PENDIENTES, lote=EVENTOS_LOTE, intervalo=EVENTOS_INTERVALO):
+        self.lote = lote
+        self.intervalo = intervalo
+        self._cola = queue.Queue(maxsize=max_pendientes)
+        self._lock = threading.Lock()
+        self._pool = None
+        self._sesion = None
+        self._cerrado = threading.Event()
+        self.registrados = 0
+        self.escritos = 0
+        self.descartados = 0
+        self.lotes = 0
+        self.errores = 0
+        self._hilo = threading.Thread(target=self._escribir_periodicamente, name='registro_eventos', daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+
+    def configurar(self, pool):
+        """
+        Indica el pool de sesiones (sesiones.PoolSesiones) del que se toma una sesión para escribir cada lote.
+        Desde entonces no se usan las sesiones recibidas en `registrar`, que pertenecen al pool y pueden estar
+        prestadas a otro usuario.
+        """
+        with self._lock:
+            self._pool = pool
+            self._sesion = None
+
+    def registrar(self, sesion_activa, tipo_evento, detalle_evento, unidad, correo, tipo_boton):
+        """
+        Encola un evento sin esperar su escritura. Si la cola está llena el evento se descarta y se cuenta.
+        La sesión se usa para escribir solo si no se ha configurado un pool de sesiones.
+        """
+        fecha_hora = datetime.now(ZONA_BOGOTA).replace(tzinfo=None)
+        with self._lock:
+            if sesion_activa is not None and self._pool is None:
+                self._sesion = sesion_activa
+            try:
+                self._cola.put_nowait((tipo_evento, detalle_evento, unidad, correo, tipo_boton, fecha_hora))
+                self.registrados += 1
+            except queue.Full:
+                self.descartados += 1
+
+    def _tomar_lote(self, espera):
+        # Espera el primer evento hasta `espera` segundos y luego toma los que ya estén en cola
+        eventos = []
+        try:
+            eventos.append(self._cola.get(timeout=espera))
+        except queue.Empty:
+            return eventos
+        while len(eventos) < self.lote:
+            try:
+                eventos.append(self._cola.get_nowait())
+            except queue.Empty:
+                break
+        return eventos
+
+    def _escribir_lote(self, eventos):
+        """
+        Inserta un lote de eventos con una sola sentencia. Retorna True si se escribió.
+        """
+        with self._lock:
+            pool, sesion = self._pool, self._sesion
+        prestada = False
+        if pool is not None:
+            sesion = pool.tomar(espera_max=EVENTOS_ESPERA_SESION)
+            prestada = sesion is not None
+        if sesion is None:
+            return False
+        try:
+            cur = sesion.connection.cursor()
+            try:
+                cur.executemany(QUERY_INSERT, eventos)
+            finally:
+                cur.close()
+            with self._lock:
+                self.escritos += len(eventos)
+                self.lotes += 1
+            return True
+        except Exception as e:
+            with self._lock:
+                self.errores += 1
+            print(f"Error al registrar {len(eventos)} eventos: {e}")
+            return False
+        finally:
+            if prestada:
+                pool.devolver(sesion)
+
+    def _escribir_periodicamente(self):
+        pendientes, intentos = [], 0
+        while not self._cerrado.is_set() or pendientes:
+            if not pendientes:
+                pendientes, intentos = self._tomar_lote(self.intervalo), 0
+                if not pendientes:
+                    continue
+            if self._escribir_lote(pendientes):
+                pendientes = []
+                continue
+            intentos += 1
+            if intentos >= EVENTOS_REINTENTOS or self._cerrado.is_set():
+                with self._lock:
+                    self.descartados += len(pendientes)
+                pendientes = []
+            else:
+                time.sleep(self.intervalo)
+
+    def vaciar(self, espera_max=EVENTOS_ESPERA_CIERRE):
+        """
+        Escribe en el hilo que llama todos los eventos pendientes (hasta `espera_max` segundos).
+        """
+        limite = time.monotonic() + espera_max
+        while time.monotonic() < limite:
+            eventos = self._tomar_lote(0)
+            if not eventos:
+                return
+            if not self._escribir_lote(eventos):
+                with self._lock:
+                    self.descartados += len(eventos)
+
+    def cerrar(self):
+        """
+        Detiene el hilo de fondo y escribe los eventos pendientes. Se ejecuta al terminar el proceso.
+        """
+        if self._cerrado.is_set():
+            return
+        self._cerrado.set()
+        self._hilo.join(timeout=EVENTOS_ESPERA_CIERRE)
+        self.vaciar()
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con los contadores del registro de eventos.
+        """
+        with self._lock:
+            return {
+                'pendientes': self._cola.qsize(),
+                'registrados': self.registrados,
+                'escritos': self.escritos,
+                'descartados': self.descartados,
+                'lotes': self.lotes,
+                'errores': self.errores,
+            }
+
+
+# Registro compartido por todas las sesiones del proceso
+registro_eventos = RegistroEventos()
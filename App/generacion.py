@@ -0,0 +1,119 @@
+# Librerias
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import datos as dat
+import documentos as doc
+import trazas
+
+#############################################################
+# GENERACIÓN DE WORD Y EXCEL EN PROCESOS DE TRABAJO
+#############################################################
+
+# Una vez consultados los datos, el documento Word y el libro Excel son independientes y consumen CPU:
+# se construyen en procesos separados para que el GIL no los ejecute uno detrás del otro.
+
+# Número de procesos de trabajo compartidos por todas las sesiones del proceso de Streamlit
+GENERACION_PROCESOS = 2
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool():
+    """
+    Retorna el pool de procesos de generación del proceso, creándolo la primera vez.
+    Se usa el método 'spawn' porque el proceso de Streamlit tiene varios hilos activos.
+
+    Retorna:
+    - ProcessPoolExecutor compartido.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=GENERACION_PROCESOS, mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def reiniciar_pool():
+    """
+    Descarta el pool actual (p. ej. si un proceso de trabajo terminó de forma inesperada); el siguiente
+    llamado a obtener_pool crea uno nuevo.
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@trazas.trazar
+def generar_word(agrupacion, tables, titulo, header_image_left, footer_image, doc_params, geo_params, dict_verificacion):
+    """
+    Construye el documento Word de una agrupación. Se ejecuta en un proceso de trabajo, sin sesión de Snowflake:
+    los parámetros del documento se reciben ya resueltos en `doc_params`.
+
+    Parámetros:
+    - agrupacion (str): Agrupación del informe.
+    - tables (dict): Tablas para Word obtenidas de process_data.
+    - titulo (str): Unidad que se muestra en el título (no se usa para COLOMBIA).
+    - header_image_left (str): Ruta a la imagen del encabezado izquierdo.
+    - footer_image (str): Ruta a la imagen del pie de página.
+    - doc_params (dict): Parámetros del documento de la publicación de datos vigente (ParametrosSnapshot.documento()).
+    - geo_params (dict): Parámetros geográficos de get_data_parametros.
+    - dict_verificacion (dict): Diccionario de verificación de datos.
+
+    Retorna:
+    - bytes: Documento Word.
+    """
+    docx_buffer = io.BytesIO()
+    if agrupacion == 'CONTINENTES':
+        doc.create_document_continentes(tablas=tables, file_path=docx_buffer, titulo=titulo, header_image_left=header_image_left, footer_image=footer_image, doc_params=doc_params, geo_params=geo_params, dict_verificacion=dict_verificacion)
+    elif agrupacion == 'PAISES':
+        doc.create_document_paises(tablas=tables, file_path=docx_buffer, titulo=titulo, header_image_left=header_image_left, footer_image=footer_image, doc_params=doc_params, geo_params=geo_params, dict_verificacion=dict_verificacion)
+    elif agrupacion == 'HUBS':
+        doc.create_document_hubs(tablas=tables, file_path=docx_buffer, titulo=titulo, header_image_left=header_image_left, footer_image=footer_image, doc_params=doc_params, geo_params=geo_params, dict_verificacion=dict_verificacion)
+    elif agrupacion == 'TLCS':
+        doc.create_document_tlcs(tablas=tables, file_path=docx_buffer, titulo=titulo, header_image_left=header_image_left, footer_image=footer_image, doc_params=doc_params, geo_params=geo_params, dict_verificacion=dict_verificacion)
+    elif agrupacion == 'DEPARTAMENTOS':
+        doc.create_document_departamentos(tablas=tables, file_path=docx_buffer, titulo=titulo, header_image_left=header_image_left, footer_image=footer_image, doc_params=doc_params, geo_params=geo_params, dict_verificacion=dict_verificacion)
+    elif agrupacion == 'COLOMBIA':
+        doc.create_document_colombia(tablas=tables, file_path=docx_buffer, header_image_left=header_image_left, footer_image=footer_image, doc_params=doc_params, dict_verificacion=dict_verificacion)
+    else:
+        raise ValueError("Agrupación no reconocida")
+    return docx_buffer.getvalue()
+
+
+@trazas.trazar
+def generar_excel(tables_excel):
+    """
+    Construye el libro Excel con las tablas de process_data. Se ejecuta en un proceso de trabajo.
+
+    Parámetros:
+    - tables_excel (dict): Tablas para Excel obtenidas de process_data.
+
+    Retorna:
+    - bytes: Libro Excel.
+    """
+    xlsx_buffer = io.BytesIO()
+    dat.guardar_tablas_en_excel(data_dict=tables_excel, file_path=xlsx_buffer)
+    return xlsx_buffer.getvalue()
+
+
+def generar_con_traza(nombre, funcion, *args):
+    """
+    Ejecuta `funcion(*args)` en el proceso de trabajo registrando sus tramos, para sumarlos a la traza del reporte
+    en el proceso que hizo la solicitud.
+
+    Parámetros:
+    - nombre (str): Nombre de la traza en el proceso de trabajo.
+    - funcion (callable): generar_word o generar_excel.
+    - *args: Argumentos de la función.
+
+    Retorna:
+    - tuple: (resultado de la función, lista de eventos de la traza).
+    """
+    with trazas.traza(nombre, exportar=False) as traza_trabajo:
+        resultado = funcion(*args)
+    return resultado, (list(traza_trabajo.eventos) if traza_trabajo is not None else [])
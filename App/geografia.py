@@ -0,0 +1,150 @@
+# Librerias
+import cache_datos as cache
+import consultas
+
+###################################################
+# DIMENSIONES GEOGRÁFICAS EN MEMORIA (GEOGRAFIA.*)
+###################################################
+
+# Tablas del esquema GEOGRAFIA que se cargan una sola vez por publicación de datos y columnas requeridas
+TABLAS_GEOGRAFIA = {
+    'ST_PAISES': [
+        'COUNTRY_OR_AREA', 'PAIS_LLAVE_EXPORTACIONES', 'PAIS_INVERSION_BANREP', 'M49_CODE',
+        'CODIGO_PAIS_MIGRACION', 'NOMBRE_PAIS_MIGRACION', 'REGION_NAME', 'REGION_NAME_EXPORTACIONES',
+        'REGION_NAME_TURISMO_AGREGADA', 'HUB_NAME_EXPORTACIONES', 'HUB_NAME_TURISMO', 'NOMBRE_TLC'
+    ],
+    'CONTINENTES': ['REGION_NAME', 'REGION_NAME_EXPORTACIONES', 'REGION_NAME_TURISMO_AGREGADA'],
+    'HUBS': ['NOMBRE_HUB', 'HUB_NAME_EXPORTACIONES', 'HUB_NAME_TURISMO'],
+    'TLCS': ['NOMBRE_TLC'],
+    'DIAN_DEPARTAMENTOS': ['COD_DIAN_DEPARTAMENTO', 'DEPARTAMENTO_DIAN'],
+    'DIVIPOLA_DEPARTAMENTOS_MUNICIPIOS': ['COD_DANE_DEPARTAMENTO', 'MUNICIPIO_DANE', 'COD_DANE_MUNICIPIO'],
+    'DIVIPOLA_MUNICIPIOS': ['COD_DANE_MUNICIPIO', 'MUNICIPIO_DANE'],
+}
+
+# Columnas por las que se filtra cada tabla (agrupación -> filas miembro)
+COLUMNAS_INDICE = {
+    'ST_PAISES': [
+        'COUNTRY_OR_AREA', 'REGION_NAME', 'REGION_NAME_EXPORTACIONES', 'REGION_NAME_TURISMO_AGREGADA',
+        'HUB_NAME_EXPORTACIONES', 'HUB_NAME_TURISMO', 'NOMBRE_TLC'
+    ],
+    'CONTINENTES': ['REGION_NAME'],
+    'HUBS': ['NOMBRE_HUB'],
+    'DIAN_DEPARTAMENTOS': ['DEPARTAMENTO_DIAN'],
+    'DIVIPOLA_DEPARTAMENTOS_MUNICIPIOS': ['COD_DANE_DEPARTAMENTO'],
+}
+
+# Correlativas código -> nombre oficial: eje -> (tabla, columna de código, columna de nombre)
+CORRELATIVAS = {
+    'EXPORTACIONES': ('ST_PAISES', 'PAIS_LLAVE_EXPORTACIONES', 'COUNTRY_OR_AREA'),
+    'INVERSION': ('ST_PAISES', 'PAIS_INVERSION_BANREP', 'COUNTRY_OR_AREA'),
+    'TURISMO': ('ST_PAISES', 'CODIGO_PAIS_MIGRACION', 'COUNTRY_OR_AREA'),
+    'UNCTAD_PAIS': ('ST_PAISES', 'M49_CODE', 'COUNTRY_OR_AREA'),
+    'UNCTAD_CONTINENTE': ('ST_PAISES', 'M49_CODE', 'COUNTRY_OR_AREA'),
+    'DEPARTAMENTOS': ('DIAN_DEPARTAMENTOS', 'COD_DIAN_DEPARTAMENTO', 'DEPARTAMENTO_DIAN'),
+    'MUNICIPIOS': ('DIVIPOLA_MUNICIPIOS', 'COD_DANE_MUNICIPIO', 'MUNICIPIO_DANE'),
+}
+
+
+class GeografiaStore:
+    """
+    Copia en memoria de las tablas de GEOGRAFIA con índices hash para resolver filtros por agrupación
+    (continente, hub, TLC, país, departamento) y reemplazos de códigos por nombres oficiales sin consultar Snowflake.
+
+    Parámetros:
+    - tablas (dict): Diccionario {nombre de tabla: DataFrame de pandas} con las columnas de TABLAS_GEOGRAFIA.
+    """
+
+    def __init__(self, tablas):
+        self.tablas = tablas
+
+        # Índices valor -> posiciones de las filas que lo contienen
+        self.indices = {}
+        for tabla, columnas in COLUMNAS_INDICE.items():
+            df = tablas[tabla]
+            self.indices[tabla] = {columna: df.groupby(columna, sort=False).indices for columna in columnas}
+
+        # Diccionarios código -> nombre oficial por eje
+        self.nombres = {}
+        for eje, (tabla, codigo, nombre) in CORRELATIVAS.items():
+            df = tablas[tabla][[codigo, nombre]].dropna(subset=[codigo]).drop_duplicates(subset=[codigo])
+            self.nombres[eje] = dict(zip(df[codigo], df[nombre]))
+
+    def filtrar(self, tabla, columna, valores, columnas=None):
+        """
+        Retorna las filas de `tabla` cuyo valor en `columna` está en `valores` (equivalente a isin) usando el índice hash.
+
+        Parámetros:
+        - tabla (str): Nombre de la tabla en TABLAS_GEOGRAFIA.
+        - columna (str): Columna indexada por la que se filtra.
+        - valores (list): Valores buscados.
+        - columnas (list, opcional): Columnas a retornar. Por defecto todas.
+
+        Retorna:
+        - pandas.DataFrame con las filas encontradas.
+        """
+        df = self.tablas[tabla]
+        indice = self.indices[tabla][columna]
+        posiciones = [pos for valor in dict.fromkeys(valores or []) if valor in indice for pos in indice[valor]]
+        resultado = df.iloc[sorted(posiciones)]
+        return resultado[columnas] if columnas else resultado
+
+    def correlativa(self, eje):
+        """
+        Retorna la correlativa del eje como DataFrame con las columnas (código, COUNTRY_OR_AREA_UNSD) para países
+        o (código, nombre) para departamentos y municipios, igual que las consultas originales.
+        """
+        tabla, codigo, nombre = CORRELATIVAS[eje]
+        df = self.tablas[tabla][[codigo, nombre]].drop_duplicates()
+        if tabla == 'ST_PAISES':
+            df = df.rename(columns={nombre: 'COUNTRY_OR_AREA_UNSD'})
+        return df.reset_index(drop=True)
+
+    def reemplazar_nombres(self, df, columna, eje):
+        """
+        Reemplaza los códigos de `columna` por el nombre oficial del eje; los códigos sin equivalencia se conservan.
+
+        Parámetros:
+        - df (pandas.DataFrame): DataFrame a modificar.
+        - columna (str): Columna con los códigos.
+        - eje (str): Llave de CORRELATIVAS.
+
+        Retorna:
+        - pandas.DataFrame con la columna reemplazada.
+        """
+        df = df.copy()
+        df[columna] = df[columna].map(self.nombres[eje]).combine_first(df[columna])
+        return df
+
+
+def cargar_geografia(session):
+    """
+    Descarga desde Snowflake las tablas de GEOGRAFIA definidas en TABLAS_GEOGRAFIA y construye el GeografiaStore.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+
+    Retorna:
+    - GeografiaStore con las tablas e índices cargados.
+    """
+    tablas = {}
+    for tabla, columnas in TABLAS_GEOGRAFIA.items():
+        query = f"SELECT {', '.join(columnas)} FROM DOCUMENTOS_COLOMBIA.GEOGRAFIA.{tabla}"
+        tablas[tabla] = consultas.ejecutar(session, query, plantilla=f'geografia.{tabla}', como='pandas')
+    return GeografiaStore(tablas)
+
+
+# Cache del store compartido por todas las sesiones del proceso
+cache_geografia = cache.CacheVersionada('geografia')
+
+def obtener_geografia(session):
+    """
+    Retorna el GeografiaStore de la publicación de datos vigente, cargándolo solo la primera vez.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+
+    Retorna:
+    - GeografiaStore compartido (solo lectura).
+    """
+    version = cache.obtener_version_datos(session)
+    return cache_geografia.obtener('GEOGRAFIA', version, lambda: cargar_geografia(session))
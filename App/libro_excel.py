@@ -0,0 +1,145 @@
+# Librerias
+import math
+import numbers
+import pandas as pd
+import xlsxwriter
+
+############################################################
+# ESCRITURA DEL LIBRO EXCEL (XLSXWRITER EN MEMORIA CONSTANTE)
+############################################################
+
+# Formatos numéricos de Excel: los valores se guardan como números nativos y Excel solo los presenta
+FORMATO_MILES = '#,##0'
+FORMATO_DECIMALES = '#,##0.00'
+FORMATO_PORCENTAJE = '0.00%'
+# Las columnas de participación y variación traen el porcentaje en puntos (12.5 = 12,5%) y se marcan con '(%)'
+MARCA_PORCENTAJE = '(%)'
+# Ancho mínimo y máximo de las columnas (en caracteres)
+ANCHO_MINIMO = 12
+ANCHO_MAXIMO = 60
+# Límite de Excel para el nombre de una pestaña
+LARGO_MAXIMO_PESTANA = 31
+
+
+def tipo_columna(nombre, serie):
+    """
+    Determina cómo se escribe una columna en Excel a partir de su nombre y su tipo de dato.
+
+    Parámetros:
+    - nombre (str): Nombre de la columna.
+    - serie (pandas.Series): Valores de la columna.
+
+    Retorna:
+    - tuple: ('numero', formato, divisor) para columnas numéricas o ('texto', None, None) para las demás.
+    """
+    if pd.api.types.is_bool_dtype(serie) or not pd.api.types.is_numeric_dtype(serie):
+        return 'texto', None, None
+    if MARCA_PORCENTAJE in str(nombre):
+        return 'numero', FORMATO_PORCENTAJE, 100
+    if pd.api.types.is_integer_dtype(serie):
+        return 'numero', FORMATO_MILES, None
+    # Columnas flotantes sin decimales (p. ej. la balanza comercial redondeada a 0) se muestran sin decimales
+    valores = serie.dropna()
+    if not valores.empty and (valores == valores.round(0)).all():
+        return 'numero', FORMATO_MILES, None
+    return 'numero', FORMATO_DECIMALES, None
+
+
+def escribir_hoja(libro, nombre_hoja, df, formato_encabezado, formatos):
+    """
+    Escribe un DataFrame en una pestaña nueva fila por fila (requisito del modo de memoria constante),
+    con celdas numéricas nativas, encabezado fijo y autofiltro para que la tabla se pueda ordenar en Excel.
+
+    Parámetros:
+    - libro (xlsxwriter.Workbook): Libro en el que se crea la pestaña.
+    - nombre_hoja (str): Nombre de la pestaña.
+    - df (pandas.DataFrame): Datos a escribir.
+    - formato_encabezado (xlsxwriter.format.Format): Formato de la fila de encabezado.
+    - formatos (dict): Formatos numéricos del libro {código de formato: Format}.
+    """
+    hoja = libro.add_worksheet(nombre_hoja[:LARGO_MAXIMO_PESTANA])
+    columnas = [str(columna) for columna in df.columns]
+    tipos = [tipo_columna(columna, df.iloc[:, posicion]) for posicion, columna in enumerate(columnas)]
+
+    # Anchos y formatos por columna (se definen antes de escribir las filas)
+    for posicion, (columna, (tipo, formato, _)) in enumerate(zip(columnas, tipos)):
+        if tipo == 'texto':
+            largos = df.iloc[:, posicion].dropna().astype(str).str.len()
+            ancho = max(len(columna), int(largos.max()) if not largos.empty else 0)
+        else:
+            ancho = len(columna)
+        hoja.set_column(posicion, posicion, min(max(ancho + 2, ANCHO_MINIMO), ANCHO_MAXIMO),
+                        formatos[formato] if formato else None)
+
+    # Encabezado
+    for posicion, columna in enumerate(columnas):
+        hoja.write_string(0, posicion, columna, formato_encabezado)
+
+    # Filas: se recorren las columnas ya convertidas a tipos de Python, sin construir objetos por fila
+    valores_columnas = [df.iloc[:, posicion].tolist() for posicion in range(len(columnas))]
+    for fila, valores in enumerate(zip(*valores_columnas), start=1):
+        for posicion, valor in enumerate(valores):
+            tipo, formato, divisor = tipos[posicion]
+            # Celdas vacías para nulos (Excel no admite NaN ni infinitos como número)
+            if valor is None or (isinstance(valor, float) and not math.isfinite(valor)) or valor is pd.NA or valor is pd.NaT:
+                continue
+            if tipo == 'numero':
+                hoja.write_number(fila, posicion, valor / divisor if divisor else valor, formatos[formato])
+            elif isinstance(valor, str):
+                hoja.write_string(fila, posicion, valor)
+            elif isinstance(valor, numbers.Number) and not isinstance(valor, bool):
+                hoja.write_number(fila, posicion, valor)
+            else:
+                hoja.write(fila, posicion, str(valor) if not isinstance(valor, bool) else valor)
+
+    hoja.freeze_panes(1, 0)
+    if len(df) > 0 and columnas:
+        hoja.autofilter(0, 0, len(df), len(columnas) - 1)
+
+
+def escribir_valor(libro, nombre_hoja, valor, formato_encabezado, formatos):
+    """
+    Escribe un valor escalar en una pestaña nueva con una sola columna 'Valor'.
+
+    Parámetros:
+    - libro (xlsxwriter.Workbook): Libro en el que se crea la pestaña.
+    - nombre_hoja (str): Nombre de la pestaña.
+    - valor: Valor a escribir (número o texto).
+    - formato_encabezado (xlsxwriter.format.Format): Formato de la fila de encabezado.
+    - formatos (dict): Formatos numéricos del libro {código de formato: Format}.
+    """
+    hoja = libro.add_worksheet(nombre_hoja[:LARGO_MAXIMO_PESTANA])
+    hoja.set_column(0, 0, ANCHO_MINIMO)
+    hoja.write_string(0, 0, 'Valor', formato_encabezado)
+    if isinstance(valor, numbers.Number) and not isinstance(valor, bool):
+        if math.isfinite(valor):
+            formato = FORMATO_MILES if float(valor).is_integer() else FORMATO_DECIMALES
+            hoja.write_number(1, 0, valor, formatos[formato])
+    elif valor is not None:
+        hoja.write(1, 0, valor if isinstance(valor, (str, bool)) else str(valor))
+
+
+def escribir_libro(hojas, file_path):
+    """
+    Escribe un libro de Excel con xlsxwriter en modo de memoria constante: cada fila se envía a disco al
+    escribirse, por lo que el uso de memoria no crece con el número de pestañas ni de filas.
+
+    Parámetros:
+    - hojas (iterable): Pares (nombre de la pestaña, DataFrame o valor escalar). Los escalares se escriben
+      en una pestaña con una sola columna 'Valor'.
+    - file_path (str o BytesIO): Destino del archivo Excel.
+
+    Retorna:
+    - None: El libro queda escrito en file_path.
+    """
+    libro = xlsxwriter.Workbook(file_path, {'constant_memory': True})
+    try:
+        formato_encabezado = libro.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top', 'text_wrap': True})
+        formatos = {formato: libro.add_format({'num_format': formato}) for formato in (FORMATO_MILES, FORMATO_DECIMALES, FORMATO_PORCENTAJE)}
+        for nombre_hoja, datos in hojas:
+            if isinstance(datos, pd.DataFrame):
+                escribir_hoja(libro, nombre_hoja, datos, formato_encabezado, formatos)
+            else:
+                escribir_valor(libro, nombre_hoja, datos, formato_encabezado, formatos)
+    finally:
+        libro.close()
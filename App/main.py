@@ -5,6 +5,10 @@ import warnings
 import streamlit as st
 import selectores as selectores
 import descarga as desc
+import sesiones as ses
+import eventos as ev
+import calentamiento
+import trabajos as trab
 import time
 from datetime import datetime, timedelta
 
@@ -56,6 +60,8 @@ SESSION_TIMEOUT = timedelta(minutes=15)
 def create_session(retries=3, wait=5):
     """
     Crea una nueva sesión de Snowflake, con lógica de reintentos en caso de fallo.
+    Cada sesión abre su propia conexión con la configuración de [connections.snowflake] en los secrets,
+    de modo que las sesiones del pool no comparten conexión entre sí.
     
     Args:
         retries (int): Número máximo de intentos de conexión. Por defecto, 3.
@@ -68,8 +74,8 @@ def create_session(retries=3, wait=5):
     for attempt in range(retries):
         try:
             # Conectar a Snowflake
-            connection = st.connection("snowflake") # Establecer conexión con Snowflake
-            sesion_activa = connection.session()  # Obtener sesión acti
+            configuracion = dict(st.secrets["connections"]["snowflake"]) # Configuración de la conexión con Snowflake
+            sesion_activa = ses.crear_sesion(configuracion)  # Crear sesión autenticada
             success = True
             break
         except Exception as e:
@@ -82,24 +88,52 @@ def create_session(retries=3, wait=5):
         print("Todos los intentos de conexión fallaron.")
         return None
 
+# Pool de sesiones compartido por todos los usuarios del proceso
+@st.cache_resource(show_spinner=False)
+def obtener_pool_sesiones():
+    """
+    Crea una sola vez por proceso el pool de sesiones de Snowflake y abre sus sesiones mínimas.
+    """
+    pool = ses.PoolSesiones(create_session)
+    pool.calentar()
+    # Los lotes de eventos de seguimiento se escriben con sesiones del pool
+    ev.registro_eventos.configurar(pool)
+    return pool
+
+# Procesos de trabajo que generan los documentos fuera del script de Streamlit
+@st.cache_resource(show_spinner=False)
+def obtener_supervisor_trabajos():
+    """
+    Lanza una sola vez por proceso el supervisor de los procesos de trabajo de la cola de documentos.
+    Los procesos de trabajo reciben la misma configuración de conexión que la aplicación (st.secrets).
+    """
+    return trab.SupervisorTrabajadores(dict(st.secrets["connections"]["snowflake"]))
+
+# Función para devolver la sesión al pool
+def liberar_session():
+    """
+    Devuelve al pool la sesión prestada a este usuario, si tiene una.
+    """
+    if st.session_state.session is not None:
+        obtener_pool_sesiones().devolver(st.session_state.session)
+        st.session_state.session = None
+
 # Función para verificar si la sesión ha expirado
 def check_session():
     """
-    Verifica si la sesión actual ha expirado. Si es así, cierra la sesión.
+    Verifica si la sesión actual ha expirado. Si es así, la devuelve al pool.
     """
     if (datetime.now() - st.session_state.last_activity_time) > SESSION_TIMEOUT:
-        if st.session_state.session:
-            st.session_state.session.close()  # Cerrar la sesión expirada
-        st.session_state.session = None
+        liberar_session()
 
 # Función para obtener la sesión activa
 def get_session():
     """
-    Obtiene la sesión activa de Snowflake. Si no existe o ha expirado, crea una nueva.
+    Obtiene la sesión activa de Snowflake. Si no existe o ha expirado, toma una del pool.
     """
     check_session()  # Verificar si la sesión ha expirado
     if st.session_state.session is None:
-        st.session_state.session = create_session()  # Crear nueva sesión si no existe
+        st.session_state.session = obtener_pool_sesiones().tomar()  # Tomar una sesión del pool si no existe
 
 # Función para actualizar el tiempo de última actividad
 def update_last_activity():
@@ -112,10 +146,11 @@ def flujo_snowflake():
     """
     Gestiona el flujo para interactuar con Snowflake, asegurando que:
     1. Se registre la última actividad del usuario.
-    2. Se obtenga una sesión activa, ya sea verificando la existente o creando una nueva.
+    2. Se obtenga una sesión activa, ya sea verificando la existente o tomando una del pool.
 
     Este flujo utiliza funciones auxiliares para manejar la sesión y garantizar
     que el tiempo de espera (timeout) y la lógica de reconexión se respeten.
+    La sesión se devuelve al pool al terminar cada ejecución de la aplicación.
     """
     # Paso 1: Actualizar el tiempo de última actividad
     # Esto asegura que el registro de actividad esté actualizado para prevenir 
@@ -124,15 +159,16 @@ def flujo_snowflake():
 
     # Paso 2: Obtener la sesión activa
     # Verifica si hay una sesión activa. Si ha expirado o no existe, 
-    # intenta crear una nueva sesión de Snowflake.
+    # toma una sesión autenticada del pool compartido.
     get_session()
 
 # Limpiar cache
 def limpiar_cache():
     """
-    Limpia el cache de datos de Streamlit.
+    Limpia los documentos generados para este usuario al cambiar de opción. El cache compartido de documentos
+    (artefactos.cache_artefactos) y los caches de Streamlit no se tocan, ya que los usan todos los usuarios.
     """
-    st.cache_data.clear()  # Limpia el cache de datos de Streamlit
+    st.session_state.pop('documentos', None)
 
 ######################################
 # 1. Definir el flujo de la aplicación
@@ -143,6 +179,9 @@ def main():
     # Flujo de Snowflake:
     flujo_snowflake()
 
+    # Procesos de trabajo de la cola de documentos
+    obtener_supervisor_trabajos()
+
     ## Menú de navegación
     ### Logo ProColombia
     with st.sidebar:
@@ -234,6 +273,9 @@ def documentos():
     # Flujo de Snowflake:
     flujo_snowflake()
 
+    # Reanudar la bodega y cargar los caches en segundo plano mientras el usuario elige una unidad
+    calentamiento.calentador.calentar(obtener_pool_sesiones())
+
     # Banner
     st.image(image=documentos_img, caption=None, use_column_width="always")
     # Instrucciones de descarga
@@ -296,9 +338,10 @@ def documentos():
                 _sesion_activa=st.session_state.session,
                 continentes=continente_elegido_tuple,
                 header_image_left=top_left_img,
-                footer_image=bottom_right)
+                footer_image=bottom_right,
+                liberar_sesion=liberar_session)
             # Botones de descarga
-            desc.botones_descarga_word_xlsx('CONTINENTES', st.session_state.session, continente_elegido)
+            desc.botones_descarga_word_xlsx('CONTINENTES', continente_elegido)
                                 
    # HUB
     if eleccion_usuario == "**HUB:** Explore un informe organizado por HUB.":
@@ -326,9 +369,10 @@ def documentos():
                 _sesion_activa=st.session_state.session,
                 hubs=hub_elegido_tuple,
                 header_image_left=top_left_img,
-                footer_image=bottom_right)
+                footer_image=bottom_right,
+                liberar_sesion=liberar_session)
             # Botones de descarga
-            desc.botones_descarga_word_xlsx('HUBS', st.session_state.session, hub_elegido)
+            desc.botones_descarga_word_xlsx('HUBS', hub_elegido)
             
     # TLCS
     if eleccion_usuario == '**TLC:** Explore un informe organizado por Tratado de Libre Comercio.':
@@ -356,9 +400,10 @@ def documentos():
                 _sesion_activa=st.session_state.session,
                 tlcs=tlc_elegido_tuple,
                 header_image_left=top_left_img,
-                footer_image=bottom_right)
+                footer_image=bottom_right,
+                liberar_sesion=liberar_session)
             # Botones de descarga
-            desc.botones_descarga_word_xlsx('TLCS', st.session_state.session, tlc_elegido)
+            desc.botones_descarga_word_xlsx('TLCS', tlc_elegido)
 
     # País
     if eleccion_usuario == "**País:** Explore un informe organizado por país.":
@@ -392,9 +437,10 @@ def documentos():
                     _sesion_activa=st.session_state.session,
                     paises=pais_elegido_tuple,
                     header_image_left=top_left_img,
-                    footer_image=bottom_right)
+                    footer_image=bottom_right,
+                    liberar_sesion=liberar_session)
                 # Botones de descarga
-                desc.botones_descarga_word_xlsx('PAISES', st.session_state.session, pais_elegido)
+                desc.botones_descarga_word_xlsx('PAISES', pais_elegido)
                     
     # Colombia 
     if eleccion_usuario =="**Colombia:** Explore un informe organizado de Colombia.":
@@ -407,9 +453,10 @@ def documentos():
                 agrupacion='COLOMBIA',
                 _sesion_activa=st.session_state.session,
                 header_image_left=top_left_img,
-                footer_image=bottom_right)
+                footer_image=bottom_right,
+                liberar_sesion=liberar_session)
             # Botones de descarga
-            desc.botones_descarga_word_xlsx('COLOMBIA', st.session_state.session, 'Colombia')
+            desc.botones_descarga_word_xlsx('COLOMBIA', 'Colombia')
 
     # Departamento
     if eleccion_usuario == "**Departamento:** Explore un informe organizado por departamento.":
@@ -438,9 +485,10 @@ def documentos():
                 _sesion_activa=st.session_state.session,
                 departamentos=departamento_elegido_tuple,
                 header_image_left=top_left_img,
-                footer_image=bottom_right)
+                footer_image=bottom_right,
+                liberar_sesion=liberar_session)
             # Botones de descarga
-            desc.botones_descarga_word_xlsx('DEPARTAMENTOS', st.session_state.session, departamento_elegido)
+            desc.botones_descarga_word_xlsx('DEPARTAMENTOS', departamento_elegido)
 
     # Footer
     st.image(image=footer_img, caption=None, use_column_width="always")
@@ -512,4 +560,8 @@ def page_fuentes():
 # Mostrar contenido de todas las páginas
 ########################################
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        # Devolver la sesión al pool al terminar la ejecución (también si se interrumpe por un rerun)
+        liberar_session()
\ No newline at end of file
@@ -0,0 +1,91 @@
+# Librerias
+from dataclasses import dataclass, field
+import pandas as pd
+import cache_datos as cache
+import consultas
+
+#######################################################
+# SNAPSHOT DE PARÁMETROS (PARAMETROS.PARAMETROS)
+#######################################################
+
+# Parámetros usados por los documentos Word y orden de prioridad de los ejes en que se buscan
+PARAMETROS_DOCUMENTO = [
+    'Fecha de actualización', 'Año cerrado (T)', 'Año corrido texto (T)', 'Texto corrido',
+    'Corte de información exportaciones', 'Corte de información inversión', 'Corte de información turismo'
+]
+EJES_DOCUMENTO = ['Transversal', 'Exportaciones', 'Inversión']
+
+
+@dataclass(frozen=True)
+class ParametrosSnapshot:
+    """
+    Copia en memoria de la tabla PARAMETROS.PARAMETROS para una publicación de datos.
+
+    Atributos:
+    - version (str): Publicación de datos ('Fecha de actualización') a la que corresponde el snapshot.
+    - valores (dict): Diccionario {(EJE, PARAMETRO): VALOR}.
+    """
+    version: str
+    valores: dict = field(default_factory=dict)
+
+    def valor(self, eje: str, parametro: str, default=None):
+        """
+        Retorna el valor de un parámetro para un eje o `default` si no existe.
+        """
+        return self.valores.get((eje, parametro), default)
+
+    def documento(self) -> dict:
+        """
+        Retorna los parámetros que usan los documentos Word como diccionario {PARAMETRO: VALOR}.
+        Si un parámetro existe en varios ejes se toma el primero según EJES_DOCUMENTO.
+        """
+        parametros_dict = {}
+        for parametro in PARAMETROS_DOCUMENTO:
+            for eje in EJES_DOCUMENTO:
+                if (eje, parametro) in self.valores:
+                    parametros_dict[parametro] = self.valores[(eje, parametro)]
+                    break
+        return parametros_dict
+
+
+def cargar_parametros(session, version):
+    """
+    Descarga la tabla de parámetros completa en una sola consulta y construye el snapshot.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+    - version (str): Publicación de datos vigente.
+
+    Retorna:
+    - ParametrosSnapshot con todos los parámetros.
+    """
+    query = """
+    SELECT A.EJE, A.PARAMETRO, MAX(A.VALOR) AS VALOR
+    FROM DOCUMENTOS_COLOMBIA.PARAMETROS.PARAMETROS AS A
+    WHERE A.VALOR IS NOT NULL
+    GROUP BY A.EJE, A.PARAMETRO;
+    """
+    data = pd.DataFrame(consultas.ejecutar(session, query, plantilla='parametros'))
+
+    valores = {}
+    if not data.empty:
+        valores = {(eje, parametro): valor for eje, parametro, valor in zip(data['EJE'], data['PARAMETRO'], data['VALOR'])}
+    return ParametrosSnapshot(version=version, valores=valores)
+
+
+# Cache del snapshot compartido por todas las sesiones del proceso
+cache_parametros = cache.CacheVersionada('parametros')
+
+def obtener_parametros(session):
+    """
+    Retorna el snapshot de parámetros de la publicación de datos vigente; solo se consulta Snowflake
+    cuando cambia la 'Fecha de actualización'.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+
+    Retorna:
+    - ParametrosSnapshot compartido (solo lectura).
+    """
+    version = cache.obtener_version_datos(session)
+    return cache_parametros.obtener('PARAMETROS', version, lambda: cargar_parametros(session, version))
@@ -0,0 +1,177 @@
+# Librerias
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import selectores
+import sesiones as ses
+import cache_datos as cache
+import artefactos as art
+import descarga as desc
+import vuelo_unico as vu
+
+###################################################################
+# PRE-RENDERIZADO DE TODOS LOS DOCUMENTOS DESPUÉS DE CADA CARGUE
+###################################################################
+
+# Uso (desde la carpeta App, después de terminar los notebooks de Cargue):
+#   python prerender.py --procesos 4
+# Los documentos quedan en el cache de artefactos (artefactos.py) de la publicación de datos vigente y la
+# aplicación los sirve directamente sin generarlos.
+
+# Imágenes de encabezado y pie de página de los documentos (las mismas que usa main.py)
+HEADER_IMAGE_LEFT = 'Insumos/doc_top_left.png'
+FOOTER_IMAGE = 'Insumos/doc_bottom_right.png'
+# Número de procesos por defecto
+PRERENDER_PROCESOS = 4
+
+# Argumento de construir_documentos que recibe la unidad en cada agrupación
+ARGUMENTO_UNIDAD = {
+    'CONTINENTES': 'continentes',
+    'PAISES': 'paises',
+    'HUBS': 'hubs',
+    'TLCS': 'tlcs',
+    'DEPARTAMENTOS': 'departamentos',
+    'COLOMBIA': None
+}
+
+# Sesión de Snowflake de cada proceso del pool
+_sesion_proceso = None
+
+
+def listar_unidades(session, agrupaciones=None):
+    """
+    Recorre los selectores de la aplicación y retorna todas las unidades que un usuario puede elegir.
+
+    Parámetros:
+    - session: Sesión activa de Snowflake.
+    - agrupaciones (list, opcional): Agrupaciones a incluir. Por defecto todas.
+
+    Retorna:
+    - list: Lista de tuplas (agrupación, unidad).
+    """
+    agrupaciones = agrupaciones or list(ARGUMENTO_UNIDAD)
+    unidades = []
+    if 'CONTINENTES' in agrupaciones:
+        unidades += [('CONTINENTES', unidad) for unidad in selectores.selector_continentes(session)]
+    if 'HUBS' in agrupaciones:
+        unidades += [('HUBS', unidad) for unidad in selectores.selector_hubs(session)]
+    if 'TLCS' in agrupaciones:
+        unidades += [('TLCS', unidad) for unidad in selectores.selector_tlcs(session)]
+    if 'PAISES' in agrupaciones:
+        # Los países se eligen dentro de un continente; un país aparece una sola vez aunque esté en varios
+        paises = []
+        for continente in selectores.selector_continentes_paises(session):
+            paises += selectores.selector_paises(session, continente)
+        unidades += [('PAISES', unidad) for unidad in dict.fromkeys(paises)]
+    if 'COLOMBIA' in agrupaciones:
+        unidades += [('COLOMBIA', 'Colombia')]
+    if 'DEPARTAMENTOS' in agrupaciones:
+        unidades += [('DEPARTAMENTOS', unidad) for unidad in selectores.selector_departamento(session)]
+    return unidades
+
+
+def _iniciar_proceso(secrets_path):
+    """
+    Inicializador de cada proceso del pool: abre una sesión de Snowflake propia.
+    """
+    global _sesion_proceso
+    _sesion_proceso = ses.crear_sesion(secrets_path=secrets_path)
+
+
+def renderizar_unidad(agrupacion, unidad, version, forzar=False):
+    """
+    Genera los documentos Word y Excel de una unidad y los guarda en el cache de artefactos.
+    Se ejecuta dentro de un proceso del pool con la sesión creada por _iniciar_proceso.
+
+    Parámetros:
+    - agrupacion (str): Agrupación del informe.
+    - unidad (str): Unidad seleccionada.
+    - version (str): Publicación de datos para la que se generan los documentos.
+    - forzar (bool): Si es True se regenera aunque otro proceso ya haya guardado los documentos.
+
+    Retorna:
+    - tuple: (agrupación, unidad, segundos, mensaje de error o None).
+    """
+    inicio = time.perf_counter()
+
+    def generar():
+        # El pre-renderizado ya reparte las unidades entre procesos: Word y Excel se generan en este mismo proceso
+        argumentos = {}
+        if ARGUMENTO_UNIDAD[agrupacion]:
+            argumentos[ARGUMENTO_UNIDAD[agrupacion]] = [unidad]
+        docx_bytes, xlsx_bytes = desc.construir_documentos(agrupacion, _sesion_proceso, umbral=[10000],
+                                                           header_image_left=HEADER_IMAGE_LEFT, footer_image=FOOTER_IMAGE,
+                                                           en_paralelo=False, **argumentos)
+        file_name_suffix = 'Colombia' if agrupacion == 'COLOMBIA' else f"{agrupacion} - {unidad}"
+        art.cache_artefactos.guardar(agrupacion, unidad, version, docx_bytes, xlsx_bytes,
+                                     f"Tres Ejes {file_name_suffix}.docx", f"Tres Ejes {file_name_suffix}.xlsx")
+
+    try:
+        # Si la aplicación está generando la misma unidad, se espera su resultado en lugar de repetirlo
+        vu.vuelo_documentos.ejecutar((agrupacion, unidad, version), generar,
+                                     hecho=None if forzar else lambda: art.cache_artefactos.contiene(agrupacion, unidad, version))
+        return agrupacion, unidad, time.perf_counter() - inicio, None
+    except Exception as e:
+        return agrupacion, unidad, time.perf_counter() - inicio, str(e)
+
+
+def prerenderizar(agrupaciones=None, procesos=PRERENDER_PROCESOS, forzar=False, secrets_path=ses.SECRETS_PATH):
+    """
+    Genera en un pool de procesos los documentos de todas las unidades de los selectores para la publicación
+    de datos vigente y los guarda en el cache de artefactos.
+
+    Parámetros:
+    - agrupaciones (list, opcional): Agrupaciones a generar. Por defecto todas.
+    - procesos (int): Número de procesos del pool.
+    - forzar (bool): Si es True se regeneran también los documentos que ya existen para la versión vigente.
+    - secrets_path (str): Ruta al archivo secrets.toml.
+
+    Retorna:
+    - dict: Resumen con el número de documentos generados, omitidos y con error.
+    """
+    session = ses.crear_sesion(secrets_path=secrets_path)
+    try:
+        cache.invalidar_version_datos()
+        version = cache.obtener_version_datos(session)
+        unidades = listar_unidades(session, agrupaciones)
+    finally:
+        session.close()
+
+    pendientes = [(agrupacion, unidad) for agrupacion, unidad in unidades
+                  if forzar or not art.cache_artefactos.contiene(agrupacion, unidad, version)]
+    print(f"Pre-renderizado versión {version}: {len(pendientes)} de {len(unidades)} documentos por generar con {procesos} procesos")
+
+    inicio = time.perf_counter()
+    errores = []
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso, initargs=(secrets_path,)) as executor:
+        futuros = [executor.submit(renderizar_unidad, agrupacion, unidad, version, forzar) for agrupacion, unidad in pendientes]
+        for numero, futuro in enumerate(as_completed(futuros), start=1):
+            agrupacion, unidad, segundos, error = futuro.result()
+            if error:
+                errores.append((agrupacion, unidad, error))
+                print(f"[{numero}/{len(pendientes)}] {agrupacion} - {unidad}: error ({error})")
+            else:
+                print(f"[{numero}/{len(pendientes)}] {agrupacion} - {unidad}: {segundos:.1f} s")
+
+    print(f"Pre-renderizado terminado en {time.perf_counter() - inicio:.1f} s con {len(errores)} errores")
+    return {
+        'version': version,
+        'generados': len(pendientes) - len(errores),
+        'omitidos': len(unidades) - len(pendientes),
+        'errores': errores
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-renderiza los documentos Tres Ejes de todas las unidades.')
+    parser.add_argument('--procesos', type=int, default=PRERENDER_PROCESOS, help='Número de procesos del pool.')
+    parser.add_argument('--agrupaciones', nargs='*', choices=list(ARGUMENTO_UNIDAD), help='Agrupaciones a generar (por defecto todas).')
+    parser.add_argument('--forzar', action='store_true', help='Regenerar los documentos que ya existen para la versión vigente.')
+    parser.add_argument('--secrets', default=ses.SECRETS_PATH, help='Ruta al archivo secrets.toml con [connections.snowflake].')
+    args = parser.parse_args()
+
+    # Las rutas de las imágenes son relativas a la carpeta App; la de secrets se resuelve antes de cambiar de carpeta
+    secrets_path = os.path.abspath(args.secrets) if args.secrets != ses.SECRETS_PATH else ses.SECRETS_PATH
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    prerenderizar(args.agrupaciones, args.procesos, args.forzar, secrets_path)
@@ -0,0 +1,259 @@
+# Librerias
+import threading
+import time
+from collections import deque
+import toml
+from snowflake.snowpark import Session
+
+##############################################
+# POOL DE SESIONES DE SNOWFLAKE (POR PROCESO)
+##############################################
+
+# Número máximo de sesiones abiertas por proceso
+POOL_MAX_SESIONES = 4
+# Sesiones que se mantienen abiertas aunque no haya usuarios
+POOL_MIN_SESIONES = 1
+# Segundos que un usuario espera por una sesión libre antes de desistir
+POOL_ESPERA_MAX = 30
+# Segundos de inactividad a partir de los cuales una sesión se valida antes de entregarla
+POOL_VALIDAR_DESPUES = 60
+# Segundos entre rondas de keep-alive sobre las sesiones libres
+POOL_KEEPALIVE = 240
+# Segundos de inactividad tras los cuales se cierran las sesiones por encima del mínimo
+POOL_MAX_INACTIVIDAD = 1800
+# Archivo con la configuración de la conexión [connections.snowflake] (el mismo que usa Streamlit)
+SECRETS_PATH = '.streamlit/secrets.toml'
+
+
+def crear_sesion(configuracion=None, secrets_path=SECRETS_PATH):
+    """
+    Crea una sesión de Snowflake con la configuración [connections.snowflake].
+
+    Parámetros:
+    - configuracion (dict, opcional): Configuración de la conexión (en la aplicación, la de st.secrets). Si es None
+      se lee del archivo `secrets_path`.
+    - secrets_path (str): Ruta al archivo secrets.toml.
+
+    Retorna:
+    - Sesión de Snowflake.
+    """
+    if configuracion is None:
+        configuracion = toml.load(secrets_path)['connections']['snowflake']
+    return Session.builder.configs(dict(configuracion)).create()
+
+
+class PoolSesiones:
+    """
+    Pool acotado de sesiones de Snowflake compartido por todos los usuarios del proceso. Las sesiones se
+    autentican una sola vez y se prestan (tomar) y devuelven (devolver) en cada ejecución de la aplicación.
+
+    Parámetros:
+    - crear (callable): Función sin argumentos que crea una sesión nueva o retorna None si falla.
+    - max_sesiones (int): Número máximo de sesiones abiertas.
+    - min_sesiones (int): Número de sesiones que se mantienen abiertas en reposo.
+    - validar_despues (int): Segundos de inactividad a partir de los cuales se valida la sesión al tomarla.
+    - keepalive (int): Segundos entre rondas de keep-alive. 0 o None desactiva el hilo de keep-alive.
+    - max_inactividad (int): Segundos de inactividad tras los cuales se cierran las sesiones sobrantes.
+    """
+
+    def __init__(self, crear, max_sesiones=POOL_MAX_SESIONES, min_sesiones=POOL_MIN_SESIONES,
+                 validar_despues=POOL_VALIDAR_DESPUES, keepalive=POOL_KEEPALIVE, max_inactividad=POOL_MAX_INACTIVIDAD):
+        self.crear = crear
+        self.max_sesiones = max_sesiones
+        self.min_sesiones = min(min_sesiones, max_sesiones)
+        self.validar_despues = validar_despues
+        self.max_inactividad = max_inactividad
+        self._condicion = threading.Condition()
+        # Sesiones libres como (sesión, momento de la última devolución)
+        self._libres = deque()
+        self._total = 0
+        self._cerrado = False
+        self.prestamos = 0
+        self.creadas = 0
+        self.descartadas = 0
+        self.esperas_agotadas = 0
+
+        if keepalive:
+            hilo = threading.Thread(target=self._keepalive, args=(keepalive,), name='pool_sesiones_keepalive', daemon=True)
+            hilo.start()
+
+    @staticmethod
+    def sesion_valida(sesion):
+        """
+        Verifica que la sesión siga autenticada ejecutando una consulta trivial.
+        """
+        try:
+            sesion.sql('SELECT 1').collect()
+            return True
+        except Exception as e:
+            print(f"Sesión de Snowflake descartada por el pool: {e}")
+            return False
+
+    @staticmethod
+    def _cerrar_sesion(sesion):
+        try:
+            sesion.close()
+        except Exception:
+            pass
+
+    def _nueva_sesion(self):
+        # Se llama con un cupo ya reservado en self._total; si falla se libera el cupo
+        sesion = None
+        try:
+            sesion = self.crear()
+        except Exception as e:
+            print(f"Error creando sesión de Snowflake para el pool: {e}")
+        with self._condicion:
+            if sesion is None:
+                self._total -= 1
+                self._condicion.notify()
+            else:
+                self.creadas += 1
+        return sesion
+
+    def calentar(self):
+        """
+        Abre las sesiones mínimas del pool para que el primer usuario no espere la autenticación.
+        """
+        while True:
+            with self._condicion:
+                if self._cerrado or self._total >= self.min_sesiones:
+                    return
+                self._total += 1
+            sesion = self._nueva_sesion()
+            if sesion is None:
+                return
+            self.devolver(sesion)
+
+    def tomar(self, espera_max=POOL_ESPERA_MAX):
+        """
+        Presta una sesión del pool. Reutiliza una sesión libre (validándola si lleva tiempo inactiva), abre una
+        nueva si no se ha alcanzado el máximo o espera a que otro usuario devuelva la suya.
+
+        Parámetros:
+        - espera_max (float): Segundos máximos de espera por una sesión libre.
+
+        Retorna:
+        - Sesión de Snowflake o None si no fue posible obtenerla.
+        """
+        limite = time.monotonic() + espera_max
+        while True:
+            with self._condicion:
+                while not self._libres and self._total >= self.max_sesiones:
+                    restante = limite - time.monotonic()
+                    if self._cerrado or restante <= 0:
+                        self.esperas_agotadas += 1
+                        print("No hay sesiones de Snowflake disponibles en el pool.")
+                        return None
+                    self._condicion.wait(restante)
+                if self._libres:
+                    sesion, ultimo_uso = self._libres.pop()
+                else:
+                    sesion, ultimo_uso = None, None
+                    self._total += 1
+
+            if sesion is None:
+                sesion = self._nueva_sesion()
+                if sesion is None:
+                    return None
+            elif (time.monotonic() - ultimo_uso) > self.validar_despues and not self.sesion_valida(sesion):
+                self.descartar(sesion)
+                continue
+
+            with self._condicion:
+                self.prestamos += 1
+            return sesion
+
+    def devolver(self, sesion):
+        """
+        Devuelve al pool una sesión prestada.
+        """
+        if sesion is None:
+            return
+        with self._condicion:
+            if self._cerrado:
+                self._total -= 1
+                cerrar = True
+            else:
+                self._libres.append((sesion, time.monotonic()))
+                self._condicion.notify()
+                cerrar = False
+        if cerrar:
+            self._cerrar_sesion(sesion)
+
+    def descartar(self, sesion):
+        """
+        Cierra una sesión prestada que no se debe reutilizar (p. ej. tras un error de autenticación) y libera su cupo.
+        """
+        self._cerrar_sesion(sesion)
+        with self._condicion:
+            self._total -= 1
+            self.descartadas += 1
+            self._condicion.notify()
+
+    def _keepalive(self, intervalo):
+        """
+        Hilo de fondo: mantiene vivas las sesiones libres, descarta las inválidas y cierra las que sobran
+        por inactividad conservando el mínimo del pool.
+        """
+        while True:
+            time.sleep(intervalo)
+            with self._condicion:
+                if self._cerrado:
+                    return
+                revisar = list(self._libres)
+                self._libres.clear()
+                abiertas = self._total
+
+            ahora = time.monotonic()
+            conservar = []
+            # Se revisan primero las sesiones más antiguas, que son las candidatas a cerrarse.
+            # El ping de keep-alive no cuenta como uso: se conserva el momento de la última devolución.
+            for sesion, ultimo_uso in revisar:
+                if abiertas > self.min_sesiones and (ahora - ultimo_uso) > self.max_inactividad:
+                    self.descartar(sesion)
+                    abiertas -= 1
+                elif self.sesion_valida(sesion):
+                    conservar.append((sesion, ultimo_uso))
+                else:
+                    self.descartar(sesion)
+                    abiertas -= 1
+
+            with self._condicion:
+                cerrado = self._cerrado
+                if not cerrado:
+                    self._libres.extendleft(reversed(conservar))
+                    self._condicion.notify_all()
+            if cerrado:
+                for sesion, _ in conservar:
+                    self.descartar(sesion)
+                return
+            self.calentar()
+
+    def cerrar(self):
+        """
+        Cierra todas las sesiones libres y marca el pool como cerrado; las prestadas se cierran al devolverse.
+        """
+        with self._condicion:
+            self._cerrado = True
+            libres = list(self._libres)
+            self._libres.clear()
+            self._total -= len(libres)
+            self._condicion.notify_all()
+        for sesion, _ in libres:
+            self._cerrar_sesion(sesion)
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con el estado y los contadores del pool.
+        """
+        with self._condicion:
+            return {
+                'abiertas': self._total,
+                'libres': len(self._libres),
+                'en_uso': self._total - len(self._libres),
+                'prestamos': self.prestamos,
+                'creadas': self.creadas,
+                'descartadas': self.descartadas,
+                'esperas_agotadas': self.esperas_agotadas,
+            }
@@ -0,0 +1,427 @@
+# Librerias
+import json
+import multiprocessing
+import multiprocessing.util
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from filelock import FileLock, Timeout
+import sesiones as ses
+
+###############################################################
+# COLA DE TRABAJOS DE GENERACIÓN DE DOCUMENTOS (SQLITE + PROCESOS)
+###############################################################
+
+# Los informes se generan en procesos de trabajo fuera del hilo del script de Streamlit. La aplicación encola
+# la solicitud, consulta el progreso y sirve el resultado desde el cache de artefactos (artefactos.py).
+# La cola es una base SQLite local compartida por todos los procesos de Streamlit del servidor, y el número de
+# procesos de trabajo está acotado por servidor mediante ranuras con bloqueo de archivo.
+
+# Base de datos de la cola
+TRABAJOS_DB = os.environ.get('TRES_EJES_TRABAJOS_DB', os.path.join(tempfile.gettempdir(), 'tres_ejes_trabajos.sqlite3'))
+# Número máximo de procesos de trabajo en el servidor (limita la carga sobre Snowflake y sobre el equipo)
+TRABAJOS_PROCESOS = 2
+# Segundos entre revisiones de la cola cuando no hay trabajos pendientes
+TRABAJOS_INTERVALO = 0.5
+# Segundos entre revisiones del supervisor para relanzar procesos de trabajo caídos
+TRABAJOS_SUPERVISION = 30
+# Segundos que la aplicación espera un trabajo antes de pedir al usuario que vuelva a intentarlo
+TRABAJOS_ESPERA_MAX = 600
+# Segundos que se conservan en la cola los trabajos terminados o con error
+TRABAJOS_RETENCION = 24 * 60 * 60
+
+# Estados de un trabajo
+PENDIENTE = 'pendiente'
+EN_PROCESO = 'en_proceso'
+TERMINADO = 'terminado'
+ERROR = 'error'
+
+
+class ColaTrabajos:
+    """
+    Cola persistente de solicitudes de informes en SQLite. Cada trabajo corresponde a una unidad de una
+    agrupación para una versión de datos; mientras un trabajo está activo, las solicitudes iguales reciben
+    el mismo identificador en lugar de encolar uno nuevo.
+
+    Parámetros:
+    - ruta (str): Archivo de la base de datos SQLite.
+    """
+
+    def __init__(self, ruta=TRABAJOS_DB):
+        self.ruta = ruta
+        with self._conexion() as conexion:
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute("""
+            CREATE TABLE IF NOT EXISTS TRABAJOS (
+                ID TEXT PRIMARY KEY,
+                AGRUPACION TEXT NOT NULL,
+                UNIDAD TEXT NOT NULL,
+                VERSION TEXT NOT NULL,
+                ARGUMENTOS TEXT NOT NULL,
+                ESTADO TEXT NOT NULL,
+                PROGRESO INTEGER NOT NULL DEFAULT 0,
+                MENSAJE TEXT,
+                RANURA INTEGER,
+                SOLICITUDES INTEGER NOT NULL DEFAULT 1,
+                CREADO REAL NOT NULL,
+                ACTUALIZADO REAL NOT NULL
+            )""")
+            # Bases creadas antes del conteo de solicitudes coalescidas
+            columnas = [fila['name'] for fila in conexion.execute('PRAGMA table_info(TRABAJOS)')]
+            if 'SOLICITUDES' not in columnas:
+                conexion.execute('ALTER TABLE TRABAJOS ADD COLUMN SOLICITUDES INTEGER NOT NULL DEFAULT 1')
+            conexion.execute('CREATE INDEX IF NOT EXISTS TRABAJOS_ESTADO ON TRABAJOS (ESTADO, CREADO)')
+            conexion.execute('CREATE INDEX IF NOT EXISTS TRABAJOS_CLAVE ON TRABAJOS (AGRUPACION, UNIDAD, VERSION, ESTADO)')
+            # Contadores acumulados de todos los procesos del servidor (p. ej. los de vuelo_unico.py)
+            conexion.execute("""
+            CREATE TABLE IF NOT EXISTS CONTADORES (
+                NOMBRE TEXT PRIMARY KEY,
+                VALOR INTEGER NOT NULL DEFAULT 0
+            )""")
+
+    def _conexion(self):
+        # Una conexión por operación: SQLite serializa las escrituras entre hilos y procesos
+        conexion = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+        conexion.row_factory = sqlite3.Row
+        return _ConexionCerrable(conexion)
+
+    def encolar(self, agrupacion, unidad, version, argumentos):
+        """
+        Encola la generación de los documentos de (agrupacion, unidad, version) o retorna el trabajo activo
+        que ya existe para esa clave (la solicitud se cuenta como coalescida en SOLICITUDES).
+
+        Parámetros:
+        - agrupacion (str): Agrupación del informe.
+        - unidad (str): Unidad seleccionada.
+        - version (str): Publicación de datos vigente.
+        - argumentos (dict): Argumentos de construir_documentos y nombres de los archivos (serializables en JSON).
+
+        Retorna:
+        - str: Identificador del trabajo.
+        """
+        with self._conexion() as conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            fila = conexion.execute(
+                'SELECT ID FROM TRABAJOS WHERE AGRUPACION = ? AND UNIDAD = ? AND VERSION = ? AND ESTADO IN (?, ?)',
+                (agrupacion, unidad, version, PENDIENTE, EN_PROCESO)
+            ).fetchone()
+            if fila is not None:
+                conexion.execute('UPDATE TRABAJOS SET SOLICITUDES = SOLICITUDES + 1 WHERE ID = ?', (fila['ID'],))
+                conexion.execute('COMMIT')
+                return fila['ID']
+            id_trabajo = uuid.uuid4().hex
+            ahora = time.time()
+            conexion.execute(
+                'INSERT INTO TRABAJOS (ID, AGRUPACION, UNIDAD, VERSION, ARGUMENTOS, ESTADO, CREADO, ACTUALIZADO) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (id_trabajo, agrupacion, unidad, version, json.dumps(argumentos, ensure_ascii=False), PENDIENTE, ahora, ahora)
+            )
+            conexion.execute('COMMIT')
+            return id_trabajo
+
+    def consultar(self, id_trabajo):
+        """
+        Retorna el estado de un trabajo como diccionario ('estado', 'progreso', 'mensaje', 'posicion') o None si no existe.
+        La posición es el número de trabajos pendientes creados antes (0 si el trabajo ya se está procesando).
+        """
+        with self._conexion() as conexion:
+            fila = conexion.execute('SELECT * FROM TRABAJOS WHERE ID = ?', (id_trabajo,)).fetchone()
+            if fila is None:
+                return None
+            posicion = 0
+            if fila['ESTADO'] == PENDIENTE:
+                posicion = conexion.execute(
+                    'SELECT COUNT(*) FROM TRABAJOS WHERE ESTADO = ? AND CREADO < ?', (PENDIENTE, fila['CREADO'])
+                ).fetchone()[0]
+            return {
+                'agrupacion': fila['AGRUPACION'],
+                'unidad': fila['UNIDAD'],
+                'version': fila['VERSION'],
+                'estado': fila['ESTADO'],
+                'progreso': fila['PROGRESO'],
+                'mensaje': fila['MENSAJE'],
+                'posicion': posicion
+            }
+
+    def tomar(self, ranura):
+        """
+        Asigna a la ranura de trabajo indicada el trabajo pendiente más antiguo.
+
+        Retorna:
+        - dict con 'id', 'agrupacion', 'unidad', 'version' y 'argumentos', o None si no hay trabajos pendientes.
+        """
+        with self._conexion() as conexion:
+            conexion.execute('BEGIN IMMEDIATE')
+            fila = conexion.execute(
+                'SELECT * FROM TRABAJOS WHERE ESTADO = ? ORDER BY CREADO LIMIT 1', (PENDIENTE,)
+            ).fetchone()
+            if fila is None:
+                conexion.execute('COMMIT')
+                return None
+            conexion.execute(
+                'UPDATE TRABAJOS SET ESTADO = ?, RANURA = ?, ACTUALIZADO = ? WHERE ID = ?',
+                (EN_PROCESO, ranura, time.time(), fila['ID'])
+            )
+            conexion.execute('COMMIT')
+            return {
+                'id': fila['ID'],
+                'agrupacion': fila['AGRUPACION'],
+                'unidad': fila['UNIDAD'],
+                'version': fila['VERSION'],
+                'argumentos': json.loads(fila['ARGUMENTOS'])
+            }
+
+    def actualizar_progreso(self, id_trabajo, progreso):
+        with self._conexion() as conexion:
+            conexion.execute('UPDATE TRABAJOS SET PROGRESO = ?, ACTUALIZADO = ? WHERE ID = ?', (int(progreso), time.time(), id_trabajo))
+
+    def terminar(self, id_trabajo):
+        with self._conexion() as conexion:
+            conexion.execute('UPDATE TRABAJOS SET ESTADO = ?, PROGRESO = 100, ACTUALIZADO = ? WHERE ID = ?', (TERMINADO, time.time(), id_trabajo))
+
+    def fallar(self, id_trabajo, mensaje):
+        with self._conexion() as conexion:
+            conexion.execute('UPDATE TRABAJOS SET ESTADO = ?, MENSAJE = ?, ACTUALIZADO = ? WHERE ID = ?', (ERROR, mensaje, time.time(), id_trabajo))
+
+    def reencolar_ranura(self, ranura):
+        """
+        Devuelve a la cola los trabajos que quedaron en proceso en una ranura cuyo proceso de trabajo terminó
+        (se llama cuando un proceso nuevo toma la ranura).
+
+        Retorna:
+        - int: Número de trabajos reencolados.
+        """
+        with self._conexion() as conexion:
+            cursor = conexion.execute(
+                'UPDATE TRABAJOS SET ESTADO = ?, PROGRESO = 0, RANURA = NULL, ACTUALIZADO = ? WHERE ESTADO = ? AND RANURA = ?',
+                (PENDIENTE, time.time(), EN_PROCESO, ranura)
+            )
+            return cursor.rowcount
+
+    def purgar(self, retencion=TRABAJOS_RETENCION):
+        """
+        Elimina los trabajos terminados o con error de hace más de `retencion` segundos.
+        """
+        with self._conexion() as conexion:
+            conexion.execute('DELETE FROM TRABAJOS WHERE ESTADO IN (?, ?) AND ACTUALIZADO < ?', (TERMINADO, ERROR, time.time() - retencion))
+
+    def incrementar(self, nombre, cantidad=1):
+        """
+        Suma `cantidad` al contador `nombre`, compartido por todos los procesos del servidor.
+        """
+        with self._conexion() as conexion:
+            conexion.execute(
+                'INSERT INTO CONTADORES (NOMBRE, VALOR) VALUES (?, ?) ON CONFLICT(NOMBRE) DO UPDATE SET VALOR = VALOR + excluded.VALOR',
+                (nombre, int(cantidad))
+            )
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con el número de trabajos por estado, el número de solicitudes que se unieron
+        a un trabajo ya activo en lugar de generar de nuevo ('coalescidas') y los contadores acumulados
+        ('contadores', p. ej. 'documentos.generaciones' de vuelo_unico.py).
+        """
+        with self._conexion() as conexion:
+            filas = conexion.execute('SELECT ESTADO, COUNT(*) AS N, SUM(SOLICITUDES - 1) AS COALESCIDAS FROM TRABAJOS GROUP BY ESTADO').fetchall()
+            contadores = conexion.execute('SELECT NOMBRE, VALOR FROM CONTADORES ORDER BY NOMBRE').fetchall()
+        estadisticas = {fila['ESTADO']: fila['N'] for fila in filas}
+        estadisticas['coalescidas'] = sum(fila['COALESCIDAS'] or 0 for fila in filas)
+        estadisticas['contadores'] = {fila['NOMBRE']: fila['VALOR'] for fila in contadores}
+        return estadisticas
+
+
+class _ConexionCerrable:
+    """
+    Envoltorio de una conexión SQLite que se cierra al salir del bloque `with` (sqlite3 solo confirma la transacción).
+    """
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    def __enter__(self):
+        return self.conexion
+
+    def __exit__(self, tipo, valor, traza):
+        if tipo is not None and self.conexion.in_transaction:
+            self.conexion.execute('ROLLBACK')
+        self.conexion.close()
+        return False
+
+
+class ProgresoTrabajo:
+    """
+    Sustituto de la barra de progreso de Streamlit dentro de un proceso de trabajo: cada avance se guarda en la cola
+    para que la aplicación lo muestre.
+    """
+
+    def __init__(self, cola, id_trabajo):
+        self.cola = cola
+        self.id_trabajo = id_trabajo
+
+    def progress(self, valor):
+        self.cola.actualizar_progreso(self.id_trabajo, valor)
+
+
+def _ruta_bloqueo(ruta, ranura):
+    return f"{ruta}.ranura_{ranura}.lock"
+
+
+def ciclo_trabajador(ranura, pid_padre, configuracion, ruta=TRABAJOS_DB, intervalo=TRABAJOS_INTERVALO):
+    """
+    Ciclo de un proceso de trabajo: toma la ranura (si otro proceso ya la tiene, termina), reencola los trabajos
+    que quedaron a medias en ella y procesa la cola hasta que el proceso padre termine.
+
+    Parámetros:
+    - ranura (int): Número de ranura de trabajo (0 a TRABAJOS_PROCESOS - 1).
+    - pid_padre (int): Proceso de Streamlit que lanzó el trabajador; si deja de existir el trabajador termina.
+    - configuracion (dict): Configuración de la conexión [connections.snowflake] recibida de la aplicación.
+    - ruta (str): Archivo de la base de datos de la cola.
+    - intervalo (float): Segundos entre revisiones de la cola cuando está vacía.
+    """
+    # Importaciones diferidas: descarga importa este módulo
+    import artefactos as art
+    import descarga as desc
+    import vuelo_unico as vu
+
+    bloqueo = FileLock(_ruta_bloqueo(ruta, ranura))
+    try:
+        bloqueo.acquire(timeout=0)
+    except Timeout:
+        return
+
+    cola = ColaTrabajos(ruta)
+    reencolados = cola.reencolar_ranura(ranura)
+    if reencolados:
+        print(f"Trabajador {ranura}: {reencolados} trabajos reencolados")
+    cola.purgar()
+
+    sesion = None
+    while os.getppid() == pid_padre:
+        trabajo = cola.tomar(ranura)
+        if trabajo is None:
+            time.sleep(intervalo)
+            continue
+
+        inicio = time.perf_counter()
+        argumentos = dict(trabajo['argumentos'])
+        file_name_docx = argumentos.pop('file_name_docx')
+        file_name_xlsx = argumentos.pop('file_name_xlsx')
+        clave = (trabajo['agrupacion'], trabajo['unidad'], trabajo['version'])
+
+        def generar():
+            nonlocal sesion
+            if sesion is None:
+                sesion = ses.crear_sesion(configuracion)
+            # Word y Excel se construyen en paralelo en el pool de generacion.py de este proceso
+            docx_bytes, xlsx_bytes = desc.construir_documentos(trabajo['agrupacion'], sesion, progress_bar=ProgresoTrabajo(cola, trabajo['id']),
+                                                               **argumentos)
+            art.cache_artefactos.guardar(*clave, docx_bytes, xlsx_bytes, file_name_docx, file_name_xlsx)
+            return True
+
+        try:
+            # Si otro proceso (otro trabajador o el pre-renderizador) genera la misma unidad, se espera su resultado
+            generado = vu.vuelo_documentos.ejecutar(clave, generar, hecho=lambda: art.cache_artefactos.contiene(*clave))
+            cola.terminar(trabajo['id'])
+            if generado:
+                print(f"Trabajador {ranura}: {trabajo['agrupacion']} - {trabajo['unidad']} en {time.perf_counter() - inicio:.1f} s")
+            else:
+                print(f"Trabajador {ranura}: {trabajo['agrupacion']} - {trabajo['unidad']} ya generado por otro proceso")
+        except Exception as e:
+            cola.fallar(trabajo['id'], str(e))
+            print(f"Trabajador {ranura}: error en {trabajo['agrupacion']} - {trabajo['unidad']}: {e}")
+            # La sesión pudo quedar inválida: se crea una nueva para el siguiente trabajo
+            if sesion is not None:
+                try:
+                    sesion.close()
+                except Exception:
+                    pass
+                sesion = None
+
+    if sesion is not None:
+        sesion.close()
+
+
+class SupervisorTrabajadores:
+    """
+    Lanza desde un proceso de Streamlit los procesos de trabajo de las ranuras libres del servidor y los relanza
+    si terminan. Cada ranura la ocupa un solo proceso en todo el servidor, por lo que varios procesos de
+    Streamlit pueden tener su propio supervisor sin superar TRABAJOS_PROCESOS.
+
+    Parámetros:
+    - configuracion (dict): Configuración de la conexión [connections.snowflake] de la aplicación (st.secrets), que se
+      entrega a los procesos de trabajo para que se conecten igual que la aplicación.
+    - procesos (int): Número de ranuras de trabajo del servidor.
+    - ruta (str): Archivo de la base de datos de la cola.
+    - supervision (int): Segundos entre revisiones de las ranuras.
+    """
+
+    def __init__(self, configuracion, procesos=TRABAJOS_PROCESOS, ruta=TRABAJOS_DB, supervision=TRABAJOS_SUPERVISION):
+        self.configuracion = dict(configuracion)
+        self.procesos = procesos
+        self.ruta = ruta
+        self._contexto = multiprocessing.get_context('spawn')
+        self._trabajadores = {}
+        self._lock = threading.Lock()
+        # Los trabajadores no son procesos daemon (necesitan su propio pool de generación): se terminan al salir,
+        # antes de que multiprocessing espere a los procesos hijos no daemon
+        multiprocessing.util.Finalize(None, self.detener, exitpriority=10)
+        self.revisar()
+        hilo = threading.Thread(target=self._supervisar, args=(supervision,), name='supervisor_trabajos', daemon=True)
+        hilo.start()
+
+    def revisar(self):
+        """
+        Lanza un proceso de trabajo en cada ranura que no esté ocupada por un proceso vivo de este u otro proceso de Streamlit.
+        """
+        with self._lock:
+            for ranura in range(self.procesos):
+                proceso = self._trabajadores.get(ranura)
+                if proceso is not None and proceso.is_alive():
+                    continue
+                # Si la ranura está tomada por otro proceso del servidor no se lanza nada
+                bloqueo = FileLock(_ruta_bloqueo(self.ruta, ranura))
+                try:
+                    bloqueo.acquire(timeout=0)
+                except Timeout:
+                    continue
+                bloqueo.release()
+                proceso = self._contexto.Process(target=ciclo_trabajador, args=(ranura, os.getpid(), self.configuracion, self.ruta),
+                                                 name=f'trabajador_{ranura}')
+                proceso.start()
+                self._trabajadores[ranura] = proceso
+
+    def detener(self):
+        """
+        Termina los procesos de trabajo lanzados por este supervisor; sus trabajos en curso se reencolan
+        cuando otro proceso toma la ranura.
+        """
+        with self._lock:
+            trabajadores = list(self._trabajadores.values())
+            self._trabajadores.clear()
+        for proceso in trabajadores:
+            if proceso.is_alive():
+                proceso.terminate()
+        for proceso in trabajadores:
+            proceso.join(timeout=5)
+
+    def _supervisar(self, intervalo):
+        while True:
+            time.sleep(intervalo)
+            try:
+                self.revisar()
+            except Exception as e:
+                print(f"Error supervisando los procesos de trabajo: {e}")
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con las ranuras propias vivas y los trabajos por estado.
+        """
+        with self._lock:
+            vivos = sum(1 for proceso in self._trabajadores.values() if proceso.is_alive())
+        return {'trabajadores_propios': vivos, 'trabajos': cola_trabajos.estadisticas()}
+
+
+# Cola compartida por todas las sesiones del proceso
+cola_trabajos = ColaTrabajos()
@@ -0,0 +1,204 @@
+# Librerias
+import functools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+###########################################################
+# TRAZAS POR ETAPA DEL PROCESO DE GENERACIÓN DE REPORTES
+###########################################################
+
+# Cada reporte registra tramos jerárquicos (parámetros, verificación, ejes, procesamiento, secciones del Word,
+# libro Excel y consultas) y, al terminar, los exporta en el formato Trace Event JSON, que se abre directamente
+# en chrome://tracing o en https://ui.perfetto.dev. Fuera de un reporte los tramos no registran nada.
+
+# Carpeta donde se exportan las trazas (un archivo .json por reporte)
+TRAZAS_DIR = os.environ.get('TRES_EJES_TRAZAS_DIR', os.path.join(tempfile.gettempdir(), 'tres_ejes_trazas'))
+# Las trazas se desactivan con TRES_EJES_TRAZAS=0
+TRAZAS_ACTIVAS = os.environ.get('TRES_EJES_TRAZAS', '1') != '0'
+# Número máximo de archivos de traza que se conservan; los más antiguos se eliminan
+TRAZAS_MAX_ARCHIVOS = 200
+
+# Traza y tramo en curso en el hilo (o tarea) actual
+_traza = ContextVar('traza', default=None)
+_padre = ContextVar('tramo_padre', default=None)
+
+
+def ahora():
+    """
+    Retorna el instante actual en microsegundos desde la época, comparable entre procesos.
+    """
+    return time.time_ns() // 1000
+
+
+class Traza:
+    """
+    Eventos de una traza en formato Trace Event (fases 'X' para los tramos y 'M' para los nombres de procesos e hilos).
+
+    Parámetros:
+    - nombre (str): Descripción de la traza (p. ej. 'PAISES - Chile').
+    """
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.eventos = []
+        self._lock = threading.Lock()
+        self._hilos = set()
+
+    def agregar(self, nombre, categoria, inicio, fin, args=None):
+        """
+        Agrega un tramo completo del hilo actual.
+        """
+        pid, tid = os.getpid(), threading.get_native_id()
+        evento = {'name': nombre, 'cat': categoria, 'ph': 'X', 'ts': inicio, 'dur': max(fin - inicio, 0), 'pid': pid, 'tid': tid}
+        if args:
+            evento['args'] = args
+        with self._lock:
+            if (pid, tid) not in self._hilos:
+                self._hilos.add((pid, tid))
+                self.eventos.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': threading.current_thread().name}})
+            self.eventos.append(evento)
+
+    def extender(self, eventos):
+        """
+        Agrega eventos registrados en otro proceso (p. ej. en el pool de generacion.py).
+        """
+        with self._lock:
+            self.eventos.extend(eventos)
+
+    def exportar(self, directorio=TRAZAS_DIR):
+        """
+        Escribe la traza en `directorio` y retorna la ruta del archivo.
+        """
+        os.makedirs(directorio, exist_ok=True)
+        nombre_archivo = re.sub(r'[^\w\-]+', '_', self.nombre, flags=re.UNICODE).strip('_')
+        ruta = os.path.join(directorio, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}_{nombre_archivo}.json")
+        with self._lock:
+            eventos = list(self.eventos)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms', 'otherData': {'reporte': self.nombre}}, f, ensure_ascii=False)
+        limpiar_trazas(directorio)
+        return ruta
+
+
+def limpiar_trazas(directorio=TRAZAS_DIR, max_archivos=TRAZAS_MAX_ARCHIVOS):
+    """
+    Elimina los archivos de traza más antiguos cuando hay más de `max_archivos`.
+    """
+    try:
+        archivos = sorted(a for a in os.listdir(directorio) if a.endswith('.json'))
+        for archivo in archivos[:max(len(archivos) - max_archivos, 0)]:
+            os.remove(os.path.join(directorio, archivo))
+    except OSError:
+        pass
+
+
+def actual():
+    """
+    Retorna la traza en curso o None.
+    """
+    return _traza.get()
+
+
+@contextmanager
+def traza(nombre, exportar=True):
+    """
+    Registra los tramos ejecutados dentro del bloque (incluidos los hilos que copian el contexto) y, si `exportar`
+    es True, escribe la traza en TRAZAS_DIR al terminar. Si ya hay una traza en curso, el bloque se suma a ella.
+
+    Retorna:
+    - Traza en curso, o None si las trazas están desactivadas.
+    """
+    existente = _traza.get()
+    if existente is not None or not TRAZAS_ACTIVAS:
+        yield existente
+        return
+    nueva = Traza(nombre)
+    token = _traza.set(nueva)
+    try:
+        yield nueva
+    finally:
+        _traza.reset(token)
+        if exportar:
+            try:
+                print(f"Traza del reporte {nombre}: {nueva.exportar()}")
+            except OSError as e:
+                print(f"Error exportando la traza del reporte {nombre}: {e}")
+
+
+def registrar(nombre, categoria, inicio, fin, args=None):
+    """
+    Registra un tramo ya medido (instantes de `ahora()`) en la traza en curso, si la hay.
+    """
+    traza_actual = _traza.get()
+    if traza_actual is not None:
+        traza_actual.agregar(nombre, categoria, inicio, fin, args)
+
+
+@contextmanager
+def tramo(nombre, categoria='etapa', **args):
+    """
+    Mide el bloque como un tramo de la traza en curso, anidado bajo el tramo que lo contiene.
+    """
+    traza_actual = _traza.get()
+    if traza_actual is None:
+        yield
+        return
+    token = _padre.set(nombre)
+    inicio = ahora()
+    try:
+        yield
+    finally:
+        _padre.reset(token)
+        traza_actual.agregar(nombre, categoria, inicio, ahora(), args or None)
+
+
+def trazar(funcion):
+    """
+    Decorador que mide cada llamada a la función como un tramo con su nombre.
+    """
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        if _traza.get() is None:
+            return funcion(*args, **kwargs)
+        with tramo(funcion.__name__):
+            return funcion(*args, **kwargs)
+    return envoltura
+
+
+class Secciones:
+    """
+    Mide secciones consecutivas de una función larga (p. ej. las secciones de un documento Word) sin anidar bloques:
+    cada llamada a `iniciar` cierra la sección anterior.
+
+    Parámetros:
+    - categoria (str): Categoría de los tramos en la traza.
+    """
+
+    def __init__(self, categoria='seccion'):
+        self.categoria = categoria
+        self._actual = None
+        self._inicio = None
+        self._padre = _padre.get()
+
+    def iniciar(self, nombre):
+        """
+        Cierra la sección en curso e inicia la sección `nombre`.
+        """
+        self.terminar()
+        self._actual = nombre
+        self._inicio = ahora()
+
+    def terminar(self):
+        """
+        Cierra la sección en curso.
+        """
+        if self._actual is not None:
+            registrar(f"{self._padre} · {self._actual}" if self._padre else self._actual, self.categoria, self._inicio, ahora())
+            self._actual = None
@@ -0,0 +1,89 @@
+# Librerias
+import hashlib
+import os
+import threading
+import time
+import pandas as pd
+
+############################################################
+# ÍNDICE DE USUARIOS AUTORIZADOS PARA DESCARGAR DOCUMENTOS
+############################################################
+
+# Archivo de planta con la columna CORREO de los funcionarios autorizados
+USUARIOS_PATH = '.streamlit/Planta.xlsx'
+# Segundos entre revisiones de la fecha de modificación del archivo
+USUARIOS_REVISION = 30
+
+
+def normalizar_correo(correo):
+    """
+    Normaliza un correo electrónico para compararlo: sin espacios en los extremos y en minúsculas.
+    """
+    return str(correo).strip().casefold()
+
+
+class IndiceUsuarios:
+    """
+    Conjunto en memoria, compartido por todas las sesiones del proceso, de los correos autorizados.
+    El archivo de planta se lee una sola vez y se vuelve a leer solo si cambia su contenido
+    (se revisa su fecha de modificación y tamaño como máximo cada `revision` segundos y se compara su hash).
+
+    Parámetros:
+    - ruta (str): Archivo de Excel con la columna CORREO.
+    - revision (int): Segundos entre revisiones del archivo.
+    """
+
+    def __init__(self, ruta=USUARIOS_PATH, revision=USUARIOS_REVISION):
+        self.ruta = ruta
+        self.revision = revision
+        self._lock = threading.Lock()
+        self._correos = frozenset()
+        self._firma = None
+        self._hash = None
+        self._revisado = None
+        self.cargas = 0
+
+    def _cargar(self):
+        # Se llama con el bloqueo tomado
+        estado = os.stat(self.ruta)
+        firma = (estado.st_mtime_ns, estado.st_size)
+        if firma == self._firma:
+            return
+        with open(self.ruta, 'rb') as f:
+            contenido = f.read()
+        hash_archivo = hashlib.sha1(contenido).hexdigest()
+        if hash_archivo != self._hash:
+            df = pd.read_excel(self.ruta)
+            self._correos = frozenset(normalizar_correo(correo) for correo in df['CORREO'].dropna())
+            self._hash = hash_archivo
+            self.cargas += 1
+        self._firma = firma
+
+    def correos(self):
+        """
+        Retorna el conjunto (inmutable) de correos autorizados normalizados, recargándolo si el archivo cambió.
+        """
+        ahora = time.monotonic()
+        if self._revisado is not None and (ahora - self._revisado) < self.revision:
+            return self._correos
+        with self._lock:
+            if self._revisado is None or (ahora - self._revisado) >= self.revision:
+                try:
+                    self._cargar()
+                except Exception as e:
+                    # Si el archivo no se puede leer se conserva la última lista cargada
+                    print(f"Error cargando los usuarios autorizados: {e}")
+                    if self._firma is None:
+                        raise
+                self._revisado = ahora
+            return self._correos
+
+    def autorizado(self, correo):
+        """
+        Indica si un correo pertenece a la planta de funcionarios autorizados.
+        """
+        return normalizar_correo(correo) in self.correos()
+
+
+# Índice compartido por todas las sesiones del proceso
+indice_usuarios = IndiceUsuarios()
@@ -0,0 +1,128 @@
+# Librerias
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import Future
+from filelock import FileLock
+import trabajos as trab
+
+##############################################################
+# VUELO ÚNICO: UNA SOLA GENERACIÓN POR CLAVE ENTRE HILOS Y PROCESOS
+##############################################################
+
+# Cuando varias solicitudes iguales llegan al mismo tiempo (p. ej. la misma unidad durante una misión comercial),
+# solo la primera genera el resultado; las demás esperan ese mismo resultado. Entre hilos del proceso se comparte
+# un Future y entre procesos del servidor un bloqueo de archivo por clave. Los contadores de generaciones y
+# solicitudes coalescidas se acumulan además en la base de la cola de trabajos, ya que la mayoría de las
+# generaciones ocurren en los procesos de trabajo y del pre-renderizador.
+
+# Carpeta de los bloqueos de archivo (uno por clave)
+VUELOS_DIR = os.environ.get('TRES_EJES_VUELOS_DIR', os.path.join(tempfile.gettempdir(), 'tres_ejes_vuelos'))
+# Segundos máximos de espera por una generación en curso
+VUELOS_ESPERA_MAX = 900
+
+
+class VueloUnico:
+    """
+    Coordina que una generación identificada por una clave se ejecute una sola vez aunque se solicite
+    al mismo tiempo desde varios hilos o procesos del servidor.
+
+    Parámetros:
+    - nombre (str): Nombre del coordinador, usado en los nombres de los bloqueos.
+    - directorio (str): Carpeta donde se crean los archivos de bloqueo.
+    - espera_max (int): Segundos máximos de espera por una generación en curso.
+    - contadores (trabajos.ColaTrabajos, opcional): Donde se acumulan los contadores entre procesos, con el
+      prefijo `nombre` (p. ej. 'documentos.generaciones'). Si es None solo se cuentan en memoria.
+    """
+
+    def __init__(self, nombre, directorio=VUELOS_DIR, espera_max=VUELOS_ESPERA_MAX, contadores=None):
+        self.nombre = nombre
+        self.directorio = directorio
+        self.espera_max = espera_max
+        self.contadores = contadores
+        self._lock = threading.Lock()
+        # Generaciones en curso en este proceso: clave -> Future con el resultado
+        self._vuelos = {}
+        self.generaciones = 0
+        self.coalescidas_hilos = 0
+        self.coalescidas_procesos = 0
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta_bloqueo(self, clave):
+        llave = hashlib.sha1(json.dumps(clave, ensure_ascii=False).encode('utf-8')).hexdigest()
+        return os.path.join(self.directorio, f"{self.nombre}_{llave}.lock")
+
+    def _contar(self, contador):
+        # Se llama sin el bloqueo tomado: la escritura en la base puede esperar a otros procesos
+        with self._lock:
+            setattr(self, contador, getattr(self, contador) + 1)
+        if self.contadores is not None:
+            try:
+                self.contadores.incrementar(f"{self.nombre}.{contador}")
+            except Exception as e:
+                print(f"Error registrando el contador {self.nombre}.{contador}: {e}")
+
+    def ejecutar(self, clave, calcular, hecho=None):
+        """
+        Ejecuta `calcular()` para la clave salvo que otra generación igual esté en curso, en cuyo caso espera
+        su resultado.
+
+        Parámetros:
+        - clave (tuple): Identificador de la generación (p. ej. (agrupación, unidad, versión)).
+        - calcular (callable): Función sin argumentos que genera el resultado.
+        - hecho (callable, opcional): Función sin argumentos que indica si el resultado ya existe (p. ej. en el
+          cache de artefactos). Se evalúa después de esperar a otro proceso para no repetir su trabajo.
+
+        Retorna:
+        - El resultado de `calcular()`, o None si otro proceso ya lo generó (`hecho()` es True).
+        """
+        clave = list(clave)
+        llave = json.dumps(clave, ensure_ascii=False)
+        with self._lock:
+            vuelo = self._vuelos.get(llave)
+            lider = vuelo is None
+            if lider:
+                vuelo = Future()
+                self._vuelos[llave] = vuelo
+
+        # Los hilos que llegan mientras hay una generación en curso esperan su resultado
+        if not lider:
+            self._contar('coalescidas_hilos')
+            return vuelo.result(timeout=self.espera_max)
+
+        try:
+            # Entre procesos: quien obtiene el bloqueo genera; los demás esperan y luego encuentran el resultado hecho
+            with FileLock(self._ruta_bloqueo(clave), timeout=self.espera_max):
+                if hecho is not None and hecho():
+                    self._contar('coalescidas_procesos')
+                    resultado = None
+                else:
+                    self._contar('generaciones')
+                    resultado = calcular()
+            vuelo.set_result(resultado)
+            return resultado
+        except BaseException as e:
+            vuelo.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._vuelos.pop(llave, None)
+
+    def estadisticas(self):
+        """
+        Retorna un diccionario con las generaciones ejecutadas y las solicitudes coalescidas en este proceso
+        (los acumulados del servidor están en trabajos.cola_trabajos.estadisticas()).
+        """
+        with self._lock:
+            return {
+                'generaciones': self.generaciones,
+                'coalescidas_hilos': self.coalescidas_hilos,
+                'coalescidas_procesos': self.coalescidas_procesos,
+                'en_curso': len(self._vuelos),
+            }
+
+
+# Coordinador de la generación de documentos (clave: agrupación, unidad, versión de datos)
+vuelo_documentos = VueloUnico('documentos', contadores=trab.cola_trabajos)